@@ -71,21 +71,38 @@ def get_status(request, login_number):
             print(f"[ERROR] Failed to get closed orders: {e}")
             closed_data = {}
         
-        # Calculate P&L
-        unrealized_pnl = sum(
-            float(order.get('profit', 0))
-            for order in active_data.get('data', {}).get('data', {}).get('marketOrders', [])
-        )
-        
-        realized_pnl = sum(
-            float(order.get('profit', 0))
-            for order in closed_data.get('data', {}).get('data', {}).get('marketOrders', [])
-        )
+        # Get precomputed P&L and volumes
+        try:
+            overview_response = requests.get(
+                f"{settings.FASTAPI_URL}/api/simplefx/overview/{login_number}",
+                timeout=15
+            )
+            overview = overview_response.json().get('data') if overview_response.status_code == 200 else None
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            print(f"[ERROR] Failed to get account overview: {e}")
+            overview = None
         
-        # Calculate order counts
-        active_orders = active_data.get('data', {}).get('data', {}).get('marketOrders', [])
-        buy_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'BUY')
-        sell_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'SELL')
+        if overview:
+            unrealized_pnl = overview['unrealizedPnL']
+            realized_pnl = overview['realizedPnL']
+            buy_volume = overview['orderCounts']['buyVolume']
+            sell_volume = overview['orderCounts']['sellVolume']
+        else:
+            # Calculate P&L
+            unrealized_pnl = sum(
+                float(order.get('profit', 0))
+                for order in active_data.get('data', {}).get('data', {}).get('marketOrders', [])
+            )
+            
+            realized_pnl = sum(
+                float(order.get('profit', 0))
+                for order in closed_data.get('data', {}).get('data', {}).get('marketOrders', [])
+            )
+            
+            # Calculate order counts
+            active_orders = active_data.get('data', {}).get('data', {}).get('marketOrders', [])
+            buy_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'BUY')
+            sell_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'SELL')
         
         return JsonResponse({
             "accountStatus": status_data.get('data', {}),
@@ -5,5 +5,8 @@ class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
 
-
-
+    def ready(self):
+        from shared.sqlite_profile import check_profile
+        from shared.db_schema import ensure_schema
+        check_profile()
+        ensure_schema()
@@ -19,11 +19,15 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         await self.accept()
         self.websocket_client = get_websocket()
         
-        # Add callback for quote updates
-        def on_quote_update(symbol, bid, ask, timestamp):
-            asyncio.create_task(self.send_quote_update(symbol, bid, ask, timestamp))
-        
-        self.websocket_client.add_callback(on_quote_update)
+        # Subscribe to quote updates; removed again in disconnect()
+        self.quote_subscription = self.websocket_client.subscribe_quotes(
+            loop=asyncio.get_running_loop()
+        )
+        self.quote_task = asyncio.create_task(self.pump_quotes())
+        self.bar_subscription = self.websocket_client.subscribe_bars(
+            loop=asyncio.get_running_loop()
+        )
+        self.bar_task = asyncio.create_task(self.pump_bars())
         
         # Ensure WebSocket client is connected
         if not self.websocket_client.is_connected():
@@ -47,10 +51,16 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         self.update_task = asyncio.create_task(self.periodic_updates())
     
     async def disconnect(self, close_code):
-        if hasattr(self, 'update_task'):
-            self.update_task.cancel()
+        for subscription_name in ('quote_subscription', 'bar_subscription'):
+            if hasattr(self, subscription_name):
+                getattr(self, subscription_name).close()
+        for task_name in ('quote_task', 'bar_task', 'update_task'):
+            task = getattr(self, task_name, None)
+            if task is None:
+                continue
+            task.cancel()
             try:
-                await self.update_task
+                await task
             except asyncio.CancelledError:
                 pass
     
@@ -73,21 +83,38 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 'message': str(e)
             }))
     
-    async def send_quote_update(self, symbol, bid, ask, timestamp):
+    async def pump_quotes(self):
+        """Forward quote updates from the subscription to the client"""
+        while not self.quote_subscription.closed:
+            batch = await self.quote_subscription.get_batch_async()
+            if batch:
+                await self.send_quote_update(batch)
+    
+    async def pump_bars(self):
+        """Forward live bar updates to the client"""
+        while not self.bar_subscription.closed:
+            batch = await self.bar_subscription.get_batch_async()
+            if not batch:
+                continue
+            try:
+                await self.send(text_data=json.dumps({
+                    'type': 'bars',
+                    'bars': [bar.as_dict() for bar in batch]
+                }))
+            except Exception as e:
+                print(f"[ERROR] Failed to send bar update: {e}")
+    
+    async def send_quote_update(self, batch):
         """Send quote update to client"""
         try:
-            await self.send(text_data=json.dumps({
-                'type': 'quotes',
-                symbol: {
-                    'bid': bid,
-                    'ask': ask,
-                    'timestamp': timestamp
-                },
-                'connectionStatus': {
-                    'connected': self.websocket_client.is_connected(),
-                    'lastUpdate': timestamp
-                }
-            }))
+            message = {'type': 'quotes'}
+            for quote in batch:
+                message[quote.symbol] = quote.as_dict()
+            message['connectionStatus'] = {
+                'connected': self.websocket_client.is_connected(),
+                'lastUpdate': max(quote.timestamp for quote in batch)
+            }
+            await self.send(text_data=json.dumps(message))
         except Exception as e:
             print(f"[ERROR] Failed to send quote update: {e}")
     
@@ -97,10 +124,11 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             try:
                 await asyncio.sleep(10)  # Update every 10 seconds
                 
+                snapshot = self.websocket_client.get_quotes()
                 quotes = {
-                    'EURUSD': self.websocket_client.get_quote('EURUSD'),
-                    'US100': self.websocket_client.get_quote('US100'),
-                    'GBPUSD': self.websocket_client.get_quote('GBPUSD'),
+                    'EURUSD': snapshot.get('EURUSD'),
+                    'US100': snapshot.get('US100'),
+                    'GBPUSD': snapshot.get('GBPUSD'),
                     'connectionStatus': {
                         'connected': self.websocket_client.is_connected(),
                         'lastUpdate': int(asyncio.get_event_loop().time() * 1000)
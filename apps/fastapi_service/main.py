@@ -3,19 +3,32 @@ import sys
 import os
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from typing import Optional
 import uvicorn
 import asyncio
+import time
 from contextlib import asynccontextmanager
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from shared.simplefx_client import get_client
 from shared.config import Config
-from shared.database import get_db
+from shared.async_database import get_async_db
+from shared.settings_cache import get_settings_cache
 from shared.webhook_queue import get_webhook_queue
 from shared.webhook_processor import process_webhook_data
 from shared.webhook_logger import get_webhook_logger
+from shared.order_snapshot import get_order_snapshot_store
+from shared.account_overview import get_overview_store
+from shared.response_cache import get_response_cache
+from shared.candle_store import get_candle_store, columns_to_rows, TIMEFRAMES as CANDLE_TIMEFRAMES
+from shared.order_sync import sync_account_orders, get_sync_scheduler
+from shared.rate_limiter import get_rate_limiter
+from shared.webhook_alert import parse_alert, AlertParseError
+from shared.sqlite_profile import check_profile, read_pragmas
+from shared.db_schema import ensure_schema
+from shared.simplefx_websocket import get_websocket
 from fastapi import Request, Body
 from pydantic import BaseModel
 from typing import Dict, Any
@@ -23,6 +36,8 @@ from apps.fastapi_service.models import (
     AccountStatusResponse,
     OrdersResponse,
     ChartDataResponse,
+    CandleColumnsResponse,
+    OverviewResponse,
     TradeRequest,
     TradeResponse,
 )
@@ -30,127 +45,33 @@ from apps.fastapi_service.config import API_PREFIX, HOST, PORT
 
 
 async def sync_all_accounts():
-    """Background task to sync orders for all monitored accounts with retry logic"""
-    max_retries = 3
-    retry_delay = 30
+    """Background task to sync orders for all monitored accounts"""
+    scheduler = get_sync_scheduler()
     
     while True:
         try:
-            accounts = Config.ALL_MONITORED_ACCOUNTS
+            accounts = []
+            for login_number in Config.ALL_MONITORED_ACCOUNTS:
+                if Config.should_use_secondary_api(login_number):
+                    print(f"[SYNC] Skipping account {login_number} - requires secondary API (not configured)")
+                    continue
+                accounts.append(login_number)
+            
             if not accounts:
                 await asyncio.sleep(600)
                 continue
             
-            print(f"[SYNC] Starting sync for {len(accounts)} accounts...")
-            client = get_client()
-            db = get_db()
-            
-            try:
-                print("[SYNC] Pre-authenticating with primary API...")
-                token = await client.get_access_token(use_secondary_api=False)
-                if token:
-                    print("[SYNC] Pre-authentication successful")
-                else:
-                    print("[SYNC] WARNING: Pre-authentication returned empty token")
-            except Exception as e:
-                print(f"[SYNC ERROR] Pre-authentication failed: {e}")
-                print("[SYNC] Will retry authentication per account")
-            
-            for login_number in accounts:
-                if Config.should_use_secondary_api(login_number):
-                    print(f"[SYNC] Skipping account {login_number} - requires secondary API (not configured)")
-                    continue
-                
-                retry_count = 0
-                success = False
-                
-                await asyncio.sleep(1)
-                
-                while retry_count < max_retries and not success:
-                    try:
-                        reality = "LIVE" if Config.is_live_account(login_number) else "DEMO"
-                        use_secondary = False
-                        try:
-                            active_data = await asyncio.wait_for(
-                                client.get_active_orders(login_number, reality, False, 1, 1000),
-                                timeout=30.0
-                            )
-                            await asyncio.sleep(0.5)
-                            closed_data = await asyncio.wait_for(
-                                client.get_closed_orders(login_number, reality, False, 1, 1000),
-                                timeout=30.0
-                            )
-                        except asyncio.TimeoutError:
-                            print(f"[SYNC ERROR] Account {login_number}: API timeout")
-                            retry_count += 1
-                            if retry_count < max_retries:
-                                await asyncio.sleep(retry_delay)
-                            continue
-                        
-                        active_orders = active_data.get('data', {}).get('marketOrders', [])
-                        closed_orders = closed_data.get('data', {}).get('marketOrders', [])
-                        all_orders = active_orders + closed_orders
-                        
-                        synced = 0
-                        errors = []
-                        for api_order in all_orders:
-                            try:
-                                order_data = {
-                                    'id': str(api_order.get('id', '')),
-                                    'login': login_number,
-                                    'symbol': api_order.get('symbol', 'EURUSD'),
-                                    'side': api_order.get('side', 'BUY'),
-                                    'volume': api_order.get('volume', 0),
-                                    'openPrice': api_order.get('openPrice'),
-                                    'closePrice': api_order.get('closePrice'),
-                                    'takeProfit': api_order.get('takeProfit'),
-                                    'stopLoss': api_order.get('stopLoss'),
-                                    'openTime': api_order.get('openTime'),
-                                    'closeTime': api_order.get('closeTime'),
-                                    'profit': api_order.get('profit', 0),
-                                    'swap': api_order.get('swaps', 0),
-                                    'commission': api_order.get('commission', 0),
-                                    'reality': reality,
-                                    'leverage': api_order.get('leverage'),
-                                    'margin': api_order.get('margin'),
-                                    'marginRate': api_order.get('marginRate'),
-                                    'requestId': api_order.get('requestId', ''),
-                                    'isFIFO': api_order.get('isFIFO', False),
-                                    'exchange': 'simplefx',
-                                }
-                                
-                                if db.upsert_order(order_data):
-                                    synced += 1
-                            except Exception as e:
-                                errors.append(f"Order {api_order.get('id')}: {e}")
-                                if len(errors) <= 5:
-                                    print(f"[SYNC ERROR] Order {api_order.get('id')}: {e}")
-                        
-                        print(f"[SYNC] Account {login_number}: {synced}/{len(all_orders)} orders synced" + 
-                              (f" ({len(errors)} errors)" if errors else ""))
-                        success = True
-                        
-                    except Exception as e:
-                        retry_count += 1
-                        error_msg = str(e)
-                        if "409" in error_msg or "Conflict" in error_msg:
-                            print(f"[SYNC ERROR] Account {login_number} (attempt {retry_count}/{max_retries}): 409 Conflict - waiting longer...")
-                            if retry_count < max_retries:
-                                await asyncio.sleep(retry_delay * 2)
-                            continue
-                        print(f"[SYNC ERROR] Account {login_number} (attempt {retry_count}/{max_retries}): {e}")
-                        if retry_count < max_retries:
-                            await asyncio.sleep(retry_delay)
-                        else:
-                            print(f"[SYNC ERROR] Account {login_number}: Failed after {max_retries} retries")
+            started = time.monotonic()
+            synced = await scheduler.run_due(accounts)
+            if synced:
+                print(f"[SYNC] Synced {synced} accounts in {time.monotonic() - started:.1f}s")
             
-            print(f"[SYNC] Completed. Next sync in 10 minutes...")
+            await asyncio.sleep(max(1.0, scheduler.seconds_until_next(accounts)))
         except Exception as e:
             print(f"[SYNC ERROR] {e}")
             import traceback
             traceback.print_exc()
-        
-        await asyncio.sleep(600)
+            await asyncio.sleep(30)
 
 
 def check_for_nodejs_services():
@@ -187,6 +108,27 @@ def check_for_nodejs_services():
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     check_for_nodejs_services()
+    check_profile()
+    ensure_schema()
+    
+    webhook_queue = get_webhook_queue()
+    # Order execution belongs to the Node service unless explicitly moved here
+    if Config.FASTAPI_EXECUTE_WEBHOOKS:
+        webhook_queue.set_processor(process_webhook_data)
+    await webhook_queue.start()
+    
+    # Open the SimpleFX connection pool and fetch a token before the first alert arrives
+    client = get_client()
+    client.start_keepalive()
+    client.start_token_refresher()
+    
+    get_settings_cache().start_watching()
+    
+    # Stream quotes so the processor has a live price when an alert arrives
+    websocket_client = get_websocket()
+    # This service owns live-candle writes; Flask and Django only stream bars
+    websocket_client.bars.store = get_candle_store()
+    websocket_task = asyncio.create_task(websocket_client.connect())
     
     sync_task = asyncio.create_task(sync_all_accounts())
     yield
@@ -195,6 +137,16 @@ async def lifespan(app: FastAPI):
         await sync_task
     except asyncio.CancelledError:
         pass
+    await websocket_client.disconnect()
+    websocket_task.cancel()
+    try:
+        await websocket_task
+    except asyncio.CancelledError:
+        pass
+    await webhook_queue.stop()
+    await get_settings_cache().stop_watching()
+    get_webhook_logger().flush()
+    get_async_db().close()
 
 
 app = FastAPI(
@@ -225,7 +177,10 @@ async def get_status(
             reality = "LIVE" if Config.is_live_account(login_number) else "DEMO"
         
         client = get_client()
-        data = await client.get_account_status(login_number, reality, use_secondary_api)
+        data = await get_response_cache().get(
+            "status", login_number, reality, (use_secondary_api,),
+            lambda: client.get_account_status(login_number, reality, use_secondary_api)
+        )
         return AccountStatusResponse(data=data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -245,8 +200,9 @@ async def get_active_orders(
             reality = "LIVE" if Config.is_live_account(login_number) else "DEMO"
         
         client = get_client()
-        data = await client.get_active_orders(
-            login_number, reality, use_secondary_api, page, limit
+        data = await get_response_cache().get(
+            "orders_active", login_number, reality, (use_secondary_api, page, limit),
+            lambda: client.get_active_orders(login_number, reality, use_secondary_api, page, limit)
         )
         return OrdersResponse(data=data)
     except Exception as e:
@@ -269,14 +225,27 @@ async def get_closed_orders(
             reality = "LIVE" if Config.is_live_account(login_number) else "DEMO"
         
         client = get_client()
-        data = await client.get_closed_orders(
-            login_number, reality, use_secondary_api, page, limit, time_from, time_to
+        data = await get_response_cache().get(
+            "orders_closed", login_number, reality, (use_secondary_api, page, limit, time_from, time_to),
+            lambda: client.get_closed_orders(
+                login_number, reality, use_secondary_api, page, limit, time_from, time_to
+            )
         )
         return OrdersResponse(data=data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get(f"{API_PREFIX}/overview/{{login_number}}", response_model=OverviewResponse)
+async def get_overview(login_number: str):
+    """Get precomputed P&L, volume and order-count summary for an account"""
+    try:
+        data = await get_overview_store().get_overview(login_number)
+        return OverviewResponse(data=data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get(f"{API_PREFIX}/chart-data", response_model=ChartDataResponse)
 async def get_chart_data(
     symbol: str = Query("EURUSD", description="Trading symbol"),
@@ -287,13 +256,41 @@ async def get_chart_data(
 ):
     """Get chart data (candles) for a symbol"""
     try:
-        client = get_client()
-        data = await client.get_chart_data(symbol, timeframe, account, time_from, time_to)
-        return ChartDataResponse(data=data)
+        columns = await get_candle_store().get_range(symbol, timeframe, time_from, time_to)
+        return ChartDataResponse(data=columns_to_rows(columns))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get(f"{API_PREFIX}/candles/{{symbol}}/{{timeframe}}", response_model=CandleColumnsResponse)
+async def get_candles(
+    symbol: str,
+    timeframe: str,
+    time_from: Optional[int] = Query(None, description="Start timestamp in milliseconds"),
+    time_to: Optional[int] = Query(None, description="End timestamp in milliseconds")
+):
+    """Get candles as columnar arrays (time, open, high, low, close)"""
+    if timeframe not in CANDLE_TIMEFRAMES:
+        raise HTTPException(status_code=400, detail=f"Unknown timeframe {timeframe}. Use one of: {', '.join(CANDLE_TIMEFRAMES)}")
+    try:
+        columns = await get_candle_store().get_range(symbol, timeframe, time_from, time_to)
+        return CandleColumnsResponse(data=columns)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get(f"{API_PREFIX}/bars/{{symbol}}/{{timeframe}}", response_model=CandleColumnsResponse)
+async def get_live_bars(
+    symbol: str,
+    timeframe: str,
+    limit: Optional[int] = Query(None, ge=1, description="Most recent bars to return")
+):
+    """Get live bars built from the quote stream, forming bar last (no SimpleFX call)"""
+    if timeframe not in CANDLE_TIMEFRAMES:
+        raise HTTPException(status_code=400, detail=f"Unknown timeframe {timeframe}. Use one of: {', '.join(CANDLE_TIMEFRAMES)}")
+    return CandleColumnsResponse(data=get_websocket().bars.get_bars(symbol, timeframe, limit))
+
+
 @app.post(f"{API_PREFIX}/trade", response_model=TradeResponse)
 async def place_trade(request: TradeRequest):
     """Place a trade via SimpleFX API"""
@@ -309,6 +306,7 @@ async def place_trade(request: TradeRequest):
             symbol=request.symbol,
             use_secondary_api=request.use_secondary_api,
         )
+        get_response_cache().invalidate(request.login_number)
         return TradeResponse(data=data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -320,62 +318,20 @@ async def place_trade(request: TradeRequest):
 async def sync_orders(
     login_number: str,
     reality: Optional[str] = Query(None, description="Account reality: LIVE or DEMO"),
-    use_secondary_api: Optional[bool] = Query(False, description="Use secondary API key")
+    use_secondary_api: Optional[bool] = Query(False, description="Use secondary API key"),
+    full: bool = Query(False, description="Ignore the sync cursor and re-read the full history")
 ):
     """Sync orders from SimpleFX API to database"""
     try:
-        if reality is None:
-            reality = "LIVE" if Config.is_live_account(login_number) else "DEMO"
-        
-        client = get_client()
-        db = get_db()
-        
-        active_data = await client.get_active_orders(login_number, reality, use_secondary_api, 1, 1000)
-        closed_data = await client.get_closed_orders(login_number, reality, use_secondary_api, 1, 1000)
-        
-        active_orders = active_data.get('data', {}).get('marketOrders', [])
-        closed_orders = closed_data.get('data', {}).get('marketOrders', [])
-        all_orders = active_orders + closed_orders
-        
-        synced_count = 0
-        errors = []
-        
-        for api_order in all_orders:
-            try:
-                order_data = {
-                    'id': str(api_order.get('id', '')),
-                    'login': login_number,
-                    'symbol': api_order.get('symbol', 'EURUSD'),
-                    'side': api_order.get('side', 'BUY'),
-                    'volume': api_order.get('volume', 0),
-                    'openPrice': api_order.get('openPrice'),
-                    'closePrice': api_order.get('closePrice'),
-                    'takeProfit': api_order.get('takeProfit'),
-                    'stopLoss': api_order.get('stopLoss'),
-                    'openTime': api_order.get('openTime'),
-                    'closeTime': api_order.get('closeTime'),
-                    'profit': api_order.get('profit', 0),
-                    'swap': api_order.get('swaps', 0),
-                    'commission': api_order.get('commission', 0),
-                    'reality': reality,
-                    'leverage': api_order.get('leverage'),
-                    'margin': api_order.get('margin'),
-                    'marginRate': api_order.get('marginRate'),
-                    'requestId': api_order.get('requestId', ''),
-                    'isFIFO': api_order.get('isFIFO', False),
-                    'exchange': 'simplefx',
-                }
-                
-                if db.upsert_order(order_data):
-                    synced_count += 1
-            except Exception as e:
-                errors.append(f"Order {api_order.get('id')}: {str(e)}")
+        result = await sync_account_orders(login_number, reality, use_secondary_api, full)
         
         return {
             "success": True,
-            "synced": synced_count,
-            "total": len(all_orders),
-            "errors": errors[:10] if errors else []
+            "synced": result['synced'],
+            "total": result['total'],
+            "unchanged": result['unchanged'],
+            "cursor": result['cursor'],
+            "errors": result['errors'][:10]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -384,71 +340,54 @@ async def sync_orders(
 @app.post("/webhook")
 async def webhook_endpoint(request: Request):
     """Webhook endpoint for TradingView alerts"""
-    import time
-    start_time = time.time() * 1000
+    start_time = time.perf_counter()
+    webhook_logger = get_webhook_logger()
     
     try:
+        # Parse and validate the body once; the queue and processor reuse the record
         try:
-            body = await request.json()
-        except:
-            body_text = await request.body()
-            import json
-            body = json.loads(body_text.decode())
-        
-        login = body.get('l') or Config.DEFAULT_ACCOUNT_NUMBER
-        alert_id = body.get('id') or f"{int(time.time() * 1000)}_{hash(str(body))}"
+            alert = parse_alert(await request.body(), default_login=Config.DEFAULT_ACCOUNT_NUMBER)
+        except AlertParseError as e:
+            webhook_logger.log_invalid_payload(str(e))
+            return JSONResponse({"error": "Invalid webhook payload", "details": str(e)}, status_code=400)
         
-        db = get_db()
-        if db.order_exists_with_alert_id(alert_id, login):
-            webhook_logger = get_webhook_logger()
-            symbol = body.get('sy', 'UNKNOWN')
-            action = body.get('a', 'UNKNOWN')
-            size = body.get('z', 0)
-            webhook_logger.log_duplicate(symbol, action, login, alert_id, size)
+        login = alert.l
+        db = get_async_db()
+        if await db.order_exists_with_alert_id(alert.id, login):
+            webhook_logger.log_duplicate(alert.sy, alert.a, login, alert.id, alert.z)
             return {
                 "message": "Alert already processed",
-                "alertId": alert_id,
+                "alertId": alert.id,
                 "account": login
             }
         
         webhook_queue = get_webhook_queue()
-        if webhook_queue.check_for_duplicate(body, login):
-            webhook_logger = get_webhook_logger()
-            symbol = body.get('sy', 'UNKNOWN')
-            action = body.get('a', 'UNKNOWN')
-            size = body.get('z', 0)
-            webhook_logger.log_duplicate(symbol, action, login, alert_id, size)
+        if await webhook_queue.check_for_duplicate(alert, login):
+            webhook_logger.log_duplicate(alert.sy, alert.a, login, alert.id, alert.z)
             return {
                 "message": "Duplicate webhook detected and ignored",
                 "account": login
             }
         
-        webhook_logger = get_webhook_logger()
-        symbol = body.get('sy', 'UNKNOWN')
-        action = body.get('a', 'UNKNOWN')
-        size = body.get('z', 0)
-        tp = body.get('t', 0)
-        sl = body.get('s', 0)
-        webhook_logger.log_webhook_received(symbol, action, size, tp, sl, login, alert_id)
+        webhook_logger.log_webhook_received(alert.sy, alert.a, alert.z, alert.t, alert.s, login, alert.id)
         
-        job_id = await webhook_queue.add(body, login)
-        queue_status = webhook_queue.get_queue_status()
+        job_id = await webhook_queue.add(alert, login)
         
         return {
             "success": True,
             "message": "Webhook queued for processing",
             "jobId": job_id,
-            "queueStatus": queue_status,
-            "processingTime": int(time.time() * 1000) - start_time
+            "queueLength": webhook_queue.pending_count(),
+            "processingTime": round((time.perf_counter() - start_time) * 1000, 3)
         }
         
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return {
+        return JSONResponse({
             "error": "Failed to queue webhook",
             "details": str(e)
-        }, 500
+        }, status_code=500)
 
 
 @app.get("/api/list-accounts")
@@ -465,8 +404,8 @@ async def list_accounts():
 async def get_db_orders(login_number: str):
     """Get all orders from database for account"""
     try:
-        db = get_db()
-        orders = db.get_orders(login_number)
+        db = get_async_db()
+        orders = await db.get_orders(login_number)
         return orders
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -476,8 +415,8 @@ async def get_db_orders(login_number: str):
 async def get_recent_db_orders(login_number: str, limit: int = Query(100, ge=1, le=1000)):
     """Get recent orders from database"""
     try:
-        db = get_db()
-        orders = db.get_recent_orders(login_number, limit)
+        db = get_async_db()
+        orders = await db.get_recent_orders(login_number, limit)
         return orders
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -487,8 +426,8 @@ async def get_recent_db_orders(login_number: str, limit: int = Query(100, ge=1,
 async def get_webhook_outcomes(login_number: str, limit: int = Query(100, ge=1, le=1000)):
     """Get webhook outcomes for account"""
     try:
-        db = get_db()
-        outcomes = db.get_webhook_outcomes(login_number, limit)
+        db = get_async_db()
+        outcomes = await db.get_webhook_outcomes(login_number, limit)
         return outcomes
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -498,9 +437,7 @@ async def get_webhook_outcomes(login_number: str, limit: int = Query(100, ge=1,
 async def get_account_settings(login_number: str):
     """Get account settings"""
     try:
-        db = get_db()
-        settings = db.get_account_settings(login_number)
-        return settings
+        return await get_settings_cache().get(login_number)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -509,12 +446,39 @@ async def get_account_settings(login_number: str):
 async def update_account_settings(login_number: str, settings: Dict[str, Any] = Body(...)):
     """Update account settings"""
     try:
-        db = get_db()
-        return {"success": True, "message": "Settings updated"}
+        db = get_async_db()
+        updated = await db.update_account_settings(login_number, settings)
+        get_settings_cache().invalidate(login_number)
+        return {"success": True, "message": "Settings updated", "settings": updated}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Service performance counters"""
+    return {
+        "simplefxTransport": get_client().get_transport_stats(),
+        "simplefxToken": get_client().get_token_stats(),
+        "rateLimiter": get_rate_limiter().get_stats(),
+        "sync": get_sync_scheduler().get_stats(),
+        "activeOrderSnapshots": get_order_snapshot_store().get_stats(),
+        "accountOverviews": get_overview_store().get_stats(),
+        "responseCache": get_response_cache().get_stats(),
+        "candleStore": get_candle_store().get_stats(),
+        "webhookQueue": get_webhook_queue().get_queue_status(),
+        "sqlite": await get_async_db().run(lambda db: read_pragmas(db._get_connection())),
+        "asyncDatabase": get_async_db().get_stats(),
+        "accountSettingsCache": get_settings_cache().get_stats(),
+        "webhookOutcomes": get_webhook_logger().get_stats(),
+        "quoteBook": get_websocket().book.get_stats(),
+        "quoteBus": get_websocket().bus.get_stats(),
+        "barAggregator": get_websocket().bars.get_stats()
+    }
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
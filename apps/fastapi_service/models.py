@@ -15,12 +15,24 @@ class OrdersResponse(BaseModel):
     success: bool = True
 
 
+class OverviewResponse(BaseModel):
+    """Account overview response"""
+    data: Dict[str, Any]
+    success: bool = True
+
+
 class ChartDataResponse(BaseModel):
     """Chart data response"""
     data: List[Dict[str, Any]]
     success: bool = True
 
 
+class CandleColumnsResponse(BaseModel):
+    """Candles as parallel arrays keyed by column (time, open, high, low, close)"""
+    data: Dict[str, List[Any]]
+    success: bool = True
+
+
 class TradeRequest(BaseModel):
     """Trade request model"""
     side: str
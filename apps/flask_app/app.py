@@ -13,7 +13,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from shared.config import Config
 from shared.database import get_db
+from shared.sqlite_profile import check_profile
+from shared.db_schema import ensure_schema
 from shared.simplefx_websocket import get_websocket
+from apps.flask_app.services.fastapi_proxy import get_fastapi_proxy
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -21,6 +24,7 @@ socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # FastAPI service URL (can be configured via env)
 FASTAPI_URL = os.getenv('FASTAPI_URL', 'http://localhost:8000')
+fastapi_proxy = get_fastapi_proxy()
 
 # WebSocket client for SimpleFX quotes
 websocket_client = get_websocket()
@@ -57,11 +61,16 @@ def get_status(login_number):
         reality = "LIVE" if Config.is_live_account(login_number) else "DEMO"
         use_secondary = Config.should_use_secondary_api(login_number)
         
-        # Verificar se FastAPI está disponível (timeout curto para não bloquear)
+        # Status, active and closed orders in parallel over pooled keep-alive
+        # connections; the circuit breaker fails fast while FastAPI is down
+        params = {"reality": reality, "use_secondary_api": use_secondary}
         try:
-            health_check = requests.get(f"{FASTAPI_URL}/health", timeout=3)
-            if health_check.status_code != 200:
-                print(f"[WARNING] FastAPI health check returned {health_check.status_code}")
+            results = fastapi_proxy.fetch_all({
+                "status": f"/api/simplefx/status/{login_number}",
+                "active": f"/api/simplefx/orders/active/{login_number}",
+                "closed": f"/api/simplefx/orders/closed/{login_number}",
+                "overview": f"/api/simplefx/overview/{login_number}",
+            }, params)
         except requests.exceptions.ConnectionError:
             return jsonify({
                 "error": f"FastAPI service is not running at {FASTAPI_URL}. Please start the FastAPI service first.",
@@ -74,61 +83,33 @@ def get_status(login_number):
                 "orderCounts": {"buyVolume": 0, "sellVolume": 0},
                 "serverTime": datetime.now(timezone.utc).isoformat()
             }), 503
-        except requests.exceptions.Timeout:
-            # Se health check timeout, ainda tenta fazer as requisições principais
-            print(f"[WARNING] FastAPI health check timeout, but continuing with requests")
+        status_data = results["status"]
+        active_data = results["active"]
+        closed_data = results["closed"]
+        overview = results["overview"].get('data')
         
-        # Get account status
-        try:
-            status_response = requests.get(
-                f"{FASTAPI_URL}/api/simplefx/status/{login_number}",
-                params={"reality": reality, "use_secondary_api": use_secondary},
-                timeout=15
+        if overview:
+            # P&L and volumes precomputed by FastAPI
+            unrealized_pnl = overview['unrealizedPnL']
+            realized_pnl = overview['realizedPnL']
+            buy_volume = overview['orderCounts']['buyVolume']
+            sell_volume = overview['orderCounts']['sellVolume']
+        else:
+            # Calculate P&L
+            unrealized_pnl = sum(
+                float(order.get('profit', 0))
+                for order in active_data.get('data', {}).get('data', {}).get('marketOrders', [])
             )
-            status_data = status_response.json() if status_response.status_code == 200 else {}
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-            print(f"[ERROR] Failed to get account status: {e}")
-            status_data = {}
-        
-        # Get active orders
-        try:
-            active_response = requests.get(
-                f"{FASTAPI_URL}/api/simplefx/orders/active/{login_number}",
-                params={"reality": reality, "use_secondary_api": use_secondary},
-                timeout=15
+            
+            realized_pnl = sum(
+                float(order.get('profit', 0))
+                for order in closed_data.get('data', {}).get('data', {}).get('marketOrders', [])
             )
-            active_data = active_response.json() if active_response.status_code == 200 else {}
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-            print(f"[ERROR] Failed to get active orders: {e}")
-            active_data = {}
-        
-        # Get closed orders
-        try:
-            closed_response = requests.get(
-                f"{FASTAPI_URL}/api/simplefx/orders/closed/{login_number}",
-                params={"reality": reality, "use_secondary_api": use_secondary},
-                timeout=15
-            )
-            closed_data = closed_response.json() if closed_response.status_code == 200 else {}
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-            print(f"[ERROR] Failed to get closed orders: {e}")
-            closed_data = {}
-        
-        # Calculate P&L
-        unrealized_pnl = sum(
-            float(order.get('profit', 0))
-            for order in active_data.get('data', {}).get('data', {}).get('marketOrders', [])
-        )
-        
-        realized_pnl = sum(
-            float(order.get('profit', 0))
-            for order in closed_data.get('data', {}).get('data', {}).get('marketOrders', [])
-        )
-        
-        # Calculate order counts
-        active_orders = active_data.get('data', {}).get('data', {}).get('marketOrders', [])
-        buy_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'BUY')
-        sell_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'SELL')
+            
+            # Calculate order counts
+            active_orders = active_data.get('data', {}).get('data', {}).get('marketOrders', [])
+            buy_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'BUY')
+            sell_volume = sum(float(o.get('volume', 0)) for o in active_orders if o.get('side', '').upper() == 'SELL')
         
         return jsonify({
             "accountStatus": status_data.get('data', {}),
@@ -232,8 +213,8 @@ def get_chart_data():
         timeframe = request.args.get('timeframe', '1h')
         account = request.args.get('account', '3028761')
         
-        response = requests.get(
-            f"{FASTAPI_URL}/api/simplefx/chart-data",
+        response = fastapi_proxy.get(
+            "/api/simplefx/chart-data",
             params={
                 "symbol": symbol,
                 "timeframe": timeframe,
@@ -270,11 +251,12 @@ def update_dashboard_clients():
         return
     
     try:
-        # Get quotes for all symbols
+        # Get quotes for all symbols from one consistent snapshot
+        snapshot = websocket_client.get_quotes()
         quotes = {
-            'EURUSD': websocket_client.get_quote('EURUSD'),
-            'US100': websocket_client.get_quote('US100'),
-            'GBPUSD': websocket_client.get_quote('GBPUSD'),
+            'EURUSD': snapshot.get('EURUSD'),
+            'US100': snapshot.get('US100'),
+            'GBPUSD': snapshot.get('GBPUSD'),
             'connectionStatus': {
                 'connected': websocket_client.is_connected(),
                 'lastUpdate': int(time.time() * 1000)
@@ -309,23 +291,43 @@ def start_websocket_background():
     thread.start()
     print("[INFO] SimpleFX WebSocket client started in background")
     
-    # Add callback for quote updates
-    def on_quote_update(symbol, bid, ask, timestamp):
-        """Callback when quote is updated"""
-        quotes = {
-            symbol: {
-                'bid': bid,
-                'ask': ask,
-                'timestamp': timestamp
-            },
-            'connectionStatus': {
+    # Emit quote updates from a pump thread, off the WebSocket event loop.
+    # The subscription conflates per symbol, so a slow emit skips stale ticks.
+    subscription = websocket_client.subscribe_quotes()
+    
+    def pump_quotes():
+        while not subscription.closed:
+            batch = subscription.get_batch(timeout=1.0)
+            if not batch:
+                continue
+            quotes = {quote.symbol: quote.as_dict() for quote in batch}
+            quotes['connectionStatus'] = {
                 'connected': websocket_client.is_connected(),
-                'lastUpdate': timestamp
+                'lastUpdate': max(quote.timestamp for quote in batch)
             }
-        }
-        socketio.emit('quotes', quotes)
+            try:
+                socketio.emit('quotes', quotes)
+            except Exception as e:
+                print(f"[ERROR] Quote emit failed: {e}")
+    
+    pump_thread = threading.Thread(target=pump_quotes, daemon=True)
+    pump_thread.start()
+    
+    # Live bars for the charts, conflated per bar the same way
+    bar_subscription = websocket_client.subscribe_bars()
+    
+    def pump_bars():
+        while not bar_subscription.closed:
+            batch = bar_subscription.get_batch(timeout=1.0)
+            if not batch:
+                continue
+            try:
+                socketio.emit('bars', [bar.as_dict() for bar in batch])
+            except Exception as e:
+                print(f"[ERROR] Bar emit failed: {e}")
     
-    websocket_client.add_callback(on_quote_update)
+    bar_thread = threading.Thread(target=pump_bars, daemon=True)
+    bar_thread.start()
     
     # Start periodic dashboard updates
     def periodic_update():
@@ -352,6 +354,9 @@ def handle_disconnect():
 
 
 if __name__ == '__main__':
+    # Report the SQLite pragmas in effect, create indexes and audit query plans
+    check_profile()
+    ensure_schema()
     # Start WebSocket client
     start_websocket_background()
     # Run Flask app
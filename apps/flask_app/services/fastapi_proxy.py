@@ -0,0 +1,175 @@
+"""Pooled HTTP proxy from the Flask dashboard to the FastAPI service"""
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from shared.config import Config
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """FastAPI is considered down; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """Stops calling FastAPI after repeated connection failures
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast for ``reset_timeout`` seconds. Then one trial call is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """True if a call may be attempted now"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class FastAPIProxy:
+    """Keep-alive session pool plus a thread pool to fan requests out concurrently"""
+
+    def __init__(self, base_url: str, pool_size: int = 10, timeout: float = 15.0,
+                 connect_timeout: float = 3.0, breaker: Optional[CircuitBreaker] = None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="fastapi-proxy")
+        self.breaker = breaker or CircuitBreaker()
+        self.requests = 0
+        self.errors = 0
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        """GET a FastAPI path through the circuit breaker"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"FastAPI at {self.base_url} is unavailable (circuit open)")
+        self.requests += 1
+        try:
+            response = self.session.get(
+                f"{self.base_url}{path}", params=params,
+                timeout=(self.timeout[0], timeout) if timeout else self.timeout
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.errors += 1
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """GET a path and decode it; non-200 responses give {}"""
+        response = self.get(path, params, timeout)
+        return response.json() if response.status_code == 200 else {}
+
+    def fetch_all(self, paths: Dict[str, str], params: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """GET several paths concurrently; returns name -> decoded body ({} on failure)
+
+        Raises CircuitOpenError if the circuit is open, and ConnectionError
+        if FastAPI could not be reached by any of the calls.
+        """
+        if self.breaker.state == "open":
+            self.breaker.rejected += 1
+            raise CircuitOpenError(f"FastAPI at {self.base_url} is unavailable (circuit open)")
+
+        futures = {name: self.executor.submit(self.get_json, path, params) for name, path in paths.items()}
+        results: Dict[str, Dict[str, Any]] = {}
+        connection_errors = []
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                print(f"[ERROR] FastAPI {name} request failed: {e}")
+                if isinstance(e, requests.exceptions.ConnectionError):
+                    connection_errors.append(e)
+                results[name] = {}
+            except ValueError as e:
+                print(f"[ERROR] FastAPI {name} returned invalid JSON: {e}")
+                results[name] = {}
+        if connection_errors and len(connection_errors) == len(futures):
+            raise connection_errors[-1]
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "breaker": self.breaker.get_stats(),
+        }
+
+
+# Global instance
+_proxy: Optional[FastAPIProxy] = None
+
+def get_fastapi_proxy() -> FastAPIProxy:
+    """Get global FastAPI proxy"""
+    global _proxy
+    if _proxy is None:
+        _proxy = FastAPIProxy(
+            os.getenv('FASTAPI_URL', 'http://localhost:8000'),
+            pool_size=Config.FASTAPI_PROXY_POOL_SIZE,
+            timeout=Config.FASTAPI_PROXY_TIMEOUT,
+            connect_timeout=Config.FASTAPI_PROXY_CONNECT_TIMEOUT,
+            breaker=CircuitBreaker(
+                failure_threshold=Config.FASTAPI_PROXY_BREAKER_FAILURES,
+                reset_timeout=Config.FASTAPI_PROXY_BREAKER_RESET,
+            ),
+        )
+    return _proxy
@@ -0,0 +1,146 @@
+"""Precomputed per-account P&L and volume summary for the dashboards"""
+import asyncio
+import heapq
+import time
+from typing import Dict, Any, Iterable, Optional, Tuple
+import logging
+from shared.config import Config
+from shared.order_snapshot import ActiveOrderSnapshot, get_order_snapshot_store
+from shared.response_cache import get_response_cache
+from shared.simplefx_client import get_client
+
+logger = logging.getLogger(__name__)
+
+# Realized P&L covers what the dashboard's closed-order list shows: the
+# first /orders/closed page (newest orders of the last 180 days)
+REALIZED_WINDOW_DAYS = 180
+REALIZED_WINDOW_ORDERS = 100
+
+# Active-order request of the dashboards, shared through the response cache
+ACTIVE_ORDERS_PAGE = (1, 100)
+
+
+class RealizedPnL:
+    """Closed orders of one account and the realized P&L of the window
+
+    ``orders`` maps every known closed order to (close_time, profit), so
+    overlapping sync windows and later corrections of an order replace
+    their previous values instead of adding up.
+    """
+
+    def __init__(self, orders: Dict[str, Tuple[int, float]]):
+        self.orders = orders
+        self.updated_at = int(time.time() * 1000)
+
+    def apply(self, order_id: str, close_time: int, profit: float):
+        if self.orders.get(order_id) == (close_time, profit):
+            return
+        self.orders[order_id] = (close_time, profit)
+        self.updated_at = int(time.time() * 1000)
+
+    def window(self) -> Tuple[int, float]:
+        """(order count, profit) of the newest closed orders in the window"""
+        since = int(time.time() * 1000) - REALIZED_WINDOW_DAYS * 24 * 60 * 60 * 1000
+        recent = heapq.nlargest(
+            REALIZED_WINDOW_ORDERS,
+            (entry for entry in self.orders.values() if entry[0] >= since)
+        )
+        return len(recent), sum(profit for _, profit in recent)
+
+
+class AccountOverviewStore:
+    """Realized P&L per account, seeded from the database and updated by sync
+
+    Active-order figures (unrealized P&L, buy/sell volume) come from the
+    active-order snapshot while it is fresh (sync replaces it, placements
+    update it), otherwise from the cached active-orders response the
+    dashboards request anyway, so an overview adds no SimpleFX call.
+    """
+
+    def __init__(self):
+        self._realized: Dict[str, RealizedPnL] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.seeds = 0
+        self.updates = 0
+
+    async def _get_realized(self, login: str) -> RealizedPnL:
+        realized = self._realized.get(login)
+        if realized is not None:
+            return realized
+        lock = self._locks.setdefault(login, asyncio.Lock())
+        async with lock:
+            realized = self._realized.get(login)
+            if realized is None:
+                from shared.async_database import get_async_db
+                orders = await get_async_db().get_closed_order_profits(login)
+                realized = self._realized[login] = RealizedPnL(orders)
+                self.seeds += 1
+        return realized
+
+    async def apply_closed_orders(self, login: str, orders: Iterable[Any]):
+        """Fold synced closed orders (OrderRecord) into the running total"""
+        realized = await self._get_realized(str(login))
+        for order in orders:
+            if order.close_time:
+                realized.apply(order.order_id, order.close_time, order.profit or 0.0)
+        self.updates += 1
+
+    async def _get_active(self, login: str) -> ActiveOrderSnapshot:
+        snapshot = get_order_snapshot_store().peek(login)
+        if snapshot is not None:
+            return snapshot
+        reality = "LIVE" if Config.is_live_account(login) else "DEMO"
+        use_secondary = Config.should_use_secondary_api(login)
+        data = await get_response_cache().get(
+            "orders_active", login, reality, (use_secondary,) + ACTIVE_ORDERS_PAGE,
+            lambda: get_client().get_active_orders(login, reality, use_secondary, *ACTIVE_ORDERS_PAGE)
+        )
+        return ActiveOrderSnapshot(login, list(data.get('data', {}).get('marketOrders', [])))
+
+    async def get_overview(self, login: str) -> Dict[str, Any]:
+        """Summary of an account: P&L, volumes and order counts"""
+        login = str(login)
+        snapshot = await self._get_active(login)
+        realized = await self._get_realized(login)
+        closed_count, realized_pnl = realized.window()
+        return {
+            "login": login,
+            "unrealizedPnL": snapshot.unrealized_pnl,
+            "realizedPnL": realized_pnl,
+            "orderCounts": {
+                "buyVolume": snapshot.buy_volume,
+                "sellVolume": snapshot.sell_volume,
+                "buy": snapshot.buy_count,
+                "sell": snapshot.sell_count,
+            },
+            "activeOrders": snapshot.count,
+            "closedOrders": closed_count,
+            "realizedUpdatedAt": realized.updated_at,
+            "activeAgeMs": int(snapshot.age() * 1000),
+        }
+
+    def invalidate(self, login: Optional[str] = None):
+        """Forget the running total(s); the next read re-seeds from the database"""
+        if login is None:
+            self._realized.clear()
+        else:
+            self._realized.pop(str(login), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        return {
+            "accounts": len(self._realized),
+            "seeds": self.seeds,
+            "updates": self.updates,
+        }
+
+
+# Global instance
+_overview_store: Optional[AccountOverviewStore] = None
+
+def get_overview_store() -> AccountOverviewStore:
+    """Get global account overview store"""
+    global _overview_store
+    if _overview_store is None:
+        _overview_store = AccountOverviewStore()
+    return _overview_store
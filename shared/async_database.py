@@ -0,0 +1,73 @@
+"""Async facade over Database that keeps SQLite I/O off the event loop"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+import sqlite3
+from shared.config import Config
+from shared.database import Database, get_db
+
+
+class AsyncDatabase:
+    """Awaitable version of every public ``Database`` method
+
+    Calls run on a small dedicated thread pool; each worker thread keeps its
+    own connection (``Database`` connections are thread-local), so reads run
+    in parallel under WAL and the event loop never waits on SQLite.
+    """
+
+    def __init__(self, db: Optional[Database] = None, max_workers: int = 4):
+        self.db = db or get_db()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqlite")
+        self.calls = 0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``func(db, *args, **kwargs)`` on a database thread"""
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, self.db, *args, **kwargs)
+        )
+
+    async def execute(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Execute a query and return its rows; writes are committed on the same thread"""
+        def _execute(db: Database) -> List[sqlite3.Row]:
+            cursor = db.execute(query, params)
+            rows = cursor.fetchall()
+            if db._get_connection().in_transaction:
+                db.commit()
+            return rows
+        return await self.run(_execute)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.db, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(lambda db: getattr(db, name)(*args, **kwargs))
+        return method
+
+    def close(self):
+        """Stop the thread pool"""
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> dict:
+        """Get facade statistics"""
+        return {
+            "threads": self.max_workers,
+            "calls": self.calls,
+        }
+
+
+# Global instance
+_async_db: Optional[AsyncDatabase] = None
+
+def get_async_db() -> AsyncDatabase:
+    """Get global async database facade"""
+    global _async_db
+    if _async_db is None:
+        _async_db = AsyncDatabase(max_workers=Config.DB_THREAD_POOL_SIZE)
+    return _async_db
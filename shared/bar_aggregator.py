@@ -0,0 +1,191 @@
+"""Live OHLC bars built from the SimpleFX quote stream"""
+import asyncio
+import threading
+import time
+from array import array
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+import logging
+from shared.candle_store import CandleStore, TIMEFRAMES, COLUMNS
+from shared.quote_book import Quote
+from shared.quote_bus import QuoteBus, QuoteSubscription
+
+logger = logging.getLogger(__name__)
+
+# Timeframes whose closed bars are written to the candle store. H4 and D1
+# buckets here are UTC-aligned and may not match SimpleFX's session
+# boundaries, so those bars stay in memory only.
+STORED_TIMEFRAMES = ("1m", "5m", "15m", "1h")
+
+
+class Bar(NamedTuple):
+    """One bar update: the forming bar, or a bar that just closed"""
+    symbol: str
+    timeframe: str
+    time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    closed: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def _bar_key(bar: Bar) -> Tuple[str, str, int]:
+    # The last update of a closed bar must not be conflated into the next bar
+    return (bar.symbol, bar.timeframe, bar.time)
+
+
+class BarRing:
+    """Last ``capacity`` bars of one (symbol, timeframe) in array columns
+
+    The slot at ``head`` is the forming bar; starting a new bar overwrites
+    the oldest slot once the ring is full.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._time = array('q', [0]) * capacity
+        self._open = array('d', [0.0]) * capacity
+        self._high = array('d', [0.0]) * capacity
+        self._low = array('d', [0.0]) * capacity
+        self._close = array('d', [0.0]) * capacity
+        self.head = -1
+        self.count = 0
+
+    @property
+    def last_time(self) -> int:
+        return self._time[self.head]
+
+    def start(self, bucket: int, price: float):
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self._time[self.head] = bucket
+        self._open[self.head] = self._high[self.head] = price
+        self._low[self.head] = self._close[self.head] = price
+
+    def update(self, price: float):
+        head = self.head
+        if price > self._high[head]:
+            self._high[head] = price
+        elif price < self._low[head]:
+            self._low[head] = price
+        self._close[head] = price
+
+    def row(self, slot: Optional[int] = None) -> Tuple[int, float, float, float, float]:
+        slot = self.head if slot is None else slot
+        return (self._time[slot], self._open[slot], self._high[slot], self._low[slot], self._close[slot])
+
+    def columns(self, limit: Optional[int] = None) -> Dict[str, List]:
+        """Bars oldest first, forming bar last, as columnar lists"""
+        count = self.count if limit is None else min(limit, self.count)
+        rows = [self.row((self.head - i) % self.capacity) for i in range(count - 1, -1, -1)]
+        if not rows:
+            return {column: [] for column in COLUMNS}
+        return dict(zip(COLUMNS, map(list, zip(*rows))))
+
+
+class BarAggregator:
+    """Folds every stored quote into M1..D1 bars per symbol
+
+    Bars use the bid, like SimpleFX candles, and are bucketed on the
+    exchange timestamp (UTC-aligned). Each batch publishes the touched
+    bars on ``bus``, so charts update without asking SimpleFX.
+
+    Only the process that owns live-candle writes sets ``store``. It gets
+    bars of ``STORED_TIMEFRAMES`` that are complete (the feed was up for
+    the whole bucket) and closed (the next bar started and the bucket is
+    over by the wall clock). Everything else stays in memory only.
+    """
+
+    def __init__(self, capacity: int = 500, store: Optional[CandleStore] = None,
+                 subscriber_queue: int = 64):
+        self.capacity = capacity
+        self.store = store
+        self.bus = QuoteBus(default_maxsize=subscriber_queue, key=_bar_key)
+        self._timeframes = [(name, step) for name, (_, step) in TIMEFRAMES.items()]
+        self._steps = dict(self._timeframes)
+        self._rings: Dict[Tuple[str, str], BarRing] = {}
+        self._lock = threading.Lock()
+        # Buckets starting before the feed was (re)connected are incomplete
+        self._feed_since = int(time.time())
+        self.ticks = 0
+        self.late = 0
+        self.bars_closed = 0
+        self.bars_stored = 0
+
+    def resume(self):
+        """Mark the feed as (re)connected; bars already forming are not stored"""
+        self._feed_since = int(time.time())
+
+    def on_quotes(self, quotes: Iterable[Quote]):
+        """Fold a batch of quotes into the bars and publish the updates"""
+        updates: Dict[Tuple[str, str], Bar] = {}
+        closed: List[Bar] = []
+        with self._lock:
+            for quote in quotes:
+                self.ticks += 1
+                seconds = quote.timestamp // 1000
+                price = quote.bid
+                for timeframe, step in self._timeframes:
+                    key = (quote.symbol, timeframe)
+                    ring = self._rings.get(key)
+                    if ring is None:
+                        ring = self._rings[key] = BarRing(self.capacity)
+                    bucket = seconds - seconds % step
+                    if ring.count and bucket == ring.last_time:
+                        ring.update(price)
+                    elif ring.count and bucket < ring.last_time:
+                        self.late += 1
+                        continue
+                    else:
+                        if ring.count:
+                            closed.append(Bar(quote.symbol, timeframe, *ring.row(), True))
+                        ring.start(bucket, price)
+                    updates[key] = Bar(quote.symbol, timeframe, *ring.row(), False)
+
+        if closed:
+            self.bars_closed += len(closed)
+            self._store(closed)
+            self.bus.publish(closed)
+        self.bus.publish(list(updates.values()))
+
+    def _store(self, closed: List[Bar]):
+        if self.store is None:
+            return
+        now = time.time()
+        for bar in closed:
+            if (bar.timeframe not in STORED_TIMEFRAMES or bar.time < self._feed_since
+                    or bar.time + self._steps[bar.timeframe] > now):
+                continue
+            try:
+                self.store.store_candles(bar.symbol, bar.timeframe, [(bar.time, bar.open, bar.high, bar.low, bar.close)])
+                self.bars_stored += 1
+            except Exception as e:
+                logger.error(f"Handing {bar.symbol} {bar.timeframe} bar to the candle store failed: {e}")
+
+    def get_bars(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> Dict[str, List]:
+        """Live bars of a symbol as columnar lists (time, open, high, low, close)"""
+        with self._lock:
+            ring = self._rings.get((symbol, timeframe))
+            if ring is None:
+                return {column: [] for column in COLUMNS}
+            return ring.columns(limit)
+
+    def subscribe(self, symbols: Optional[Iterable[str]] = None, maxsize: Optional[int] = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> QuoteSubscription:
+        """Subscribe to bar updates (every timeframe); close() the subscription when done"""
+        return self.bus.subscribe(symbols, maxsize, loop)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregation statistics"""
+        return {
+            "series": len(self._rings),
+            "ticks": self.ticks,
+            "late": self.late,
+            "barsClosed": self.bars_closed,
+            "barsStored": self.bars_stored,
+            "bus": self.bus.get_stats(),
+        }
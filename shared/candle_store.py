@@ -0,0 +1,270 @@
+"""Local SQLite store of SimpleFX candles, filled incrementally"""
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+from shared.config import Config
+from shared.sqlite_profile import open_connection
+
+logger = logging.getLogger(__name__)
+
+# Dashboard timeframe -> (SimpleFX timeframe, seconds per candle)
+TIMEFRAMES: Dict[str, Tuple[str, int]] = {
+    "1m": ("M1", 60),
+    "5m": ("M5", 5 * 60),
+    "15m": ("M15", 15 * 60),
+    "1h": ("H1", 60 * 60),
+    "4h": ("H4", 4 * 60 * 60),
+    "1d": ("D1", 24 * 60 * 60),
+}
+
+# Candles returned when no start time is given
+DEFAULT_CANDLES = 200
+
+COLUMNS = ("time", "open", "high", "low", "close")
+
+
+def resolve_timeframe(timeframe: str) -> Tuple[str, int]:
+    """Dashboard timeframe to (SimpleFX timeframe, seconds); unknown values mean 1h"""
+    return TIMEFRAMES.get(timeframe, TIMEFRAMES["1h"])
+
+
+class CandleStore:
+    """Candles per (symbol, timeframe) kept in SQLite
+
+    Only the part of a requested range that is not stored yet is fetched:
+    the tail after the newest stored candle (including that candle, which
+    may still have been forming) and any head before the oldest one. The
+    tail is re-checked at most every ``tail_refresh`` seconds, so repeated
+    chart loads are local reads. Ranges are returned as columnar lists.
+    Times are candle open times in seconds, as SimpleFX sends them.
+
+    Closed live bars (``store_candles``) go to a separate ``live_candles``
+    table. They never count as stored history, so they do not move the
+    bounds and cannot hide a gap from the fills. They are only served
+    after the newest SimpleFX candle, and are deleted once SimpleFX
+    candles cover them.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, tail_refresh: float = 5.0):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.tail_refresh = tail_refresh
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="candle-store")
+        # (symbol, timeframe) -> [oldest time, newest time] stored
+        self._bounds: Dict[Tuple[str, str], Optional[List[int]]] = {}
+        self._tail_checked: Dict[Tuple[str, str], float] = {}
+        # Earliest time already requested from SimpleFX (history may start later)
+        self._covered_from: Dict[Tuple[str, str], int] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.local_reads = 0
+        self.fetches = 0
+        self.candles_fetched = 0
+        self.fetch_errors = 0
+        self.live_candles_stored = 0
+        self.store_errors = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Open the store connection and make sure the table exists"""
+        if self._conn is None:
+            self._conn = open_connection(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS candles (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    time INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    PRIMARY KEY (symbol, timeframe, time)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS live_candles (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    time INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    PRIMARY KEY (symbol, timeframe, time)
+                ) WITHOUT ROWID
+            """)
+            self._conn.commit()
+        return self._conn
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _read_bounds(self, symbol: str, timeframe: str) -> Optional[List[int]]:
+        row = self._get_connection().execute(
+            "SELECT MIN(time), MAX(time) FROM candles WHERE symbol = ? AND timeframe = ?",
+            (symbol, timeframe)
+        ).fetchone()
+        return [row[0], row[1]] if row[0] is not None else None
+
+    def _write(self, symbol: str, timeframe: str, rows: List[tuple]) -> int:
+        """Store SimpleFX candles and drop the live candles they supersede"""
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.executemany(
+                """INSERT OR REPLACE INTO candles (symbol, timeframe, time, open, high, low, close)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [(symbol, timeframe) + tuple(row) for row in rows]
+            )
+            conn.execute(
+                "DELETE FROM live_candles WHERE symbol = ? AND timeframe = ? AND time <= ?",
+                (symbol, timeframe, max(row[0] for row in rows))
+            )
+        return cursor.rowcount
+
+    def _write_live(self, symbol: str, timeframe: str, rows: List[tuple]) -> int:
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.executemany(
+                """INSERT OR REPLACE INTO live_candles (symbol, timeframe, time, open, high, low, close)
+                   SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7
+                   WHERE NOT EXISTS (SELECT 1 FROM candles WHERE symbol = ?1 AND timeframe = ?2 AND time >= ?3)""",
+                [(symbol, timeframe) + tuple(row) for row in rows]
+            )
+        return cursor.rowcount
+
+    def _read_range(self, symbol: str, timeframe: str, start: int, end: int) -> Dict[str, List]:
+        cursor = self._get_connection().execute(
+            """SELECT time, open, high, low, close FROM candles
+               WHERE symbol = ?1 AND timeframe = ?2 AND time >= ?3 AND time <= ?4
+               UNION ALL
+               SELECT time, open, high, low, close FROM live_candles
+               WHERE symbol = ?1 AND timeframe = ?2 AND time >= ?3 AND time <= ?4
+                 AND time > COALESCE((SELECT MAX(time) FROM candles WHERE symbol = ?1 AND timeframe = ?2), -1)
+               ORDER BY time""",
+            (symbol, timeframe, start, end)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return {column: [] for column in COLUMNS}
+        return dict(zip(COLUMNS, map(list, zip(*rows))))
+
+    async def _bounds_for(self, key: Tuple[str, str]) -> Optional[List[int]]:
+        if key not in self._bounds:
+            self._bounds[key] = await self._run(self._read_bounds, *key)
+        return self._bounds[key]
+
+    async def _fetch(self, symbol: str, timeframe: str, start: int, end: int) -> int:
+        """Download [start, end] (seconds) from SimpleFX and store it"""
+        from shared.simplefx_client import get_client
+        sfx_timeframe, _ = resolve_timeframe(timeframe)
+        self.fetches += 1
+        candles = await get_client().fetch_candles(symbol, sfx_timeframe, start, end)
+        rows = [
+            (int(c["timestamp"]), float(c["open"]), float(c["high"]), float(c["low"]), float(c["close"]))
+            for c in candles
+        ]
+        if rows:
+            await self._run(self._write, symbol, timeframe, rows)
+            self.candles_fetched += len(rows)
+            times = [row[0] for row in rows]
+            bounds = self._bounds.get((symbol, timeframe))
+            if bounds is None:
+                self._bounds[(symbol, timeframe)] = [min(times), max(times)]
+            else:
+                bounds[0] = min(bounds[0], min(times))
+                bounds[1] = max(bounds[1], max(times))
+        return len(rows)
+
+    def store_candles(self, symbol: str, timeframe: str, rows: List[tuple]):
+        """Queue closed live candles for writing to ``live_candles``; does not block
+
+        Candles at or before the newest SimpleFX candle are skipped, so a
+        SimpleFX candle is never replaced.
+        """
+        if not rows:
+            return
+        future = self._executor.submit(self._write_live, symbol, timeframe, rows)
+        future.add_done_callback(self._stored)
+
+    def _stored(self, future):
+        if future.exception() is not None:
+            self.store_errors += 1
+            logger.error(f"Storing live candles failed: {future.exception()}")
+        else:
+            self.live_candles_stored += future.result()
+
+    async def _fill(self, symbol: str, timeframe: str, start: int, end: int):
+        """Fetch whatever part of [start, end] is missing locally"""
+        key = (symbol, timeframe)
+        _, step = resolve_timeframe(timeframe)
+        bounds = await self._bounds_for(key)
+        tail_due = time.monotonic() - self._tail_checked.get(key, 0.0) >= self.tail_refresh
+        if bounds is None:
+            if tail_due or start < self._covered_from.get(key, start + 1):
+                self._tail_checked[key] = time.monotonic()
+                self._covered_from[key] = start
+                await self._fetch(symbol, timeframe, start, end)
+            return
+        oldest, newest = bounds
+        if start < min(oldest, self._covered_from.get(key, oldest)):
+            self._covered_from[key] = start
+            await self._fetch(symbol, timeframe, start, oldest - step)
+        if end > newest and tail_due:
+            self._tail_checked[key] = time.monotonic()
+            await self._fetch(symbol, timeframe, newest, end)
+
+    async def get_range(self, symbol: str, timeframe: str, time_from: Optional[int] = None,
+                        time_to: Optional[int] = None) -> Dict[str, List]:
+        """Candles between time_from and time_to (milliseconds) as columnar lists
+
+        Missing candles are fetched first; if that fails, whatever is stored
+        locally is returned, or the error is raised when nothing is.
+        """
+        if timeframe not in TIMEFRAMES:
+            timeframe = "1h"
+        _, step = resolve_timeframe(timeframe)
+        end = int((time_to if time_to is not None else time.time() * 1000) / 1000)
+        start = int(time_from / 1000) if time_from is not None else end - step * DEFAULT_CANDLES
+        key = (symbol, timeframe)
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            try:
+                await self._fill(symbol, timeframe, start, end)
+            except Exception as e:
+                self.fetch_errors += 1
+                if not await self._bounds_for(key):
+                    raise
+                logger.warning(f"Serving stored {symbol} {timeframe} candles, fetch failed: {e}")
+        self.local_reads += 1
+        return await self._run(self._read_range, symbol, timeframe, start, end)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        return {
+            "series": len([b for b in self._bounds.values() if b]),
+            "localReads": self.local_reads,
+            "fetches": self.fetches,
+            "candlesFetched": self.candles_fetched,
+            "fetchErrors": self.fetch_errors,
+            "liveCandlesStored": self.live_candles_stored,
+            "storeErrors": self.store_errors,
+        }
+
+
+def columns_to_rows(columns: Dict[str, List]) -> List[Dict[str, Any]]:
+    """Columnar candles to the list of {time, open, high, low, close} the charts use"""
+    return [dict(zip(COLUMNS, values)) for values in zip(*(columns[c] for c in COLUMNS))]
+
+
+# Global instance
+_candle_store: Optional[CandleStore] = None
+
+def get_candle_store() -> CandleStore:
+    """Get global candle store"""
+    global _candle_store
+    if _candle_store is None:
+        _candle_store = CandleStore(tail_refresh=Config.CANDLE_TAIL_REFRESH)
+    return _candle_store
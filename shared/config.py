@@ -42,6 +42,20 @@ class Config:
     SIMPLEFX_API_URL = 'https://rest.simplefx.com/api/v3'
     SIMPLEFX_QUOTES_URL = 'https://web-quotes-core.simplefx.com'
     
+    # SimpleFX HTTP transport: pool limits, HTTP/2 and timeouts per endpoint class (seconds)
+    SIMPLEFX_HTTP2 = os.getenv('SIMPLEFX_HTTP2', 'true').lower() == 'true'
+    SIMPLEFX_POOL_MAX_CONNECTIONS = int(os.getenv('SIMPLEFX_POOL_MAX_CONNECTIONS', '20'))
+    SIMPLEFX_POOL_MAX_KEEPALIVE = int(os.getenv('SIMPLEFX_POOL_MAX_KEEPALIVE', '10'))
+    SIMPLEFX_KEEPALIVE_EXPIRY = float(os.getenv('SIMPLEFX_KEEPALIVE_EXPIRY', '60'))
+    SIMPLEFX_CONNECT_TIMEOUT = float(os.getenv('SIMPLEFX_CONNECT_TIMEOUT', '5'))
+    SIMPLEFX_TIMEOUT_TRADING = float(os.getenv('SIMPLEFX_TIMEOUT_TRADING', '10'))
+    SIMPLEFX_TIMEOUT_HISTORY = float(os.getenv('SIMPLEFX_TIMEOUT_HISTORY', '30'))
+    SIMPLEFX_TIMEOUT_MARKET_DATA = float(os.getenv('SIMPLEFX_TIMEOUT_MARKET_DATA', '15'))
+    SIMPLEFX_TIMEOUT_AUTH = float(os.getenv('SIMPLEFX_TIMEOUT_AUTH', '15'))
+    # Refresh the access token this many seconds before expiry, plus random jitter
+    SIMPLEFX_TOKEN_REFRESH_LEAD = float(os.getenv('SIMPLEFX_TOKEN_REFRESH_LEAD', '300'))
+    SIMPLEFX_TOKEN_REFRESH_JITTER = float(os.getenv('SIMPLEFX_TOKEN_REFRESH_JITTER', '60'))
+    
     DEFAULT_ACCOUNT_NUMBER = os.getenv('DEFAULT_ACCOUNT_NUMBER', '3028761')
     DEFAULT_ACCOUNT_NUMBER2 = os.getenv('DEFAULT_ACCOUNT_NUMBER2', '3979937')
     
@@ -54,6 +68,72 @@ class Config:
         '3048222', '3048699', '3049696'
     ]
     
+    # Order sync schedule and SimpleFX request quota shared by all sync calls
+    SYNC_INTERVAL_SECONDS = float(os.getenv('SYNC_INTERVAL_SECONDS', '600'))
+    SYNC_CONCURRENCY = int(os.getenv('SYNC_CONCURRENCY', '4'))
+    SIMPLEFX_RATE_LIMIT = float(os.getenv('SIMPLEFX_RATE_LIMIT', '5'))
+    SIMPLEFX_RATE_BURST = float(os.getenv('SIMPLEFX_RATE_BURST', '10'))
+    
+    # Active-order snapshot reuse window for pre-trade checks (seconds)
+    ACTIVE_ORDERS_SNAPSHOT_TTL = float(os.getenv('ACTIVE_ORDERS_SNAPSHOT_TTL', '2.0'))
+    
+    # Dashboard response cache TTLs per endpoint (seconds, 0 disables) and size
+    RESPONSE_CACHE_TTL_STATUS = float(os.getenv('RESPONSE_CACHE_TTL_STATUS', '5'))
+    RESPONSE_CACHE_TTL_ACTIVE = float(os.getenv('RESPONSE_CACHE_TTL_ACTIVE', '2'))
+    RESPONSE_CACHE_TTL_CLOSED = float(os.getenv('RESPONSE_CACHE_TTL_CLOSED', '15'))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1000'))
+    # Minimum seconds between checks for new candles of one symbol/timeframe
+    CANDLE_TAIL_REFRESH = float(os.getenv('CANDLE_TAIL_REFRESH', '5'))
+    
+    # Place orders for queued webhooks from the FastAPI service. Off by default:
+    # the Node service owns order execution, and enabling both executes alerts twice
+    FASTAPI_EXECUTE_WEBHOOKS = os.getenv('FASTAPI_EXECUTE_WEBHOOKS', 'false').lower() == 'true'
+    # Webhook queue workers; 0 keeps the single serial drain loop
+    WEBHOOK_QUEUE_WORKERS = int(os.getenv('WEBHOOK_QUEUE_WORKERS', '0'))
+    # Journal queued webhooks to SQLite and replay them after a restart
+    WEBHOOK_QUEUE_PERSISTENT = os.getenv('WEBHOOK_QUEUE_PERSISTENT', 'false').lower() == 'true'
+    # Webhook dedup: in-memory window, table retention, Bloom filter size (0 disables)
+    WEBHOOK_DEDUP_HOT_HOURS = int(os.getenv('WEBHOOK_DEDUP_HOT_HOURS', '24'))
+    WEBHOOK_DEDUP_RETENTION_DAYS = int(os.getenv('WEBHOOK_DEDUP_RETENTION_DAYS', '30'))
+    WEBHOOK_DEDUP_BLOOM_CAPACITY = int(os.getenv('WEBHOOK_DEDUP_BLOOM_CAPACITY', '1000000'))
+    # SQLite connection profile (shared by FastAPI, Flask and Django)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', '268435456'))
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', '256'))
+    # Threads used by the async database facade in the FastAPI service
+    DB_THREAD_POOL_SIZE = int(os.getenv('DB_THREAD_POOL_SIZE', '4'))
+    # Seconds between checks for account settings edited by other processes
+    SETTINGS_CACHE_CHECK_INTERVAL = float(os.getenv('SETTINGS_CACHE_CHECK_INTERVAL', '1.0'))
+    # Webhook outcome writer: buffered rows, rows per batch, max delay, and
+    # what to drop when the buffer is full (drop_oldest or drop_newest)
+    WEBHOOK_OUTCOME_BUFFER = int(os.getenv('WEBHOOK_OUTCOME_BUFFER', '10000'))
+    WEBHOOK_OUTCOME_BATCH = int(os.getenv('WEBHOOK_OUTCOME_BATCH', '200'))
+    WEBHOOK_OUTCOME_FLUSH_MS = int(os.getenv('WEBHOOK_OUTCOME_FLUSH_MS', '50'))
+    WEBHOOK_OUTCOME_OVERFLOW = os.getenv('WEBHOOK_OUTCOME_OVERFLOW', 'drop_oldest')
+    # Optional JSON file adding or overriding instrument specs
+    # ({"SYMBOL": {"type": "index", "tradable": true, ...}})
+    INSTRUMENT_SPECS_FILE = os.getenv('INSTRUMENT_SPECS_FILE', '')
+    # Quote book slots (max symbols) and the oldest quote a trade may use (ms)
+    QUOTE_BOOK_CAPACITY = int(os.getenv('QUOTE_BOOK_CAPACITY', '64'))
+    QUOTE_MAX_AGE_MS = int(os.getenv('QUOTE_MAX_AGE_MS', '5000'))
+    # Seconds an alert waits for a fresh quote before it is rejected
+    QUOTE_WAIT_TIMEOUT = float(os.getenv('QUOTE_WAIT_TIMEOUT', '2.0'))
+    # Max symbols pending per dashboard quote subscriber (newer quotes replace older)
+    QUOTE_SUBSCRIBER_QUEUE = int(os.getenv('QUOTE_SUBSCRIBER_QUEUE', '64'))
+    # Live OHLC bars kept in memory per symbol and timeframe
+    BAR_HISTORY = int(os.getenv('BAR_HISTORY', '500'))
+    # Flask -> FastAPI proxy: pooled connections/worker threads, read and
+    # connect timeouts (s), and the circuit breaker (failures to open, seconds open)
+    FASTAPI_PROXY_POOL_SIZE = int(os.getenv('FASTAPI_PROXY_POOL_SIZE', '10'))
+    FASTAPI_PROXY_TIMEOUT = float(os.getenv('FASTAPI_PROXY_TIMEOUT', '15'))
+    FASTAPI_PROXY_CONNECT_TIMEOUT = float(os.getenv('FASTAPI_PROXY_CONNECT_TIMEOUT', '3'))
+    FASTAPI_PROXY_BREAKER_FAILURES = int(os.getenv('FASTAPI_PROXY_BREAKER_FAILURES', '3'))
+    FASTAPI_PROXY_BREAKER_RESET = float(os.getenv('FASTAPI_PROXY_BREAKER_RESET', '15'))
+    
     STATUS_AUTH_USERNAME = os.getenv('STATUS_AUTH_USERNAME', 'admin')
     STATUS_AUTH_PASSWORD = os.getenv('STATUS_AUTH_PASSWORD', '')
     STATUS_AUTH2_USERNAME = os.getenv('STATUS_AUTH2_USERNAME', 'admin')
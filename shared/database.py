@@ -2,8 +2,69 @@
 import sqlite3
 import os
 import threading
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Union
 from shared.config import Config
+from shared.sqlite_profile import open_connection
+from shared.order_record import OrderRecord
+
+
+UPSERT_ORDER_SQL = """
+INSERT INTO sfx_historical_orders (
+    order_id, login, symbol, side, volume, open_price, close_price, take_profit, stop_loss,
+    open_time, close_time, profit, swap, commission, reality, leverage, margin, margin_rate,
+    request_id, is_fifo, ob_reference_price, real_sl_pips, real_tp_pips, bid_at_open,
+    ask_at_open, spread_at_open, consider_ob_reference, max_size, duration_in_minutes, last_update_time,
+    alert_id, maxobalert, diff_op_ob, timeframe, exchange, findObType, filterFvgs, fvgDistance, lineHeight, filterFractal
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(order_id) DO UPDATE SET
+    login = excluded.login,
+    symbol = excluded.symbol,
+    side = excluded.side,
+    volume = excluded.volume,
+    open_price = excluded.open_price,
+    close_price = COALESCE(excluded.close_price, sfx_historical_orders.close_price),
+    take_profit = COALESCE(excluded.take_profit, sfx_historical_orders.take_profit),
+    stop_loss = COALESCE(excluded.stop_loss, sfx_historical_orders.stop_loss),
+    open_time = excluded.open_time,
+    close_time = COALESCE(excluded.close_time, sfx_historical_orders.close_time),
+    profit = COALESCE(excluded.profit, sfx_historical_orders.profit),
+    swap = COALESCE(excluded.swap, sfx_historical_orders.swap),
+    commission = COALESCE(excluded.commission, sfx_historical_orders.commission),
+    reality = excluded.reality,
+    leverage = COALESCE(excluded.leverage, sfx_historical_orders.leverage),
+    margin = COALESCE(excluded.margin, sfx_historical_orders.margin),
+    margin_rate = COALESCE(excluded.margin_rate, sfx_historical_orders.margin_rate),
+    request_id = COALESCE(excluded.request_id, sfx_historical_orders.request_id),
+    is_fifo = COALESCE(excluded.is_fifo, sfx_historical_orders.is_fifo),
+    ob_reference_price = COALESCE(excluded.ob_reference_price, sfx_historical_orders.ob_reference_price),
+    real_sl_pips = COALESCE(excluded.real_sl_pips, sfx_historical_orders.real_sl_pips),
+    real_tp_pips = COALESCE(excluded.real_tp_pips, sfx_historical_orders.real_tp_pips),
+    bid_at_open = COALESCE(excluded.bid_at_open, sfx_historical_orders.bid_at_open),
+    ask_at_open = COALESCE(excluded.ask_at_open, sfx_historical_orders.ask_at_open),
+    spread_at_open = COALESCE(excluded.spread_at_open, sfx_historical_orders.spread_at_open),
+    consider_ob_reference = COALESCE(excluded.consider_ob_reference, sfx_historical_orders.consider_ob_reference),
+    max_size = COALESCE(excluded.max_size, sfx_historical_orders.max_size),
+    duration_in_minutes = COALESCE(excluded.duration_in_minutes, sfx_historical_orders.duration_in_minutes),
+    last_update_time = excluded.last_update_time,
+    alert_id = COALESCE(excluded.alert_id, sfx_historical_orders.alert_id),
+    maxobalert = COALESCE(excluded.maxobalert, sfx_historical_orders.maxobalert),
+    diff_op_ob = COALESCE(excluded.diff_op_ob, sfx_historical_orders.diff_op_ob),
+    timeframe = COALESCE(excluded.timeframe, sfx_historical_orders.timeframe),
+    exchange = COALESCE(excluded.exchange, sfx_historical_orders.exchange),
+    findObType = COALESCE(excluded.findObType, sfx_historical_orders.findObType),
+    filterFvgs = COALESCE(excluded.filterFvgs, sfx_historical_orders.filterFvgs),
+    fvgDistance = COALESCE(excluded.fvgDistance, sfx_historical_orders.fvgDistance),
+    lineHeight = COALESCE(excluded.lineHeight, sfx_historical_orders.lineHeight),
+    filterFractal = COALESCE(excluded.filterFractal, sfx_historical_orders.filterFractal)
+"""
+
+
+# Columns of account_settings that can be edited through the API
+ACCOUNT_SETTINGS_FIELDS = (
+    'trading_mode', 'asia_session', 'london_session', 'new_york_session',
+    'limbo_session', 'exclusive_mode',
+)
+TRADING_MODES = ('NORMAL', 'BUY_ONLY', 'SELL_ONLY')
 
 
 class Database:
@@ -18,11 +79,7 @@ class Database:
         """Get thread-local database connection"""
         if not hasattr(self._local, 'conn') or self._local.conn is None:
             # Enable check_same_thread=False for Flask's multi-threaded environment
-            self._local.conn = sqlite3.connect(
-                self.db_path,
-                check_same_thread=False
-            )
-            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn = open_connection(self.db_path, check_same_thread=False)
         return self._local.conn
     
     def connect(self):
@@ -59,11 +116,11 @@ class Database:
                 print(f"[ERROR] Table sfx_historical_orders does not exist")
                 return []
             
-            # Buscar login como string (SQLite converte automaticamente)
-            # CAST garante que funciona mesmo se login for INTEGER ou TEXT
+            # login is stored as TEXT (see db_schema.apply_migrations), so a
+            # plain comparison uses idx_sfx_orders_login_open_time
             query = """
                 SELECT * FROM sfx_historical_orders
-                WHERE CAST(login AS TEXT) = ?
+                WHERE login = ?
                 ORDER BY open_time DESC
                 LIMIT ?
             """
@@ -168,146 +225,62 @@ class Database:
                 print(f"Error getting recent logs: {e}")
             return []
     
-    def upsert_order(self, order_data: Dict[str, Any]) -> bool:
-        """Insert or update an order in the database (equivalent to TypeScript upsertOrder)"""
+    def _order_params(self, order: Union[OrderRecord, Dict[str, Any]], now: int) -> tuple:
+        """Derive computed columns and build the upsert parameters for one order"""
+        from shared.instrument_specs import get_instrument
+        
+        record = order if isinstance(order, OrderRecord) else OrderRecord.from_dict(order)
+        record.derive(get_instrument(record.symbol).pip_value)
+        return record.params(now)
+    
+    def upsert_orders(self, orders: Iterable[Union[OrderRecord, Dict[str, Any]]]) -> List[bool]:
+        """Insert or update many orders in one transaction; returns one result per order"""
+        import time
+        now = int(time.time() * 1000)
+        results: List[bool] = []
+        rows: List[tuple] = []
+        positions: List[int] = []
+        
+        for index, order in enumerate(orders):
+            results.append(False)
+            try:
+                rows.append(self._order_params(order, now))
+                positions.append(index)
+            except Exception as e:
+                order_id = order.order_id if isinstance(order, OrderRecord) else order.get('id')
+                print(f"[ERROR] Error preparing order {order_id}: {e}")
+        
+        if not rows:
+            return results
+        
+        conn = self._get_connection()
         try:
-            from shared.instrument_specs import get_instrument_specs
-            import time
-            
-            # Calculate duration_in_minutes
-            duration_in_minutes = None
-            if (order_data.get('openTime') and order_data.get('closeTime') and
-                order_data.get('openTime') > 0 and order_data.get('closeTime') > 0 and
-                order_data.get('closeTime') > order_data.get('openTime')):
-                duration_ms = order_data['closeTime'] - order_data['openTime']
-                duration_in_minutes = int(round(duration_ms / 60000))
-            
-            # Get pip value
-            symbol = order_data.get('symbol', 'EURUSD')
-            instrument_specs = get_instrument_specs(symbol)
-            pip_value = instrument_specs.get('pipValue', 0.0001)
-            
-            # Calculate TP and SL pips
-            real_tp_pips = order_data.get('realTpPips')
-            real_sl_pips = order_data.get('realSlPips')
-            
-            if not real_tp_pips and order_data.get('takeProfit') and order_data.get('openPrice'):
-                real_tp_pips = abs(order_data['takeProfit'] - order_data['openPrice']) / pip_value
-            
-            if not real_sl_pips and order_data.get('stopLoss') and order_data.get('openPrice'):
-                real_sl_pips = abs(order_data['stopLoss'] - order_data['openPrice']) / pip_value
-            
-            # Calculate diff_op_ob
-            diff_op_ob = None
-            if order_data.get('openPrice') and order_data.get('obReferencePrice'):
-                diff_op_ob = abs(order_data['openPrice'] - order_data['obReferencePrice']) / pip_value
-            
-            # Prepare SQL with ON CONFLICT (SQLite UPSERT)
-            sql = """
-                INSERT INTO sfx_historical_orders (
-                    order_id, login, symbol, side, volume, open_price, close_price, take_profit, stop_loss,
-                    open_time, close_time, profit, swap, commission, reality, leverage, margin, margin_rate,
-                    request_id, is_fifo, ob_reference_price, real_sl_pips, real_tp_pips, bid_at_open,
-                    ask_at_open, spread_at_open, consider_ob_reference, max_size, duration_in_minutes, last_update_time,
-                    alert_id, maxobalert, diff_op_ob, timeframe, exchange, findObType, filterFvgs, fvgDistance, lineHeight, filterFractal
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(order_id) DO UPDATE SET
-                    login = excluded.login,
-                    symbol = excluded.symbol,
-                    side = excluded.side,
-                    volume = excluded.volume,
-                    open_price = excluded.open_price,
-                    close_price = COALESCE(excluded.close_price, sfx_historical_orders.close_price),
-                    take_profit = COALESCE(excluded.take_profit, sfx_historical_orders.take_profit),
-                    stop_loss = COALESCE(excluded.stop_loss, sfx_historical_orders.stop_loss),
-                    open_time = excluded.open_time,
-                    close_time = COALESCE(excluded.close_time, sfx_historical_orders.close_time),
-                    profit = COALESCE(excluded.profit, sfx_historical_orders.profit),
-                    swap = COALESCE(excluded.swap, sfx_historical_orders.swap),
-                    commission = COALESCE(excluded.commission, sfx_historical_orders.commission),
-                    reality = excluded.reality,
-                    leverage = COALESCE(excluded.leverage, sfx_historical_orders.leverage),
-                    margin = COALESCE(excluded.margin, sfx_historical_orders.margin),
-                    margin_rate = COALESCE(excluded.margin_rate, sfx_historical_orders.margin_rate),
-                    request_id = COALESCE(excluded.request_id, sfx_historical_orders.request_id),
-                    is_fifo = COALESCE(excluded.is_fifo, sfx_historical_orders.is_fifo),
-                    ob_reference_price = COALESCE(excluded.ob_reference_price, sfx_historical_orders.ob_reference_price),
-                    real_sl_pips = COALESCE(excluded.real_sl_pips, sfx_historical_orders.real_sl_pips),
-                    real_tp_pips = COALESCE(excluded.real_tp_pips, sfx_historical_orders.real_tp_pips),
-                    bid_at_open = COALESCE(excluded.bid_at_open, sfx_historical_orders.bid_at_open),
-                    ask_at_open = COALESCE(excluded.ask_at_open, sfx_historical_orders.ask_at_open),
-                    spread_at_open = COALESCE(excluded.spread_at_open, sfx_historical_orders.spread_at_open),
-                    consider_ob_reference = COALESCE(excluded.consider_ob_reference, sfx_historical_orders.consider_ob_reference),
-                    max_size = COALESCE(excluded.max_size, sfx_historical_orders.max_size),
-                    duration_in_minutes = COALESCE(excluded.duration_in_minutes, sfx_historical_orders.duration_in_minutes),
-                    last_update_time = excluded.last_update_time,
-                    alert_id = COALESCE(excluded.alert_id, sfx_historical_orders.alert_id),
-                    maxobalert = COALESCE(excluded.maxobalert, sfx_historical_orders.maxobalert),
-                    diff_op_ob = COALESCE(excluded.diff_op_ob, sfx_historical_orders.diff_op_ob),
-                    timeframe = COALESCE(excluded.timeframe, sfx_historical_orders.timeframe),
-                    exchange = COALESCE(excluded.exchange, sfx_historical_orders.exchange),
-                    findObType = COALESCE(excluded.findObType, sfx_historical_orders.findObType),
-                    filterFvgs = COALESCE(excluded.filterFvgs, sfx_historical_orders.filterFvgs),
-                    fvgDistance = COALESCE(excluded.fvgDistance, sfx_historical_orders.fvgDistance),
-                    lineHeight = COALESCE(excluded.lineHeight, sfx_historical_orders.lineHeight),
-                    filterFractal = COALESCE(excluded.filterFractal, sfx_historical_orders.filterFractal)
-            """
-            
-            params = (
-                str(order_data.get('id', '')),
-                str(order_data.get('login', '')),
-                order_data.get('symbol', 'EURUSD'),
-                order_data.get('side', 'BUY'),
-                float(order_data.get('volume', 0)),
-                float(order_data.get('openPrice', 0)) if order_data.get('openPrice') else None,
-                float(order_data.get('closePrice', 0)) if order_data.get('closePrice') else None,
-                float(order_data.get('takeProfit', 0)) if order_data.get('takeProfit') else None,
-                float(order_data.get('stopLoss', 0)) if order_data.get('stopLoss') else None,
-                int(order_data.get('openTime', 0)) if order_data.get('openTime') else None,
-                int(order_data.get('closeTime', 0)) if order_data.get('closeTime') else None,
-                float(order_data.get('profit', 0)) if order_data.get('profit') is not None else 0,
-                float(order_data.get('swap', 0)) if order_data.get('swap') is not None else 0,
-                float(order_data.get('commission', 0)) if order_data.get('commission') is not None else 0,
-                order_data.get('reality', 'DEMO'),
-                int(order_data.get('leverage', 0)) if order_data.get('leverage') else None,
-                float(order_data.get('margin', 0)) if order_data.get('margin') else None,
-                float(order_data.get('marginRate', 0)) if order_data.get('marginRate') else None,
-                order_data.get('requestId', ''),
-                int(order_data.get('isFIFO', 0)) if order_data.get('isFIFO') else 0,
-                float(order_data.get('obReferencePrice', 0)) if order_data.get('obReferencePrice') else None,
-                float(real_sl_pips) if real_sl_pips else None,
-                float(real_tp_pips) if real_tp_pips else None,
-                float(order_data.get('bidAtOpen', 0)) if order_data.get('bidAtOpen') else None,
-                float(order_data.get('askAtOpen', 0)) if order_data.get('askAtOpen') else None,
-                float(order_data.get('spreadAtOpen', 0)) if order_data.get('spreadAtOpen') else None,
-                int(order_data.get('considerObReference', 0)) if order_data.get('considerObReference') else 0,
-                float(order_data.get('maxSize', 0)) if order_data.get('maxSize') else None,
-                duration_in_minutes,
-                int(time.time() * 1000),  # last_update_time
-                order_data.get('alertId'),
-                int(order_data.get('maxobalert', 0)) if order_data.get('maxobalert') else None,
-                float(diff_op_ob) if diff_op_ob else None,
-                order_data.get('timeframe'),
-                order_data.get('exchange', 'simplefx'),
-                order_data.get('findObType'),
-                int(order_data.get('filterFvgs', 0)) if order_data.get('filterFvgs') else 0,
-                float(order_data.get('fvgDistance', 0)) if order_data.get('fvgDistance') else None,
-                order_data.get('lineHeight'),
-                order_data.get('filterFractal'),
-            )
-            
-            cursor = self.execute(sql, params)
-            self.commit()
-            return True
+            with conn:
+                conn.executemany(UPSERT_ORDER_SQL, rows)
+            for index in positions:
+                results[index] = True
         except Exception as e:
-            print(f"[ERROR] Error upserting order {order_data.get('id')}: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-
-
-    def get_account_settings(self, login_number: str) -> Dict[str, Any]:
-        """Get account settings"""
+            # Find the offending rows: retry one by one, still in a single transaction
+            print(f"[ERROR] Batch upsert of {len(rows)} orders failed ({e}), retrying row by row")
+            with conn:
+                for index, row in zip(positions, rows):
+                    try:
+                        conn.execute(UPSERT_ORDER_SQL, row)
+                        results[index] = True
+                    except Exception as row_error:
+                        print(f"[ERROR] Error upserting order {row[0]}: {row_error}")
+        return results
+    
+    def upsert_order(self, order_data: Union[OrderRecord, Dict[str, Any]]) -> bool:
+        """Insert or update an order in the database (equivalent to TypeScript upsertOrder)"""
+        return self.upsert_orders([order_data])[0]
+    
+    def get_account_settings(self, login_number: str, strict: bool = False) -> Dict[str, Any]:
+        """Get account settings; defaults for unknown accounts
+        
+        On a read error the permissive defaults are returned, or the error
+        is raised when ``strict`` (the settings cache must not cache them).
+        """
         try:
             cursor = self.execute(
                 "SELECT * FROM account_settings WHERE login = ?",
@@ -318,33 +291,68 @@ class Database:
                 return dict(row)
             else:
                 # Return defaults
-                return {
-                    'login': login_number,
-                    'trading_mode': 'NORMAL',
-                    'asia_session': 1,
-                    'london_session': 1,
-                    'new_york_session': 1,
-                    'limbo_session': 1,
-                    'exclusive_mode': 0
-                }
+                return self._default_account_settings(login_number)
         except Exception as e:
             print(f"[ERROR] Error getting account settings: {e}")
-            return {
-                'login': login_number,
-                'trading_mode': 'NORMAL',
-                'asia_session': 1,
-                'london_session': 1,
-                'new_york_session': 1,
-                'limbo_session': 1,
-                'exclusive_mode': 0
-            }
+            if strict:
+                raise
+            return self._default_account_settings(login_number)
+    
+    @staticmethod
+    def _default_account_settings(login_number: str) -> Dict[str, Any]:
+        return {
+            'login': login_number,
+            'trading_mode': 'NORMAL',
+            'asia_session': 1,
+            'london_session': 1,
+            'new_york_session': 1,
+            'limbo_session': 1,
+            'exclusive_mode': 0
+        }
+    
+    def update_account_settings(self, login_number: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Create or update account settings; raises ValueError on invalid fields"""
+        import time
+        updates = {}
+        for field, value in settings.items():
+            if field not in ACCOUNT_SETTINGS_FIELDS:
+                continue
+            if field == 'trading_mode':
+                value = str(value).upper()
+                if value not in TRADING_MODES:
+                    raise ValueError(f"Invalid trading_mode: {value}")
+            else:
+                value = 1 if value in (1, True, '1', 'true', 'True') else 0
+            updates[field] = value
+        if not updates:
+            raise ValueError(f"No valid settings given (allowed: {', '.join(ACCOUNT_SETTINGS_FIELDS)})")
+        
+        current = self.get_account_settings(login_number, strict=True)
+        merged = {field: updates.get(field, current.get(field)) for field in ACCOUNT_SETTINGS_FIELDS}
+        self.execute(
+            """INSERT INTO account_settings (login, trading_mode, asia_session, london_session,
+                   new_york_session, limbo_session, exclusive_mode, last_updated)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(login) DO UPDATE SET
+                   trading_mode = excluded.trading_mode,
+                   asia_session = excluded.asia_session,
+                   london_session = excluded.london_session,
+                   new_york_session = excluded.new_york_session,
+                   limbo_session = excluded.limbo_session,
+                   exclusive_mode = excluded.exclusive_mode,
+                   last_updated = excluded.last_updated""",
+            (int(login_number), *(merged[field] for field in ACCOUNT_SETTINGS_FIELDS),
+             int(time.time() * 1000))
+        )
+        self.commit()
+        return self.get_account_settings(login_number)
     
     def order_exists_with_alert_id(self, alert_id: str, login_number: str) -> bool:
         """Check if order exists with alert ID"""
         try:
             cursor = self.execute(
                 "SELECT 1 FROM sfx_historical_orders WHERE alert_id = ? AND login = ? LIMIT 1",
-                (alert_id, login_number)
+                (alert_id, str(login_number))
             )
             return cursor.fetchone() is not None
         except Exception as e:
@@ -358,18 +366,96 @@ class Database:
                 """UPDATE sfx_historical_orders 
                    SET max_size = ? 
                    WHERE login = ? AND (max_size IS NULL OR max_size != ?)""",
-                (max_size, login_number, max_size)
+                (max_size, str(login_number), max_size)
             )
             self.commit()
         except Exception as e:
             print(f"[ERROR] Error updating max size: {e}")
     
+    def _ensure_sync_state_table(self):
+        """Create the per-account sync cursor table if needed"""
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS order_sync_state (
+                login TEXT PRIMARY KEY,
+                last_close_time INTEGER,
+                last_sync_at INTEGER NOT NULL
+            )
+        """)
+    
+    def get_sync_cursor(self, login_number: str) -> Optional[int]:
+        """Get the close time of the newest closed order already synced"""
+        try:
+            self._ensure_sync_state_table()
+            cursor = self.execute(
+                "SELECT last_close_time FROM order_sync_state WHERE login = ?",
+                (str(login_number),)
+            )
+            row = cursor.fetchone()
+            return row['last_close_time'] if row else None
+        except Exception as e:
+            print(f"[ERROR] Error getting sync cursor: {e}")
+            return None
+    
+    def update_sync_cursor(self, login_number: str, last_close_time: Optional[int]):
+        """Store the sync cursor for an account"""
+        try:
+            import time
+            self._ensure_sync_state_table()
+            self.execute(
+                """INSERT INTO order_sync_state (login, last_close_time, last_sync_at)
+                   VALUES (?, ?, ?)
+                   ON CONFLICT(login) DO UPDATE SET
+                       last_close_time = COALESCE(excluded.last_close_time, order_sync_state.last_close_time),
+                       last_sync_at = excluded.last_sync_at""",
+                (str(login_number), last_close_time, int(time.time() * 1000))
+            )
+            self.commit()
+        except Exception as e:
+            print(f"[ERROR] Error updating sync cursor: {e}")
+    
+    def get_order_fingerprints(self, order_ids: List[str]) -> Dict[str, tuple]:
+        """Get the mutable fields of stored orders, keyed by order_id"""
+        result: Dict[str, tuple] = {}
+        try:
+            ids = [str(order_id) for order_id in order_ids]
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self.execute(
+                    f"""SELECT order_id, close_time, close_price, profit, swap, commission,
+                               take_profit, stop_loss, volume
+                        FROM sfx_historical_orders WHERE order_id IN ({placeholders})""",
+                    tuple(chunk)
+                )
+                for row in cursor.fetchall():
+                    result[row['order_id']] = tuple(row)[1:]
+        except Exception as e:
+            print(f"[ERROR] Error getting order fingerprints: {e}")
+        return result
+    
+    def get_closed_order_profits(self, login_number: str) -> Dict[str, Tuple[int, float]]:
+        """Get (close_time, profit) of every closed order of an account, keyed by order_id"""
+        try:
+            cursor = self.execute(
+                """SELECT order_id, close_time, profit FROM sfx_historical_orders
+                   WHERE login = ? AND close_time IS NOT NULL""",
+                (str(login_number),)
+            )
+            return {
+                row['order_id']: (row['close_time'], row['profit'] or 0.0)
+                for row in cursor.fetchall()
+            }
+        except Exception as e:
+            print(f"[ERROR] Error getting closed order profits: {e}")
+            return {}
+    
     def get_orders(self, login_number: str) -> List[Dict[str, Any]]:
         """Get all orders for account"""
         try:
             cursor = self.execute(
                 "SELECT * FROM sfx_historical_orders WHERE login = ? ORDER BY open_time DESC",
-                (login_number,)
+                (str(login_number),)
             )
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
@@ -0,0 +1,132 @@
+"""Schema migrations and query-plan audit for the hot SQLite queries"""
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+from shared.database import Database, get_db
+
+logger = logging.getLogger(__name__)
+
+# (index name, table, column list)
+HOT_INDEXES: List[Tuple[str, str, str]] = [
+    ('idx_sfx_orders_login_open_time', 'sfx_historical_orders', 'login, open_time DESC'),
+    ('idx_sfx_orders_alert_login', 'sfx_historical_orders', 'alert_id, login'),
+    ('idx_webhook_outcomes_account_processed', 'webhook_outcomes', 'account_number, processed_at'),
+]
+
+# (name, table, query, sample params) - keep in sync with Database
+HOT_QUERIES: List[Tuple[str, str, str, tuple]] = [
+    ('recent_orders', 'sfx_historical_orders',
+     "SELECT * FROM sfx_historical_orders WHERE login = ? ORDER BY open_time DESC LIMIT ?",
+     ('0', 100)),
+    ('orders_by_login', 'sfx_historical_orders',
+     "SELECT * FROM sfx_historical_orders WHERE login = ? ORDER BY open_time DESC",
+     ('0',)),
+    ('closed_order_profits', 'sfx_historical_orders',
+     "SELECT order_id, profit FROM sfx_historical_orders WHERE login = ? AND close_time IS NOT NULL",
+     ('0',)),
+    ('order_exists_with_alert_id', 'sfx_historical_orders',
+     "SELECT 1 FROM sfx_historical_orders WHERE alert_id = ? AND login = ? LIMIT 1",
+     ('', '0')),
+    ('update_max_size', 'sfx_historical_orders',
+     """UPDATE sfx_historical_orders SET max_size = ?
+        WHERE login = ? AND (max_size IS NULL OR max_size != ?)""",
+     (0.0, '0', 0.0)),
+    ('webhook_outcomes', 'webhook_outcomes',
+     "SELECT * FROM webhook_outcomes WHERE account_number = ? ORDER BY processed_at DESC LIMIT ?",
+     ('0', 100)),
+    ('processed_webhook_id', 'processed_webhook_ids',
+     "SELECT 1 FROM processed_webhook_ids WHERE alert_id = ? AND account_number = ? LIMIT 1",
+     ('', '0')),
+]
+
+
+class QueryPlanError(RuntimeError):
+    """A hot query is planned as a full table scan"""
+
+
+def _existing_tables(db: Database) -> set:
+    cursor = db.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    return {row['name'] for row in cursor.fetchall()}
+
+
+def apply_migrations(db: Optional[Database] = None) -> Dict[str, Any]:
+    """Create the hot-query indexes and store every login as TEXT
+
+    Tables are owned by the Node service, so anything it has not created
+    yet is skipped.
+    """
+    db = db or get_db()
+    tables = _existing_tables(db)
+    created = []
+    normalized = 0
+
+    conn = db._get_connection()
+    with conn:
+        if 'sfx_historical_orders' in tables:
+            # Rows written by older code may hold INTEGER logins; a TEXT column
+            # compared against a TEXT parameter is what lets the index be used
+            cursor = conn.execute(
+                """UPDATE sfx_historical_orders SET login = CAST(login AS TEXT)
+                   WHERE typeof(login) != 'text' AND login IS NOT NULL"""
+            )
+            normalized = cursor.rowcount
+
+        for name, table, columns in HOT_INDEXES:
+            if table not in tables:
+                continue
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='index' AND name = ?", (name,)
+            ).fetchone()
+            if not exists:
+                conn.execute(f"CREATE INDEX {name} ON {table}({columns})")
+                created.append(name)
+
+    if created:
+        # Refresh planner statistics for the new indexes
+        conn.execute("PRAGMA optimize")
+        print(f"[DB] Created indexes: {', '.join(created)}")
+    if normalized:
+        print(f"[DB] Normalized login to TEXT on {normalized} orders")
+
+    return {"createdIndexes": created, "normalizedLogins": normalized}
+
+
+def explain(db: Database, query: str, params: tuple) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines of a query"""
+    cursor = db.execute(f"EXPLAIN QUERY PLAN {query}", params)
+    return [row['detail'] for row in cursor.fetchall()]
+
+
+def _is_full_scan(detail: str, table: str) -> bool:
+    """True for a plan step that reads the whole table without an index"""
+    words = detail.split()
+    return (len(words) >= 2 and words[0] == 'SCAN' and words[1] == table
+            and 'INDEX' not in detail)
+
+
+def check_query_plans(db: Optional[Database] = None, raise_on_scan: bool = True) -> Dict[str, List[str]]:
+    """EXPLAIN every hot query and fail if one falls back to a full table scan"""
+    db = db or get_db()
+    tables = _existing_tables(db)
+    plans: Dict[str, List[str]] = {}
+    scans = []
+
+    for name, table, query, params in HOT_QUERIES:
+        if table not in tables:
+            continue
+        plans[name] = explain(db, query, params)
+        if any(_is_full_scan(detail, table) for detail in plans[name]):
+            scans.append(name)
+
+    for name in scans:
+        print(f"[ERROR] Hot query '{name}' does a full table scan: {' | '.join(plans[name])}")
+    if scans and raise_on_scan:
+        raise QueryPlanError(f"Full table scan in hot queries: {', '.join(scans)}")
+    return plans
+
+
+def ensure_schema(db: Optional[Database] = None) -> Dict[str, Any]:
+    """Apply migrations, then audit the hot query plans"""
+    db = db or get_db()
+    result = apply_migrations(db)
+    result["queryPlans"] = check_query_plans(db)
+    return result
@@ -1,49 +1,178 @@
 """Instrument specifications for different trading symbols"""
-from typing import Dict, Any
-
-
-def get_instrument_specs(symbol: str) -> Dict[str, Any]:
-    """Get instrument specifications for a symbol"""
-    # Clean symbol from exchange prefix (e.g., "SIMPLEFX:US100" -> "US100")
-    import re
-    clean_symbol = re.sub(r"^[A-Z]+:", "", symbol).upper()
-    
-    forex_pairs = [
-        "EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "USDCAD", 
-        "NZDUSD", "EURGBP", "EURJPY", "GBPJPY"
-    ]
-    indices = [
-        "US100", "US30", "NAS100", "SPX500", "GER40", 
-        "UK100", "JPN225", "US500", "TECH100"
-    ]
-    
-    if clean_symbol in indices:
-        return {
-            "type": "index",
-            "pipValue": 1,
-            "minDistance": 20,  # points
-            "decimals": 1,
-            "minTPDistance": 20,
-            "minSLDistance": 20,
-        }
-    elif clean_symbol in forex_pairs:
-        is_jpy_pair = "JPY" in clean_symbol
-        return {
-            "type": "forex",
-            "pipValue": 0.01 if is_jpy_pair else 0.0001,
-            "minDistance": 0.1 if is_jpy_pair else 0.001,  # 10 pips minimum
-            "decimals": 3 if is_jpy_pair else 5,
-            "minTPDistance": 10,
-            "minSLDistance": 10,
-        }
-    else:
-        # Default to forex
-        return {
-            "type": "forex",
-            "pipValue": 0.0001,
-            "minDistance": 0.001,
-            "decimals": 5,
-            "minTPDistance": 10,
-            "minSLDistance": 10,
-        }
+import json
+import os
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, NamedTuple, Optional, Tuple
+import logging
+from shared.config import Config
 
+logger = logging.getLogger(__name__)
+
+# Defaults per instrument type; entries below and in the JSON file override them
+TYPE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "forex": {
+        "pipValue": 0.0001,
+        "minDistance": 0.001,  # 10 pips minimum
+        "decimals": 5,
+        "minTPDistance": 10,
+        "minSLDistance": 10,
+        "minLot": 0.01,
+    },
+    "index": {
+        "pipValue": 1,
+        "minDistance": 20,  # points
+        "decimals": 1,
+        "minTPDistance": 20,
+        "minSLDistance": 20,
+        "minLot": 0.1,
+    },
+}
+
+JPY_OVERRIDES = {"pipValue": 0.01, "minDistance": 0.1, "decimals": 3}
+
+BUILTIN_INSTRUMENTS: Dict[str, Dict[str, Any]] = {
+    "EURUSD": {"type": "forex", "tradable": True},
+    "GBPUSD": {"type": "forex", "tradable": True},
+    "USDJPY": {"type": "forex", **JPY_OVERRIDES},
+    "AUDUSD": {"type": "forex"},
+    "USDCAD": {"type": "forex"},
+    "NZDUSD": {"type": "forex"},
+    "EURGBP": {"type": "forex"},
+    "EURJPY": {"type": "forex", **JPY_OVERRIDES},
+    "GBPJPY": {"type": "forex", **JPY_OVERRIDES},
+    "US100": {"type": "index", "tradable": True},
+    "US500": {"type": "index", "tradable": True},
+    "US30": {"type": "index"},
+    "NAS100": {"type": "index"},
+    "SPX500": {"type": "index"},
+    "GER40": {"type": "index"},
+    "UK100": {"type": "index"},
+    "JPN225": {"type": "index"},
+    "TECH100": {"type": "index"},
+}
+
+
+class InstrumentSpec(NamedTuple):
+    """Immutable specification of one symbol"""
+    symbol: str
+    type: str
+    pip_value: float
+    min_distance: float
+    decimals: int
+    min_tp_distance: float
+    min_sl_distance: float
+    min_lot: float
+    tradable: bool
+    price_format: str
+    specs: Mapping[str, Any]
+
+    def round_price(self, price: float) -> float:
+        """Round a price to the instrument's precision"""
+        return round(price, self.decimals)
+
+    def format_price(self, price: float) -> str:
+        """Format a price with the instrument's number of decimals"""
+        return self.price_format.format(price)
+
+    def to_pips(self, distance: float) -> float:
+        """Convert a price distance to pips (points for indices)"""
+        return abs(distance) / self.pip_value
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Strip an exchange prefix and upper-case (e.g. "SIMPLEFX:US100" -> "US100")"""
+    return symbol.rsplit(':', 1)[-1].strip().upper()
+
+
+def _build_spec(symbol: str, entry: Dict[str, Any]) -> InstrumentSpec:
+    instrument_type = entry.get("type", "forex")
+    values = {**TYPE_DEFAULTS.get(instrument_type, TYPE_DEFAULTS["forex"]), **entry}
+    specs = {
+        "type": instrument_type,
+        "pipValue": values["pipValue"],
+        "minDistance": values["minDistance"],
+        "decimals": int(values["decimals"]),
+        "minTPDistance": values["minTPDistance"],
+        "minSLDistance": values["minSLDistance"],
+    }
+    return InstrumentSpec(
+        symbol=symbol,
+        type=instrument_type,
+        pip_value=values["pipValue"],
+        min_distance=values["minDistance"],
+        decimals=int(values["decimals"]),
+        min_tp_distance=values["minTPDistance"],
+        min_sl_distance=values["minSLDistance"],
+        min_lot=values["minLot"],
+        tradable=bool(values.get("tradable", False)),
+        price_format="{:.%df}" % int(values["decimals"]),
+        specs=MappingProxyType(specs),
+    )
+
+
+def _load_file(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Read extra or overriding instruments from a JSON file"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return {normalize_symbol(symbol): entry for symbol, entry in data.items()}
+    except (OSError, ValueError, AttributeError) as e:
+        logger.error(f"Ignoring instrument file {path}: {e}")
+        return {}
+
+
+class InstrumentRegistry:
+    """Preloaded, read-only map of normalized symbol -> InstrumentSpec"""
+
+    def __init__(self, extra_file: Optional[str] = None):
+        entries = {symbol: dict(entry) for symbol, entry in BUILTIN_INSTRUMENTS.items()}
+        for symbol, entry in _load_file(extra_file).items():
+            entries[symbol] = {**entries.get(symbol, {}), **entry}
+        self._specs: Mapping[str, InstrumentSpec] = MappingProxyType(
+            {symbol: _build_spec(symbol, entry) for symbol, entry in entries.items()}
+        )
+        self._default = _build_spec("DEFAULT", {"type": "forex"})
+        self.tradable_symbols: Tuple[str, ...] = tuple(
+            symbol for symbol, spec in self._specs.items() if spec.tradable
+        )
+
+    def get(self, symbol: str) -> InstrumentSpec:
+        """Spec for a symbol; unknown symbols get the default forex spec"""
+        spec = self._specs.get(symbol)
+        if spec is None:
+            spec = self._specs.get(normalize_symbol(symbol), self._default)
+        return spec
+
+    def is_tradable(self, symbol: str) -> bool:
+        """True if webhooks may trade the symbol"""
+        spec = self._specs.get(symbol)
+        return spec is not None and spec.tradable
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._specs
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+# Global instance
+_registry: Optional[InstrumentRegistry] = None
+
+def get_instrument_registry() -> InstrumentRegistry:
+    """Get global instrument registry"""
+    global _registry
+    if _registry is None:
+        _registry = InstrumentRegistry(Config.INSTRUMENT_SPECS_FILE)
+    return _registry
+
+
+def get_instrument(symbol: str) -> InstrumentSpec:
+    """Get the instrument spec for a symbol"""
+    return get_instrument_registry().get(symbol)
+
+
+def get_instrument_specs(symbol: str) -> Mapping[str, Any]:
+    """Get instrument specifications for a symbol (read-only mapping)"""
+    return get_instrument_registry().get(symbol).specs
@@ -0,0 +1,203 @@
+"""Typed row of sfx_historical_orders passed from the processor and sync to the database"""
+from typing import Dict, Any, Optional
+
+
+def _opt_float(value: Any) -> Optional[float]:
+    return float(value) if value else None
+
+
+def _opt_int(value: Any) -> Optional[int]:
+    return int(value) if value else None
+
+
+def _float_or_zero(value: Any) -> float:
+    return float(value) if value is not None else 0
+
+
+# from_api_order() keyword -> SimpleFX order field it overrides
+_API_OVERRIDES = {
+    'symbol': 'symbol',
+    'volume': 'volume',
+    'close_price': 'closePrice',
+    'close_time': 'closeTime',
+}
+
+
+class OrderRecord:
+    """One order with every column already coerced to its stored type
+
+    Slots follow the column order of ``UPSERT_ORDER_SQL`` (minus
+    ``last_update_time``, which is stamped at write time), so ``params``
+    is a plain attribute walk.
+    """
+
+    __slots__ = (
+        'order_id', 'login', 'symbol', 'side', 'volume', 'open_price', 'close_price',
+        'take_profit', 'stop_loss', 'open_time', 'close_time', 'profit', 'swap', 'commission',
+        'reality', 'leverage', 'margin', 'margin_rate', 'request_id', 'is_fifo',
+        'ob_reference_price', 'real_sl_pips', 'real_tp_pips', 'bid_at_open', 'ask_at_open',
+        'spread_at_open', 'consider_ob_reference', 'max_size', 'duration_in_minutes',
+        'alert_id', 'maxobalert', 'diff_op_ob', 'timeframe', 'exchange', 'find_ob_type',
+        'filter_fvgs', 'fvg_distance', 'line_height', 'filter_fractal',
+    )
+
+    def __init__(self, order_id: str, login: str, symbol: str = 'EURUSD', side: str = 'BUY',
+                 volume: float = 0.0, open_price: Optional[float] = None,
+                 close_price: Optional[float] = None, take_profit: Optional[float] = None,
+                 stop_loss: Optional[float] = None, open_time: Optional[int] = None,
+                 close_time: Optional[int] = None, profit: float = 0, swap: float = 0,
+                 commission: float = 0, reality: str = 'DEMO', leverage: Optional[int] = None,
+                 margin: Optional[float] = None, margin_rate: Optional[float] = None,
+                 request_id: str = '', is_fifo: int = 0, ob_reference_price: Optional[float] = None,
+                 real_sl_pips: Optional[float] = None, real_tp_pips: Optional[float] = None,
+                 bid_at_open: Optional[float] = None, ask_at_open: Optional[float] = None,
+                 spread_at_open: Optional[float] = None, consider_ob_reference: int = 0,
+                 max_size: Optional[float] = None, duration_in_minutes: Optional[int] = None,
+                 alert_id: Optional[str] = None, maxobalert: Optional[int] = None,
+                 diff_op_ob: Optional[float] = None, timeframe: Optional[str] = None,
+                 exchange: str = 'simplefx', find_ob_type: Optional[str] = None,
+                 filter_fvgs: int = 0, fvg_distance: Optional[float] = None,
+                 line_height: Optional[str] = None, filter_fractal: Optional[str] = None):
+        self.order_id = order_id
+        self.login = login
+        self.symbol = symbol
+        self.side = side
+        self.volume = volume
+        self.open_price = open_price
+        self.close_price = close_price
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.open_time = open_time
+        self.close_time = close_time
+        self.profit = profit
+        self.swap = swap
+        self.commission = commission
+        self.reality = reality
+        self.leverage = leverage
+        self.margin = margin
+        self.margin_rate = margin_rate
+        self.request_id = request_id
+        self.is_fifo = is_fifo
+        self.ob_reference_price = ob_reference_price
+        self.real_sl_pips = real_sl_pips
+        self.real_tp_pips = real_tp_pips
+        self.bid_at_open = bid_at_open
+        self.ask_at_open = ask_at_open
+        self.spread_at_open = spread_at_open
+        self.consider_ob_reference = consider_ob_reference
+        self.max_size = max_size
+        self.duration_in_minutes = duration_in_minutes
+        self.alert_id = alert_id
+        self.maxobalert = maxobalert
+        self.diff_op_ob = diff_op_ob
+        self.timeframe = timeframe
+        self.exchange = exchange
+        self.find_ob_type = find_ob_type
+        self.filter_fvgs = filter_fvgs
+        self.fvg_distance = fvg_distance
+        self.line_height = line_height
+        self.filter_fractal = filter_fractal
+
+    @classmethod
+    def from_api_order(cls, api_order: Dict[str, Any], login: str, reality: str,
+                       **extra) -> 'OrderRecord':
+        """Build a record from a SimpleFX order; ``extra`` sets alert/quote columns
+
+        ``extra`` may also override symbol, volume, close_price and
+        close_time; those are coerced the same way as the API values.
+        """
+        overrides = {key: extra.pop(name) for name, key in _API_OVERRIDES.items() if name in extra}
+        get = {**api_order, **overrides}.get if overrides else api_order.get
+        return cls(
+            order_id=str(get('id', '')),
+            login=str(login),
+            symbol=get('symbol', 'EURUSD'),
+            side=get('side', 'BUY'),
+            volume=float(get('volume', 0) or 0),
+            open_price=_opt_float(get('openPrice')),
+            close_price=_opt_float(get('closePrice')),
+            take_profit=_opt_float(get('takeProfit')),
+            stop_loss=_opt_float(get('stopLoss')),
+            open_time=_opt_int(get('openTime')),
+            close_time=_opt_int(get('closeTime')),
+            profit=_float_or_zero(get('profit', 0)),
+            swap=_float_or_zero(get('swaps', 0)),
+            commission=_float_or_zero(get('commission', 0)),
+            reality=reality,
+            leverage=_opt_int(get('leverage')),
+            margin=_opt_float(get('margin')),
+            margin_rate=_opt_float(get('marginRate')),
+            request_id=get('requestId', ''),
+            is_fifo=1 if get('isFIFO') else 0,
+            **extra
+        )
+
+    @classmethod
+    def from_dict(cls, order_data: Dict[str, Any]) -> 'OrderRecord':
+        """Build a record from the camelCase dict accepted by ``upsert_order``"""
+        get = order_data.get
+        return cls(
+            order_id=str(get('id', '')),
+            login=str(get('login', '')),
+            symbol=get('symbol', 'EURUSD'),
+            side=get('side', 'BUY'),
+            volume=float(get('volume', 0)),
+            open_price=_opt_float(get('openPrice')),
+            close_price=_opt_float(get('closePrice')),
+            take_profit=_opt_float(get('takeProfit')),
+            stop_loss=_opt_float(get('stopLoss')),
+            open_time=_opt_int(get('openTime')),
+            close_time=_opt_int(get('closeTime')),
+            profit=_float_or_zero(get('profit')),
+            swap=_float_or_zero(get('swap')),
+            commission=_float_or_zero(get('commission')),
+            reality=get('reality', 'DEMO'),
+            leverage=_opt_int(get('leverage')),
+            margin=_opt_float(get('margin')),
+            margin_rate=_opt_float(get('marginRate')),
+            request_id=get('requestId', ''),
+            is_fifo=_opt_int(get('isFIFO')) or 0,
+            ob_reference_price=_opt_float(get('obReferencePrice')),
+            real_sl_pips=_opt_float(get('realSlPips')),
+            real_tp_pips=_opt_float(get('realTpPips')),
+            bid_at_open=_opt_float(get('bidAtOpen')),
+            ask_at_open=_opt_float(get('askAtOpen')),
+            spread_at_open=_opt_float(get('spreadAtOpen')),
+            consider_ob_reference=_opt_int(get('considerObReference')) or 0,
+            max_size=_opt_float(get('maxSize')),
+            alert_id=get('alertId'),
+            maxobalert=_opt_int(get('maxobalert')),
+            timeframe=get('timeframe'),
+            exchange=get('exchange', 'simplefx'),
+            find_ob_type=get('findObType'),
+            filter_fvgs=_opt_int(get('filterFvgs')) or 0,
+            fvg_distance=_opt_float(get('fvgDistance')),
+            line_height=get('lineHeight'),
+            filter_fractal=get('filterFractal'),
+        )
+
+    def derive(self, pip_value: float):
+        """Fill duration, TP/SL distance in pips and open-to-OB distance"""
+        if self.open_time and self.close_time and self.open_time > 0 and self.close_time > self.open_time:
+            self.duration_in_minutes = int(round((self.close_time - self.open_time) / 60000))
+        if self.open_price:
+            if not self.real_tp_pips and self.take_profit:
+                self.real_tp_pips = abs(self.take_profit - self.open_price) / pip_value or None
+            if not self.real_sl_pips and self.stop_loss:
+                self.real_sl_pips = abs(self.stop_loss - self.open_price) / pip_value or None
+            if self.ob_reference_price:
+                self.diff_op_ob = abs(self.open_price - self.ob_reference_price) / pip_value or None
+
+    def params(self, now: int) -> tuple:
+        """Parameters for UPSERT_ORDER_SQL"""
+        return (
+            self.order_id, self.login, self.symbol, self.side, self.volume, self.open_price,
+            self.close_price, self.take_profit, self.stop_loss, self.open_time, self.close_time,
+            self.profit, self.swap, self.commission, self.reality, self.leverage, self.margin,
+            self.margin_rate, self.request_id, self.is_fifo, self.ob_reference_price,
+            self.real_sl_pips, self.real_tp_pips, self.bid_at_open, self.ask_at_open,
+            self.spread_at_open, self.consider_ob_reference, self.max_size,
+            self.duration_in_minutes, now, self.alert_id, self.maxobalert, self.diff_op_ob,
+            self.timeframe, self.exchange, self.find_ob_type, self.filter_fvgs,
+            self.fvg_distance, self.line_height, self.filter_fractal,
+        )
@@ -0,0 +1,148 @@
+"""Per-account snapshot of active orders shared by pre-trade checks"""
+import asyncio
+import time
+from typing import Dict, Any, List, Optional
+import logging
+from shared.config import Config
+from shared.simplefx_client import get_client
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveOrderSnapshot:
+    """Active orders of one account at a point in time"""
+
+    def __init__(self, login: str, orders: List[Dict[str, Any]]):
+        self.login = login
+        self.orders = orders
+        self.fetched_at = time.monotonic()
+        self._recount()
+
+    def _recount(self):
+        """Recompute aggregates from the order list"""
+        self.total_volume = 0.0
+        self.buy_count = 0
+        self.sell_count = 0
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self.unrealized_pnl = 0.0
+        for order in self.orders:
+            volume = order.get('volume', 0) or 0
+            self.total_volume += volume
+            self.unrealized_pnl += float(order.get('profit', 0) or 0)
+            side = (order.get('side') or '').upper()
+            if side == 'BUY':
+                self.buy_count += 1
+                self.buy_volume += float(volume)
+            elif side == 'SELL':
+                self.sell_count += 1
+                self.sell_volume += float(volume)
+
+    @property
+    def count(self) -> int:
+        return len(self.orders)
+
+    def age(self) -> float:
+        """Seconds since the snapshot was fetched"""
+        return time.monotonic() - self.fetched_at
+
+    def count_by_side(self, side: str) -> int:
+        """Count orders for a side ('B'/'BUY' or 'S'/'SELL')"""
+        return self.buy_count if side.upper() in ('B', 'BUY') else self.sell_count
+
+    def add_order(self, order: Dict[str, Any]):
+        """Apply a freshly placed order in place"""
+        order_id = order.get('id')
+        if order_id is not None and any(o.get('id') == order_id for o in self.orders):
+            return
+        self.orders.append(order)
+        self._recount()
+
+
+class ActiveOrderSnapshotStore:
+    """Caches one active-order snapshot per account for a short TTL"""
+
+    def __init__(self, ttl: float = 2.0):
+        self.ttl = ttl
+        self._snapshots: Dict[str, ActiveOrderSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.refreshes = 0
+
+    def _get_lock(self, login: str) -> asyncio.Lock:
+        if login not in self._locks:
+            self._locks[login] = asyncio.Lock()
+        return self._locks[login]
+
+    async def get(self, login: str, force_refresh: bool = False) -> ActiveOrderSnapshot:
+        """Get snapshot for account, refreshing it if missing or older than TTL"""
+        snapshot = self._snapshots.get(login)
+        if not force_refresh and snapshot and snapshot.age() < self.ttl:
+            self.hits += 1
+            return snapshot
+
+        # Concurrent callers for the same account share a single fetch
+        async with self._get_lock(login):
+            snapshot = self._snapshots.get(login)
+            if not force_refresh and snapshot and snapshot.age() < self.ttl:
+                self.hits += 1
+                return snapshot
+            return await self.refresh(login)
+
+    def peek(self, login: str) -> Optional[ActiveOrderSnapshot]:
+        """Get the snapshot for account if younger than TTL, without fetching"""
+        snapshot = self._snapshots.get(login)
+        if snapshot and snapshot.age() < self.ttl:
+            self.hits += 1
+            return snapshot
+        return None
+
+    async def refresh(self, login: str) -> ActiveOrderSnapshot:
+        """Fetch active orders from the API and replace the snapshot"""
+        client = get_client()
+        reality = "LIVE" if Config.is_live_account(login) else "DEMO"
+        use_secondary = Config.should_use_secondary_api(login)
+
+        active_data = await client.get_active_orders(login, reality, use_secondary, 1, 1000)
+        orders = list(active_data.get('data', {}).get('marketOrders', []))
+        self.refreshes += 1
+        return self.replace(login, orders)
+
+    def replace(self, login: str, orders: List[Dict[str, Any]]) -> ActiveOrderSnapshot:
+        """Store a complete active-order list fetched elsewhere (e.g. by sync)"""
+        snapshot = ActiveOrderSnapshot(login, list(orders))
+        self._snapshots[login] = snapshot
+        return snapshot
+
+    def apply_placed_order(self, login: str, order: Dict[str, Any]):
+        """Update the cached snapshot with an order returned by place_trade"""
+        snapshot = self._snapshots.get(login)
+        if snapshot:
+            snapshot.add_order(order)
+
+    def invalidate(self, login: Optional[str] = None):
+        """Drop the snapshot for one account, or all snapshots"""
+        if login is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(login, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            "accounts": len(self._snapshots),
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+        }
+
+
+# Global instance
+_snapshot_store: Optional[ActiveOrderSnapshotStore] = None
+
+def get_order_snapshot_store() -> ActiveOrderSnapshotStore:
+    """Get global active-order snapshot store"""
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = ActiveOrderSnapshotStore(ttl=Config.ACTIVE_ORDERS_SNAPSHOT_TTL)
+    return _snapshot_store
@@ -0,0 +1,248 @@
+"""Incremental order sync from SimpleFX into the local database"""
+import asyncio
+import random
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import logging
+from shared.config import Config
+from shared.simplefx_client import get_client
+from shared.async_database import get_async_db
+from shared.order_snapshot import get_order_snapshot_store
+from shared.account_overview import get_overview_store
+from shared.rate_limiter import get_rate_limiter
+from shared.order_record import OrderRecord
+
+logger = logging.getLogger(__name__)
+
+PAGE_LIMIT = 1000
+MAX_PAGES = 500
+PAGE_TIMEOUT = 30.0
+# Re-read this much history before the cursor to catch late broker updates
+CURSOR_OVERLAP_MS = 60 * 60 * 1000
+
+
+def _fingerprint(close_time, close_price, profit, swap, commission,
+                 take_profit, stop_loss, volume) -> tuple:
+    """Normalize the mutable fields of an order the way they are stored"""
+    def optional(value):
+        return round(float(value), 8) if value else None
+
+    def number(value):
+        return round(float(value or 0), 8)
+
+    return (
+        int(close_time) if close_time else None,
+        optional(close_price),
+        number(profit),
+        number(swap),
+        number(commission),
+        optional(take_profit),
+        optional(stop_loss),
+        number(volume),
+    )
+
+
+def _order_fingerprint(record: OrderRecord) -> tuple:
+    return _fingerprint(
+        record.close_time, record.close_price, record.profit, record.swap,
+        record.commission, record.take_profit, record.stop_loss, record.volume,
+    )
+
+
+async def fetch_all_pages(fetch_page: Callable[[int], Awaitable[Dict[str, Any]]],
+                          limit: int = PAGE_LIMIT) -> List[Dict[str, Any]]:
+    """Fetch pages until a short page is returned"""
+    orders: List[Dict[str, Any]] = []
+    limiter = get_rate_limiter()
+    for page in range(1, MAX_PAGES + 1):
+        await limiter.acquire()
+        data = await asyncio.wait_for(fetch_page(page), timeout=PAGE_TIMEOUT)
+        page_orders = data.get('data', {}).get('marketOrders', [])
+        orders.extend(page_orders)
+        if len(page_orders) < limit:
+            break
+    else:
+        logger.warning(f"Stopped paging after {MAX_PAGES} pages")
+    return orders
+
+
+async def sync_account_orders(login_number: str, reality: Optional[str] = None,
+                              use_secondary_api: bool = False, full: bool = False) -> Dict[str, Any]:
+    """Sync active orders and closed orders newer than the account cursor
+
+    Closed history is requested from ``last_close_time`` (minus an overlap)
+    instead of the default 180-day window, every page is read, and only
+    orders that are new or whose mutable fields changed are upserted.
+    ``full=True`` ignores the cursor.
+    """
+    if reality is None:
+        reality = "LIVE" if Config.is_live_account(login_number) else "DEMO"
+
+    client = get_client()
+    db = get_async_db()
+
+    cursor = None if full else await db.get_sync_cursor(login_number)
+    time_from = cursor - CURSOR_OVERLAP_MS if cursor else None
+
+    active_orders = await fetch_all_pages(
+        lambda page: client.get_active_orders(login_number, reality, use_secondary_api, page, PAGE_LIMIT)
+    )
+    closed_orders = await fetch_all_pages(
+        lambda page: client.get_closed_orders(
+            login_number, reality, use_secondary_api, page, PAGE_LIMIT, time_from
+        )
+    )
+    all_orders = active_orders + closed_orders
+
+    order_rows = [OrderRecord.from_api_order(o, login_number, reality) for o in all_orders]
+    stored = await db.get_order_fingerprints([row.order_id for row in order_rows])
+    changed_rows = [
+        row for row in order_rows
+        if row.order_id not in stored or _fingerprint(*stored[row.order_id]) != _order_fingerprint(row)
+    ]
+
+    # One transaction per page of rows
+    synced = 0
+    errors = []
+    failed_close_times = []
+    for start in range(0, len(changed_rows), PAGE_LIMIT):
+        chunk = changed_rows[start:start + PAGE_LIMIT]
+        for record, ok in zip(chunk, await db.upsert_orders(chunk)):
+            if ok:
+                synced += 1
+            else:
+                errors.append(f"Order {record.order_id}: upsert failed")
+                if record.close_time:
+                    failed_close_times.append(record.close_time)
+
+    close_times = [o.get('closeTime') for o in closed_orders if o.get('closeTime')]
+    new_cursor = max(close_times + ([cursor] if cursor else [])) if close_times or cursor else None
+    # Keep closed orders that failed to upsert in the next sync window
+    if failed_close_times:
+        new_cursor = min(new_cursor, min(failed_close_times))
+    await db.update_sync_cursor(login_number, new_cursor)
+
+    # Sync read every active order, so it doubles as a fresh snapshot; closed
+    # orders that changed feed the running realized P&L
+    get_order_snapshot_store().replace(login_number, active_orders)
+    await get_overview_store().apply_closed_orders(login_number, changed_rows)
+
+    return {
+        "synced": synced,
+        "total": len(all_orders),
+        "unchanged": len(order_rows) - len(changed_rows),
+        "activeOrders": len(active_orders),
+        "closedOrders": len(closed_orders),
+        "cursor": new_cursor,
+        "errors": errors,
+    }
+
+
+class AccountSyncState:
+    """Schedule and backoff state of one account"""
+
+    def __init__(self, login: str):
+        self.login = login
+        self.next_attempt_at = 0.0
+        self.failures = 0
+        self.open_positions = 0
+        self.last_success_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class SyncScheduler:
+    """Syncs accounts concurrently, each on its own schedule and backoff
+
+    API calls share the global token bucket, so concurrency is bounded by the
+    SimpleFX quota rather than by fixed sleeps. Due accounts with open
+    positions are synced first.
+    """
+
+    def __init__(self, interval: float, concurrency: int, base_backoff: float = 30.0,
+                 max_backoff: float = 600.0):
+        self.interval = interval
+        self.concurrency = max(1, concurrency)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.states: Dict[str, AccountSyncState] = {}
+
+    def _get_state(self, login: str) -> AccountSyncState:
+        if login not in self.states:
+            self.states[login] = AccountSyncState(login)
+        return self.states[login]
+
+    async def _sync_one(self, state: AccountSyncState, semaphore: asyncio.Semaphore):
+        """Sync one account and update its schedule"""
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                result = await sync_account_orders(state.login)
+                state.failures = 0
+                state.last_error = None
+                state.open_positions = result['activeOrders']
+                state.last_success_at = time.time()
+                state.next_attempt_at = time.monotonic() + self.interval
+                errors = result['errors']
+                for error in errors[:5]:
+                    print(f"[SYNC ERROR] {error}")
+                print(f"[SYNC] Account {state.login}: {result['synced']} new/changed of "
+                      f"{result['total']} orders fetched" +
+                      (f" ({len(errors)} errors)" if errors else ""))
+            except Exception as e:
+                state.failures += 1
+                state.last_error = str(e) or type(e).__name__
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (state.failures - 1))
+                if "409" in state.last_error or "Conflict" in state.last_error:
+                    backoff = min(self.max_backoff, backoff * 2)
+                backoff *= random.uniform(1.0, 1.2)
+                state.next_attempt_at = time.monotonic() + backoff
+                print(f"[SYNC ERROR] Account {state.login} (failure {state.failures}): "
+                      f"{state.last_error} - retrying in {int(backoff)}s")
+            finally:
+                state.last_duration = time.monotonic() - started
+
+    async def run_due(self, accounts: List[str]) -> int:
+        """Sync every account whose next attempt is due; returns how many ran"""
+        now = time.monotonic()
+        due = [self._get_state(login) for login in accounts
+               if self._get_state(login).next_attempt_at <= now]
+        if not due:
+            return 0
+        due.sort(key=lambda state: (-state.open_positions, state.last_success_at or 0))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._sync_one(state, semaphore) for state in due))
+        return len(due)
+
+    def seconds_until_next(self, accounts: List[str]) -> float:
+        """Seconds until the earliest account is due"""
+        if not accounts:
+            return self.interval
+        now = time.monotonic()
+        return max(0.0, min(self._get_state(login).next_attempt_at for login in accounts) - now)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-account sync state"""
+        now = time.monotonic()
+        return {
+            login: {
+                "failures": state.failures,
+                "openPositions": state.open_positions,
+                "lastSuccessAt": state.last_success_at,
+                "lastDurationSeconds": round(state.last_duration, 3) if state.last_duration else None,
+                "nextAttemptInSeconds": max(0, int(state.next_attempt_at - now)),
+                "lastError": state.last_error,
+            }
+            for login, state in self.states.items()
+        }
+
+
+# Global instance
+_sync_scheduler: Optional[SyncScheduler] = None
+
+def get_sync_scheduler() -> SyncScheduler:
+    """Get global sync scheduler"""
+    global _sync_scheduler
+    if _sync_scheduler is None:
+        _sync_scheduler = SyncScheduler(Config.SYNC_INTERVAL_SECONDS, Config.SYNC_CONCURRENCY)
+    return _sync_scheduler
@@ -0,0 +1,175 @@
+"""Fixed-slot book of the latest bid/ask per symbol"""
+import math
+import threading
+import time
+from array import array
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional
+
+
+class Quote(NamedTuple):
+    """Consistent copy of one symbol's slot"""
+    symbol: str
+    bid: float
+    ask: float
+    timestamp: int
+    received_at: int
+    seq: int
+
+    def age_ms(self, now_ms: Optional[int] = None) -> int:
+        """Milliseconds since the quote was received"""
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        return now_ms - self.received_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Legacy quote dict ({'bid', 'ask', 'timestamp'}) plus seq and receive time"""
+        return {
+            'bid': self.bid,
+            'ask': self.ask,
+            'timestamp': self.timestamp,
+            'receivedAt': self.received_at,
+            'seq': self.seq,
+        }
+
+
+class QuoteBook:
+    """Latest quote per symbol in preallocated array slots
+
+    Each symbol owns one index into parallel ``array`` columns (bid, ask,
+    exchange timestamp, receive timestamp, sequence). There is one writer at
+    a time (the quote websocket); readers in any thread never take a lock.
+    Consistency is a seqlock: the writer makes a slot's version odd while it
+    updates the columns and even again afterwards, and a reader retries when
+    the version was odd or changed under it. A book-wide version does the
+    same for whole-book snapshots.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._slots: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._bid = array('d', [0.0]) * capacity
+        self._ask = array('d', [0.0]) * capacity
+        self._ts = array('q', [0]) * capacity
+        self._recv = array('q', [0]) * capacity
+        self._seq = array('q', [0]) * capacity
+        self._version = array('q', [0]) * capacity
+        self._book_version = 0
+        self._next_seq = 0
+        self._write_lock = threading.Lock()
+        self.applied = 0
+        self.out_of_order = 0
+        self.rejected = 0
+
+    def _slot(self, symbol: str) -> Optional[int]:
+        slot = self._slots.get(symbol)
+        if slot is None and len(self._symbols) < self.capacity:
+            slot = len(self._symbols)
+            self._symbols.append(symbol)
+            # Publish the slot last so readers never see a half-added symbol
+            self._slots[symbol] = slot
+        return slot
+
+    def apply(self, entries: Iterable[Dict[str, Any]], received_at: Optional[int] = None) -> List[Quote]:
+        """Apply every quote in a batch; returns the quotes that were stored
+
+        Entries use the SimpleFX short keys (``s``, ``b``, ``a``, ``t``).
+        Entries without a numeric bid/ask (or with a bad timestamp) are counted
+        as rejected; entries older than the stored quote are skipped.
+        """
+        if received_at is None:
+            received_at = int(time.time() * 1000)
+        stored: List[Quote] = []
+        with self._write_lock:
+            self._book_version += 1
+            try:
+                for entry in entries:
+                    symbol = entry.get('s')
+                    # Coerce before touching a slot version, so a malformed
+                    # entry can never leave a version odd
+                    try:
+                        bid = float(entry['b'])
+                        ask = float(entry['a'])
+                        timestamp = int(entry.get('t') or received_at)
+                    except (KeyError, TypeError, ValueError, OverflowError):
+                        self.rejected += 1
+                        continue
+                    if not (math.isfinite(bid) and math.isfinite(ask) and 0 <= timestamp < 1 << 63):
+                        self.rejected += 1
+                        continue
+                    if not symbol or not isinstance(symbol, str):
+                        self.rejected += 1
+                        continue
+                    slot = self._slot(symbol)
+                    if slot is None:
+                        self.rejected += 1
+                        continue
+                    if timestamp < self._ts[slot]:
+                        self.out_of_order += 1
+                        continue
+                    self._next_seq += 1
+                    self._version[slot] += 1
+                    try:
+                        self._bid[slot] = bid
+                        self._ask[slot] = ask
+                        self._ts[slot] = timestamp
+                        self._recv[slot] = received_at
+                        self._seq[slot] = self._next_seq
+                    finally:
+                        self._version[slot] += 1
+                    self.applied += 1
+                    stored.append(Quote(symbol, bid, ask, timestamp,
+                                        received_at, self._next_seq))
+            finally:
+                self._book_version += 1
+        return stored
+
+    def _read(self, symbol: str, slot: int) -> Optional[Quote]:
+        while True:
+            version = self._version[slot]
+            if version & 1:
+                time.sleep(0)  # writer mid-update; yield the GIL
+                continue
+            quote = Quote(symbol, self._bid[slot], self._ask[slot], self._ts[slot],
+                          self._recv[slot], self._seq[slot])
+            if self._version[slot] == version:
+                return quote if version else None
+
+    def get(self, symbol: str) -> Optional[Quote]:
+        """Latest quote for a symbol, or None if none was received"""
+        slot = self._slots.get(symbol)
+        if slot is None:
+            return None
+        return self._read(symbol, slot)
+
+    def snapshot(self) -> Dict[str, Quote]:
+        """Latest quote of every symbol, all taken between the same two batches"""
+        while True:
+            version = self._book_version
+            if version & 1:
+                time.sleep(0)
+                continue
+            symbols = list(self._slots.items())
+            quotes = {}
+            for symbol, slot in symbols:
+                quote = self._read(symbol, slot)
+                if quote is not None:
+                    quotes[symbol] = quote
+            if self._book_version == version:
+                return quotes
+
+    @property
+    def symbols(self) -> List[str]:
+        """Symbols that have a slot"""
+        return list(self._slots)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get book statistics"""
+        return {
+            "symbols": len(self._slots),
+            "capacity": self.capacity,
+            "seq": self._next_seq,
+            "applied": self.applied,
+            "outOfOrder": self.out_of_order,
+            "rejected": self.rejected,
+        }
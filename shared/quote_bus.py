@@ -0,0 +1,180 @@
+"""Fan-out of quote updates to dashboard subscribers"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, Iterable, List, Optional, Tuple
+import logging
+from shared.quote_book import Quote
+
+logger = logging.getLogger(__name__)
+
+
+def _symbol_key(quote: Quote) -> str:
+    return quote.symbol
+
+
+class QuoteSubscription:
+    """Bounded, conflating queue of quotes for one consumer
+
+    Pending quotes are kept per symbol: a newer quote replaces the pending
+    one for the same symbol (conflation), so a slow consumer always gets the
+    latest price instead of a backlog. At most ``maxsize`` symbols are
+    pending; past that the oldest pending symbol is dropped. Buses with a
+    custom ``key`` conflate on that key instead of the symbol. Consumers can
+    block from a thread (``get_batch``) or await from an event loop
+    (``get_batch_async``, pass ``loop`` when subscribing).
+    """
+
+    def __init__(self, bus: 'QuoteBus', symbols: Optional[Iterable[str]] = None,
+                 maxsize: int = 64, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._bus = bus
+        self.symbols = frozenset(symbols) if symbols else None
+        self.maxsize = maxsize
+        self._key = bus.key
+        self._pending: "OrderedDict[Hashable, Quote]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._loop = loop
+        self._event = asyncio.Event() if loop else None
+        self.closed = False
+        self.delivered = 0
+        self.conflated = 0
+        self.dropped = 0
+
+    def offer(self, quote: Quote):
+        """Queue a quote (called by the bus)"""
+        key = self._key(quote)
+        with self._cond:
+            if key in self._pending:
+                del self._pending[key]
+                self.conflated += 1
+            elif len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = quote
+            was_empty = len(self._pending) == 1
+            self._cond.notify()
+        if was_empty and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                # Consumer loop is closed; it will never read again
+                self.close()
+
+    def drain(self) -> List[Quote]:
+        """Take every pending quote without waiting"""
+        with self._cond:
+            quotes = list(self._pending.values())
+            self._pending.clear()
+            if self._event is not None:
+                self._event.clear()
+        self.delivered += len(quotes)
+        return quotes
+
+    def get_batch(self, timeout: Optional[float] = None) -> List[Quote]:
+        """Block until quotes are pending (or timeout); returns them"""
+        with self._cond:
+            if not self._pending and not self.closed:
+                self._cond.wait(timeout)
+        return self.drain()
+
+    async def get_batch_async(self) -> List[Quote]:
+        """Wait on the subscription's loop until quotes are pending; returns them"""
+        while True:
+            quotes = self.drain()
+            if quotes or self.closed:
+                return quotes
+            await self._event.wait()
+
+    def close(self):
+        """Unsubscribe and wake any waiting consumer"""
+        if self.closed:
+            return
+        self.closed = True
+        self._bus.unsubscribe(self)
+        with self._cond:
+            self._cond.notify_all()
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                pass
+
+
+class QuoteBus:
+    """Publishes each batch of stored quotes to every subscription
+
+    The subscriber list is copy-on-write, so ``publish`` never holds a lock
+    while fanning out. Fan-out time is measured per published tick. Any
+    item with a ``symbol`` can be published; ``key`` picks what pending
+    items are conflated on (the symbol by default).
+    """
+
+    def __init__(self, default_maxsize: int = 64, key: Optional[Callable[[Any], Hashable]] = None):
+        self.default_maxsize = default_maxsize
+        self.key = key or _symbol_key
+        self._subscribers: Tuple[QuoteSubscription, ...] = ()
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.quotes = 0
+        self.fanout_ns_total = 0
+        self.fanout_ns_max = 0
+        self.fanout_ns_last = 0
+        self.errors = 0
+        # Counters of subscriptions that have since unsubscribed
+        self._retired = {"delivered": 0, "conflated": 0, "dropped": 0}
+
+    def subscribe(self, symbols: Optional[Iterable[str]] = None, maxsize: Optional[int] = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> QuoteSubscription:
+        """Subscribe to all symbols, or only to ``symbols``"""
+        subscription = QuoteSubscription(self, symbols, maxsize or self.default_maxsize, loop)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: QuoteSubscription):
+        """Remove a subscription; safe to call more than once"""
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+            self._retired["delivered"] += subscription.delivered
+            self._retired["conflated"] += subscription.conflated
+            self._retired["dropped"] += subscription.dropped
+
+    def publish(self, quotes: List[Quote]):
+        """Offer a batch of quotes to every interested subscription"""
+        if not quotes:
+            return
+        start = time.perf_counter_ns()
+        for subscription in self._subscribers:
+            for quote in quotes:
+                if subscription.symbols is None or quote.symbol in subscription.symbols:
+                    try:
+                        subscription.offer(quote)
+                    except Exception as e:
+                        self.errors += 1
+                        logger.error(f"Quote fan-out failed: {e}")
+        elapsed = time.perf_counter_ns() - start
+        self.ticks += 1
+        self.quotes += len(quotes)
+        self.fanout_ns_total += elapsed
+        self.fanout_ns_last = elapsed
+        if elapsed > self.fanout_ns_max:
+            self.fanout_ns_max = elapsed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fan-out statistics"""
+        subscribers = self._subscribers
+        return {
+            "subscribers": len(subscribers),
+            "ticks": self.ticks,
+            "quotes": self.quotes,
+            "fanoutAvgUs": round(self.fanout_ns_total / self.ticks / 1000, 2) if self.ticks else 0,
+            "fanoutMaxUs": round(self.fanout_ns_max / 1000, 2),
+            "fanoutLastUs": round(self.fanout_ns_last / 1000, 2),
+            "delivered": self._retired["delivered"] + sum(s.delivered for s in subscribers),
+            "conflated": self._retired["conflated"] + sum(s.conflated for s in subscribers),
+            "dropped": self._retired["dropped"] + sum(s.dropped for s in subscribers),
+            "errors": self.errors,
+        }
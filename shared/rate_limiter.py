@@ -0,0 +1,56 @@
+"""Token-bucket rate limiting for SimpleFX API calls"""
+import asyncio
+import time
+from typing import Dict, Any, Optional
+from shared.config import Config
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until ``tokens`` are available and take them"""
+        # The lock keeps waiters in FIFO order
+        async with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                self.waited_seconds += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self._tokens -= tokens
+            self.acquired += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics"""
+        return {
+            "ratePerSecond": self.rate,
+            "burst": self.capacity,
+            "acquired": self.acquired,
+            "waitedSeconds": round(self.waited_seconds, 3),
+        }
+
+
+# Global instance
+_rate_limiter: Optional[TokenBucket] = None
+
+def get_rate_limiter() -> TokenBucket:
+    """Get global SimpleFX rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = TokenBucket(Config.SIMPLEFX_RATE_LIMIT, Config.SIMPLEFX_RATE_BURST)
+    return _rate_limiter
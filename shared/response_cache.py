@@ -0,0 +1,121 @@
+"""Short-lived cache of SimpleFX responses served by the FastAPI endpoints"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Hashable, Optional, Tuple
+import logging
+from shared.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _retrieve_exception(task: asyncio.Future):
+    # Mark the error as seen even if every caller was cancelled meanwhile
+    if not task.cancelled():
+        task.exception()
+
+
+class ResponseCache:
+    """TTL cache with single-flight loading, keyed by (endpoint, login, reality, params)
+
+    Concurrent misses for the same key share one upstream call; its result
+    (or exception) goes to every waiter, and only successful results are
+    cached. Entries are evicted least-recently-used past ``max_entries``.
+    """
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 1000):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        # Bumped by invalidate() so loads started earlier are not cached
+        self._generation = 0
+
+    def _count(self, endpoint: str, event: str):
+        counters = self.stats.get(endpoint)
+        if counters is None:
+            counters = self.stats[endpoint] = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        counters[event] += 1
+
+    async def get(self, endpoint: str, login: str, reality: str, params: Tuple[Hashable, ...],
+                  fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached response for the key, calling ``fetch`` on a miss"""
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return await fetch()
+
+        key = (endpoint, str(login), reality, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count(endpoint, "hits")
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            self._count(endpoint, "misses")
+            # The load runs as its own task so a cancelled caller does not
+            # cancel it for the callers coalesced onto it
+            inflight = asyncio.ensure_future(self._load(key, endpoint, ttl, fetch))
+            inflight.add_done_callback(_retrieve_exception)
+            self._inflight[key] = inflight
+        else:
+            self._count(endpoint, "coalesced")
+        return await asyncio.shield(inflight)
+
+    async def _load(self, key: Tuple, endpoint: str, ttl: float,
+                    fetch: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        try:
+            value = await fetch()
+        except Exception:
+            self._count(endpoint, "errors")
+            raise
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+        if generation != self._generation:
+            return value
+        self._entries[key] = (time.monotonic() + ttl, value)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, login: Optional[str] = None, endpoint: Optional[str] = None):
+        """Drop cached responses for one account and/or endpoint (all if neither given)"""
+        login = str(login) if login is not None else None
+        self._generation += 1
+        for cache in (self._entries, self._inflight):
+            for key in list(cache):
+                if (login is None or key[1] == login) and (endpoint is None or key[0] == endpoint):
+                    del cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters per endpoint"""
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttlSeconds": self.ttls,
+            "endpoints": self.stats,
+        }
+
+
+# Global instance
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """Get global response cache"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            ttls={
+                "status": Config.RESPONSE_CACHE_TTL_STATUS,
+                "orders_active": Config.RESPONSE_CACHE_TTL_ACTIVE,
+                "orders_closed": Config.RESPONSE_CACHE_TTL_CLOSED,
+            },
+            max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+        )
+    return _response_cache
@@ -0,0 +1,141 @@
+"""Read-through cache of account_settings for the webhook hot path"""
+import asyncio
+import sqlite3
+from typing import Dict, Any, Optional
+import logging
+from shared.config import Config
+from shared.sqlite_profile import open_connection
+
+logger = logging.getLogger(__name__)
+
+
+class AccountSettingsCache:
+    """Caches account settings until they are invalidated
+
+    Each login has a version number that ``invalidate`` bumps; a load that
+    raced with an invalidation is returned but not cached. Edits made by other
+    processes (Flask, Django, the Node service) are detected by polling
+    ``PRAGMA data_version`` on a dedicated connection and, when it moves,
+    comparing ``last_updated`` per account.
+    """
+
+    def __init__(self, check_interval: float = 1.0, db_path: Optional[str] = None):
+        self.check_interval = check_interval
+        self.db_path = db_path or Config.DATABASE_PATH
+        self._settings: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._generation = 0
+        self._last_updated: Optional[Dict[str, Any]] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.external_changes = 0
+
+    async def get(self, login: str) -> Dict[str, Any]:
+        """Get settings for an account; the returned dict must not be modified
+        
+        A failed database read raises and is not cached, so a transient
+        error never turns into unrestricted default settings.
+        """
+        login = str(login)
+        settings = self._settings.get(login)
+        if settings is not None:
+            self.hits += 1
+            return settings
+
+        self.misses += 1
+        from shared.async_database import get_async_db
+        version = (self._generation, self._versions.get(login, 0))
+        settings = await get_async_db().get_account_settings(login, strict=True)
+        if (self._generation, self._versions.get(login, 0)) == version:
+            self._settings[login] = settings
+        return settings
+
+    def invalidate(self, login: Optional[str] = None):
+        """Drop cached settings for one account, or for all accounts"""
+        if login is None:
+            self._generation += 1
+            self._settings.clear()
+        else:
+            login = str(login)
+            self._versions[login] = self._versions.get(login, 0) + 1
+            self._settings.pop(login, None)
+        self.invalidations += 1
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = open_connection(self.db_path)
+        return self._conn
+
+    def _read_changes(self) -> Optional[Dict[str, Any]]:
+        """Return last_updated per login if the database changed since the last check"""
+        conn = self._get_connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return None
+        self._data_version = data_version
+        cursor = conn.execute("SELECT login, last_updated FROM account_settings")
+        return {str(row['login']): row['last_updated'] for row in cursor.fetchall()}
+
+    def _apply_changes(self, last_updated: Dict[str, Any]):
+        """Invalidate accounts whose last_updated moved"""
+        if self._last_updated is not None:
+            for login in set(last_updated) | set(self._last_updated):
+                if last_updated.get(login) != self._last_updated.get(login):
+                    self.external_changes += 1
+                    self.invalidate(login)
+        self._last_updated = last_updated
+
+    async def _watch_loop(self):
+        """Poll for settings edited by other processes"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                changes = await loop.run_in_executor(None, self._read_changes)
+                if changes is not None:
+                    self._apply_changes(changes)
+            except Exception as e:
+                logger.error(f"Account settings change check failed: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    def start_watching(self):
+        """Start the background change check"""
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_loop())
+
+    async def stop_watching(self):
+        """Stop the background change check"""
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            "accounts": len(self._settings),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "externalChanges": self.external_changes,
+        }
+
+
+# Global instance
+_settings_cache: Optional[AccountSettingsCache] = None
+
+def get_settings_cache() -> AccountSettingsCache:
+    """Get global account settings cache"""
+    global _settings_cache
+    if _settings_cache is None:
+        _settings_cache = AccountSettingsCache(check_interval=Config.SETTINGS_CACHE_CHECK_INTERVAL)
+    return _settings_cache
@@ -1,11 +1,18 @@
 """SimpleFX API client for Python"""
 import time
+import random
 import httpx
 import asyncio
 import json
 from typing import Optional, Dict, Any, List
 from shared.config import Config
 
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 try:
     Config.validate_api_keys()
     api_info = Config.get_api_key_info()
@@ -18,6 +25,8 @@ except Exception as e:
 
 _global_auth_lock = asyncio.Lock()
 
+TOKEN_LIFETIME_MS = 3600000
+
 
 class SimpleFXClient:
     """Client for SimpleFX API with token management"""
@@ -27,134 +36,290 @@ class SimpleFXClient:
         self.secondary_access_token: Optional[str] = None
         self.token_expiration: Optional[int] = None
         self.secondary_token_expiration: Optional[int] = None
+        self.token_acquired_at: Optional[float] = None
+        self.token_stats: Dict[str, Any] = {
+            "refreshes": 0,
+            "refreshFailures": 0,
+            "refreshConflicts": 0,
+            "lastRefreshLatencyMs": None,
+        }
+        self._token_refresh_task: Optional[asyncio.Task] = None
         self.base_url = Config.SIMPLEFX_API_URL
-        self.client = httpx.AsyncClient(timeout=30.0)
+        
+        # Per endpoint class timeouts; connect timeout is shared
+        connect_timeout = Config.SIMPLEFX_CONNECT_TIMEOUT
+        self.timeouts: Dict[str, httpx.Timeout] = {
+            "trading": httpx.Timeout(Config.SIMPLEFX_TIMEOUT_TRADING, connect=connect_timeout),
+            "history": httpx.Timeout(Config.SIMPLEFX_TIMEOUT_HISTORY, connect=connect_timeout),
+            "market_data": httpx.Timeout(Config.SIMPLEFX_TIMEOUT_MARKET_DATA, connect=connect_timeout),
+            "auth": httpx.Timeout(Config.SIMPLEFX_TIMEOUT_AUTH, connect=connect_timeout),
+        }
+        self.http2 = Config.SIMPLEFX_HTTP2 and HTTP2_AVAILABLE
+        self.transport_stats: Dict[str, int] = {
+            "requests": 0,
+            "connectionsOpened": 0,
+            "tlsHandshakes": 0,
+            "http2Responses": 0,
+            "warmups": 0,
+        }
+        self._last_request_at = 0.0
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self.client = httpx.AsyncClient(
+            timeout=self.timeouts["history"],
+            limits=httpx.Limits(
+                max_connections=Config.SIMPLEFX_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.SIMPLEFX_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=Config.SIMPLEFX_KEEPALIVE_EXPIRY,
+            ),
+            http2=self.http2,
+            event_hooks={
+                "request": [self._on_request],
+                "response": [self._on_response],
+            },
+        )
+    
+    async def _on_request(self, request: httpx.Request):
+        """Count requests and attach connection tracing"""
+        self.transport_stats["requests"] += 1
+        self._last_request_at = time.monotonic()
+        request.extensions["trace"] = self._trace
+    
+    async def _on_response(self, response: httpx.Response):
+        """Count responses served over HTTP/2"""
+        if response.http_version == "HTTP/2":
+            self.transport_stats["http2Responses"] += 1
+    
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace callback used to count new connections"""
+        if event_name == "connection.connect_tcp.complete":
+            self.transport_stats["connectionsOpened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self.transport_stats["tlsHandshakes"] += 1
+    
+    async def warm_up(self):
+        """Resolve DNS and open a TLS connection before the first real request"""
+        try:
+            self.transport_stats["warmups"] += 1
+            await self.client.head(self.base_url, timeout=self.timeouts["auth"])
+        except httpx.HTTPError as e:
+            print(f"[HTTP] Warm-up request failed: {e}")
+    
+    async def _keepalive_loop(self, interval: float):
+        """Re-warm the pool when idle so connections do not expire"""
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self._last_request_at >= interval:
+                await self.warm_up()
+    
+    def start_keepalive(self):
+        """Warm up now and keep the pool warm in the background"""
+        if self._keepalive_task is None:
+            interval = max(1.0, Config.SIMPLEFX_KEEPALIVE_EXPIRY * 0.8)
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop(interval))
+            asyncio.create_task(self.warm_up())
+    
+    def get_transport_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        stats = dict(self.transport_stats)
+        stats["connectionsReused"] = max(0, stats["requests"] - stats["connectionsOpened"])
+        stats["http2Enabled"] = self.http2
+        return stats
+    
+    def _token_is_valid(self) -> bool:
+        """Check whether the cached primary token can still be used"""
+        return bool(self.access_token and
+                    self.token_expiration and
+                    int(time.time() * 1000) < self.token_expiration)
     
     async def get_access_token(self, use_secondary_api: bool = False) -> str:
         """Get access token for SimpleFX API - PRIMARY API ONLY"""
-        now = int(time.time() * 1000)
-        
-        if (self.access_token and 
-            self.token_expiration and 
-            now < self.token_expiration):
+        if self._token_is_valid():
             return self.access_token
         
         async with _global_auth_lock:
-            if (self.access_token and 
-                self.token_expiration and 
-                now < self.token_expiration):
+            if self._token_is_valid():
                 return self.access_token
-            
-            max_retries = 3
-            base_delay = 10
-            last_error = None
-            
-            for attempt in range(max_retries):
-                try:
-                    print(f"[AUTH] Attempting authentication (attempt {attempt + 1}/{max_retries})...")
-                    key_preview = Config.SIMPLEFX_API_KEY[:8] + "..." + Config.SIMPLEFX_API_KEY[-8:] if len(Config.SIMPLEFX_API_KEY) > 16 else "***"
-                    secret_preview = Config.SIMPLEFX_API_SECRET[:8] + "..." + Config.SIMPLEFX_API_SECRET[-8:] if len(Config.SIMPLEFX_API_SECRET) > 16 else "***"
-                    print(f"[AUTH] Using Key: {key_preview}, Secret: {secret_preview}")
-                    
-                    api_key = Config.SIMPLEFX_API_KEY
-                    api_secret = Config.SIMPLEFX_API_SECRET
-                    
-                    print(f"[AUTH DEBUG] Key length: {len(api_key)} chars")
-                    print(f"[AUTH DEBUG] Secret length: {len(api_secret)} chars")
-                    print(f"[AUTH DEBUG] Key repr: {repr(api_key)}")
-                    print(f"[AUTH DEBUG] Secret repr: {repr(api_secret)}")
-                    print(f"[AUTH DEBUG] Key type: {type(api_key).__name__}")
-                    print(f"[AUTH DEBUG] Secret type: {type(api_secret).__name__}")
-                    
-                    payload = {
-                        "clientId": api_key,
-                        "clientSecret": api_secret,
+            return await self._authenticate()
+    
+    async def _authenticate(self, wait_on_conflict: bool = True) -> str:
+        """Request a new token from /auth/key
+        
+        Callers hold the auth lock, except the background refresher, which
+        passes wait_on_conflict=False so a 409 (active session) is raised
+        at once instead of being waited out.
+        """
+        started = time.perf_counter()
+        max_retries = 3
+        base_delay = 10
+        last_error = None
+
+        for attempt in range(max_retries):
+            try:
+                print(f"[AUTH] Attempting authentication (attempt {attempt + 1}/{max_retries})...")
+                key_preview = Config.SIMPLEFX_API_KEY[:8] + "..." + Config.SIMPLEFX_API_KEY[-8:] if len(Config.SIMPLEFX_API_KEY) > 16 else "***"
+                secret_preview = Config.SIMPLEFX_API_SECRET[:8] + "..." + Config.SIMPLEFX_API_SECRET[-8:] if len(Config.SIMPLEFX_API_SECRET) > 16 else "***"
+                print(f"[AUTH] Using Key: {key_preview}, Secret: {secret_preview}")
+
+                api_key = Config.SIMPLEFX_API_KEY
+                api_secret = Config.SIMPLEFX_API_SECRET
+
+                print(f"[AUTH DEBUG] Key length: {len(api_key)} chars")
+                print(f"[AUTH DEBUG] Secret length: {len(api_secret)} chars")
+                print(f"[AUTH DEBUG] Key repr: {repr(api_key)}")
+                print(f"[AUTH DEBUG] Secret repr: {repr(api_secret)}")
+                print(f"[AUTH DEBUG] Key type: {type(api_key).__name__}")
+                print(f"[AUTH DEBUG] Secret type: {type(api_secret).__name__}")
+
+                payload = {
+                    "clientId": api_key,
+                    "clientSecret": api_secret,
+                }
+                json_str = json.dumps(payload, ensure_ascii=False)
+                json_bytes = json_str.encode('utf-8')
+                print(f"[AUTH DEBUG] JSON payload: {json_str}")
+                print(f"[AUTH DEBUG] JSON bytes (UTF-8): {json_bytes}")
+
+                response = await self.client.post(
+                    f"{self.base_url}/auth/key",
+                    timeout=self.timeouts["auth"],
+                    json=payload,
+                    headers={
+                        "Content-Type": "application/json"
                     }
-                    json_str = json.dumps(payload, ensure_ascii=False)
-                    json_bytes = json_str.encode('utf-8')
-                    print(f"[AUTH DEBUG] JSON payload: {json_str}")
-                    print(f"[AUTH DEBUG] JSON bytes (UTF-8): {json_bytes}")
-                    
-                    response = await self.client.post(
-                        f"{self.base_url}/auth/key",
-                        json=payload,
-                        headers={
-                            "Content-Type": "application/json"
-                        }
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                    self.access_token = data.get("data", {}).get("token", "")
-                    self.token_expiration = now + 3600000
-                    print(f"[AUTH] Authentication successful, token expires in 1 hour")
-                    return self.access_token
-                except httpx.HTTPStatusError as e:
-                    last_error = e
-                    print(f"[AUTH VERBOSE] Full Error Response:")
-                    print(f"[AUTH VERBOSE]   Status Code: {e.response.status_code}")
-                    print(f"[AUTH VERBOSE]   Status Text: {e.response.reason_phrase}")
-                    print(f"[AUTH VERBOSE]   Response Headers: {dict(e.response.headers)}")
+                )
+                response.raise_for_status()
+                data = response.json()
+                # Token and expiry are swapped in together (no await in between)
+                self.access_token = data.get("data", {}).get("token", "")
+                self.token_expiration = int(time.time() * 1000) + TOKEN_LIFETIME_MS
+                self.token_acquired_at = time.time()
+                self.token_stats["refreshes"] += 1
+                self.token_stats["lastRefreshLatencyMs"] = int((time.perf_counter() - started) * 1000)
+                print(f"[AUTH] Authentication successful, token expires in 1 hour")
+                return self.access_token
+            except httpx.HTTPStatusError as e:
+                last_error = e
+                print(f"[AUTH VERBOSE] Full Error Response:")
+                print(f"[AUTH VERBOSE]   Status Code: {e.response.status_code}")
+                print(f"[AUTH VERBOSE]   Status Text: {e.response.reason_phrase}")
+                print(f"[AUTH VERBOSE]   Response Headers: {dict(e.response.headers)}")
+                try:
+                    error_body = e.response.json()
+                    print(f"[AUTH VERBOSE]   Response Body: {json.dumps(error_body, indent=2)}")
+                    error_code = error_body.get('code', 'N/A')
+                    error_message = error_body.get('message', 'N/A')
+                    web_request_id = error_body.get('webRequestId', 'N/A')
+                    print(f"[AUTH VERBOSE]   Error Code: {error_code}")
+                    print(f"[AUTH VERBOSE]   Error Message: {error_message}")
+                    print(f"[AUTH VERBOSE]   Web Request ID: {web_request_id}")
+                    error_detail = f" - {error_message}"
+                except Exception as parse_error:
                     try:
-                        error_body = e.response.json()
-                        print(f"[AUTH VERBOSE]   Response Body: {json.dumps(error_body, indent=2)}")
-                        error_code = error_body.get('code', 'N/A')
-                        error_message = error_body.get('message', 'N/A')
-                        web_request_id = error_body.get('webRequestId', 'N/A')
-                        print(f"[AUTH VERBOSE]   Error Code: {error_code}")
-                        print(f"[AUTH VERBOSE]   Error Message: {error_message}")
-                        print(f"[AUTH VERBOSE]   Web Request ID: {web_request_id}")
-                        error_detail = f" - {error_message}"
-                    except Exception as parse_error:
-                        try:
-                            error_text = e.response.text
-                            print(f"[AUTH VERBOSE]   Response Text (not JSON): {error_text}")
-                            error_detail = ""
-                        except:
-                            print(f"[AUTH VERBOSE]   Could not parse response: {parse_error}")
-                            error_detail = ""
-                    
-                    if e.response.status_code == 409:
-                        if attempt < max_retries - 1:
-                            wait_time = base_delay * (attempt + 1)
-                            print(f"[AUTH] 409 Conflict{error_detail}")
-                            if "INVALID_CREDENTIALS" in error_detail or "AUTHENTICATION_INVALID_CREDENTIALS" in error_detail:
-                                print(f"[AUTH] Error 1501: AUTHENTICATION_INVALID_CREDENTIALS")
-                                print(f"[AUTH] This could mean:")
-                                print(f"[AUTH]   1. IP address not whitelisted (check SimpleFX API settings)")
-                                print(f"[AUTH]   2. API key not activated/enabled")
-                                print(f"[AUTH]   3. API key expired or revoked")
-                                print(f"[AUTH]   4. Wrong environment (check if key is for DEMO vs LIVE)")
-                                print(f"[AUTH]   5. 2FA enabled (may need special configuration)")
-                                print(f"[AUTH] Verify in SimpleFX dashboard: API Settings → Check IP whitelist and key status")
-                                raise
-                            else:
-                                print(f"[AUTH] Active session exists - waiting {wait_time}s (attempt {attempt + 1}/{max_retries})...")
-                                print(f"[AUTH] NOTE: If TypeScript service is running, stop it or wait for its session to expire")
-                                await asyncio.sleep(wait_time)
-                                continue
+                        error_text = e.response.text
+                        print(f"[AUTH VERBOSE]   Response Text (not JSON): {error_text}")
+                        error_detail = ""
+                    except:
+                        print(f"[AUTH VERBOSE]   Could not parse response: {parse_error}")
+                        error_detail = ""
+
+                if e.response.status_code == 409:
+                    if attempt < max_retries - 1:
+                        wait_time = base_delay * (attempt + 1)
+                        print(f"[AUTH] 409 Conflict{error_detail}")
+                        if "INVALID_CREDENTIALS" in error_detail or "AUTHENTICATION_INVALID_CREDENTIALS" in error_detail:
+                            print(f"[AUTH] Error 1501: AUTHENTICATION_INVALID_CREDENTIALS")
+                            print(f"[AUTH] This could mean:")
+                            print(f"[AUTH]   1. IP address not whitelisted (check SimpleFX API settings)")
+                            print(f"[AUTH]   2. API key not activated/enabled")
+                            print(f"[AUTH]   3. API key expired or revoked")
+                            print(f"[AUTH]   4. Wrong environment (check if key is for DEMO vs LIVE)")
+                            print(f"[AUTH]   5. 2FA enabled (may need special configuration)")
+                            print(f"[AUTH] Verify in SimpleFX dashboard: API Settings → Check IP whitelist and key status")
+                            raise
+                        elif not wait_on_conflict:
+                            raise
+                        else:
+                            print(f"[AUTH] Active session exists - waiting {wait_time}s (attempt {attempt + 1}/{max_retries})...")
+                            print(f"[AUTH] NOTE: If TypeScript service is running, stop it or wait for its session to expire")
+                            await asyncio.sleep(wait_time)
+                            continue
+                    else:
+                        print(f"[AUTH] ERROR: Failed to authenticate after {max_retries} attempts")
+                        print(f"[AUTH] Error details: {error_detail}")
+                        if "INVALID_CREDENTIALS" in error_detail or "AUTHENTICATION_INVALID_CREDENTIALS" in error_detail:
+                            print(f"[AUTH]")
+                            print(f"[AUTH] SOLUTION: Your API keys appear to be INVALID")
+                            print(f"[AUTH] 1. Verify keys in shared/config.py match SimpleFX website exactly")
+                            print(f"[AUTH] 2. Check if keys are active/enabled in SimpleFX dashboard")
+                            print(f"[AUTH] 3. Ensure no typos or extra spaces in API key or secret")
+                            print(f"[AUTH] 4. Try generating new API keys from SimpleFX if needed")
                         else:
-                            print(f"[AUTH] ERROR: Failed to authenticate after {max_retries} attempts")
-                            print(f"[AUTH] Error details: {error_detail}")
-                            if "INVALID_CREDENTIALS" in error_detail or "AUTHENTICATION_INVALID_CREDENTIALS" in error_detail:
-                                print(f"[AUTH]")
-                                print(f"[AUTH] SOLUTION: Your API keys appear to be INVALID")
-                                print(f"[AUTH] 1. Verify keys in shared/config.py match SimpleFX website exactly")
-                                print(f"[AUTH] 2. Check if keys are active/enabled in SimpleFX dashboard")
-                                print(f"[AUTH] 3. Ensure no typos or extra spaces in API key or secret")
-                                print(f"[AUTH] 4. Try generating new API keys from SimpleFX if needed")
-                            else:
-                                print(f"[AUTH] 409 Conflict persists - there's likely another service using the same API key")
-                                print(f"[AUTH] SOLUTION: Stop any TypeScript/Node.js services, or wait 1 hour for session to expire")
-                    print(f"[AUTH] Authentication failed: {e.response.status_code} - {e}")
-                    raise
-                except Exception as e:
-                    last_error = e
-                    print(f"[AUTH] Authentication error: {e}")
-                    raise
+                            print(f"[AUTH] 409 Conflict persists - there's likely another service using the same API key")
+                            print(f"[AUTH] SOLUTION: Stop any TypeScript/Node.js services, or wait 1 hour for session to expire")
+                print(f"[AUTH] Authentication failed: {e.response.status_code} - {e}")
+                raise
+            except Exception as e:
+                last_error = e
+                print(f"[AUTH] Authentication error: {e}")
+                raise
+
+        if last_error:
+            raise last_error
+        return self.access_token or ""
+    
+    async def _token_refresh_loop(self):
+        """Refresh the token ahead of expiry so requests never wait for auth"""
+        lead_ms = Config.SIMPLEFX_TOKEN_REFRESH_LEAD * 1000
+        jitter_ms = Config.SIMPLEFX_TOKEN_REFRESH_JITTER * 1000
+        while True:
+            if self.token_expiration:
+                refresh_at = self.token_expiration - lead_ms - random.uniform(0, jitter_ms)
+                delay = max(0.0, (refresh_at - time.time() * 1000) / 1000)
+            else:
+                delay = 0.0
+            await asyncio.sleep(delay)
             
-            if last_error:
-                raise last_error
-            return self.access_token or ""
+            try:
+                remaining_ms = (self.token_expiration or 0) - time.time() * 1000
+                if not self._token_is_valid():
+                    # No usable token: authenticate like a request would
+                    await self.get_access_token(False)
+                elif remaining_ms <= lead_ms + jitter_ms:
+                    if _global_auth_lock.locked():
+                        # A request is re-authenticating; check again shortly
+                        await asyncio.sleep(1)
+                    else:
+                        # Refresh without the lock so a 401 re-auth never waits
+                        # on us; the current token is served until the swap
+                        await self._authenticate(wait_on_conflict=False)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 409 or not self._token_is_valid():
+                    self.token_stats["refreshFailures"] += 1
+                    print(f"[AUTH] Background token refresh failed: {e}")
+                else:
+                    # Active session: keep the current token until it expires
+                    self.token_stats["refreshConflicts"] += 1
+                    print("[AUTH] Background token refresh skipped (409), keeping current token")
+                await asyncio.sleep(30)
+            except Exception as e:
+                self.token_stats["refreshFailures"] += 1
+                print(f"[AUTH] Background token refresh failed: {e}")
+                await asyncio.sleep(30)
+    
+    def start_token_refresher(self):
+        """Start background token refresh"""
+        if self._token_refresh_task is None:
+            self._token_refresh_task = asyncio.create_task(self._token_refresh_loop())
+    
+    def get_token_stats(self) -> Dict[str, Any]:
+        """Get token age and refresh statistics"""
+        stats = dict(self.token_stats)
+        stats["tokenAgeSeconds"] = int(time.time() - self.token_acquired_at) if self.token_acquired_at else None
+        stats["expiresInSeconds"] = (
+            int((self.token_expiration - time.time() * 1000) / 1000) if self.token_expiration else None
+        )
+        stats["backgroundRefresh"] = self._token_refresh_task is not None
+        return stats
     
     def clear_access_tokens(self, clear_secondary: bool = True):
         """Clear cached access tokens"""
@@ -175,6 +340,7 @@ class SimpleFXClient:
             token = await self.get_access_token(False)
             response = await self.client.get(
                 f"{self.base_url}/accounts/{reality}/{login_number}",
+                timeout=self.timeouts["history"],
                 headers={
                     "Authorization": f"Bearer {token}",
                     "Content-Type": "application/json",
@@ -188,6 +354,7 @@ class SimpleFXClient:
                 token = await self.get_access_token(False)
                 response = await self.client.get(
                     f"{self.base_url}/accounts/{reality}/{login_number}",
+                    timeout=self.timeouts["history"],
                     headers={
                         "Authorization": f"Bearer {token}",
                         "Content-Type": "application/json",
@@ -210,6 +377,7 @@ class SimpleFXClient:
             token = await self.get_access_token(False)
             response = await self.client.post(
                 f"{self.base_url}/trading/orders/active",
+                timeout=self.timeouts["trading"],
                 json={
                     "login": int(login_number),
                     "reality": reality,
@@ -232,6 +400,7 @@ class SimpleFXClient:
                 token = await self.get_access_token(False)
                 response = await self.client.post(
                     f"{self.base_url}/trading/orders/active",
+                    timeout=self.timeouts["trading"],
                     json={
                         "login": int(login_number),
                         "reality": reality,
@@ -273,6 +442,7 @@ class SimpleFXClient:
             token = await self.get_access_token(False)
             response = await self.client.post(
                 f"{self.base_url}/trading/orders/history",
+                timeout=self.timeouts["history"],
                 json={
                     "login": int(login_number),
                     "reality": reality,
@@ -297,6 +467,7 @@ class SimpleFXClient:
                 token = await self.get_access_token(False)
                 response = await self.client.post(
                     f"{self.base_url}/trading/orders/history",
+                    timeout=self.timeouts["history"],
                     json={
                         "login": int(login_number),
                         "reality": reality,
@@ -317,6 +488,42 @@ class SimpleFXClient:
                 return data
             raise
     
+    async def fetch_candles(
+        self,
+        symbol: str,
+        sfx_timeframe: str,
+        time_from: int,
+        time_to: int,
+    ) -> List[Dict[str, Any]]:
+        """Fetch raw candles between two times in seconds; raises on failure"""
+        async def request(token: str) -> httpx.Response:
+            response = await self.client.get(
+                f"{self.base_url}/market/candles/{symbol}/{sfx_timeframe}",
+                timeout=self.timeouts["market_data"],
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json",
+                },
+                params={
+                    "from": int(time_from),
+                    "to": int(time_to),
+                }
+            )
+            response.raise_for_status()
+            return response
+        
+        try:
+            response = await request(await self.get_access_token(False))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 401:
+                raise
+            self.clear_access_tokens(False)
+            response = await request(await self.get_access_token(False))
+        data = response.json()
+        if data and "data" in data and "candles" in data["data"]:
+            return data["data"]["candles"] or []
+        return []
+    
     async def get_chart_data(
         self,
         symbol: str,
@@ -325,63 +532,34 @@ class SimpleFXClient:
         time_from: Optional[int] = None,
         time_to: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """Get chart data (candles) for a symbol - PRIMARY API ONLY"""
-        import time as time_module
+        """Get chart data (candles) for a symbol - PRIMARY API ONLY
         
-        token = await self.get_access_token(False)
+        Downloads the whole range on every call; the chart endpoints use
+        shared.candle_store instead.
+        """
+        import time as time_module
+        from shared.candle_store import resolve_timeframe, DEFAULT_CANDLES
         
-        timeframe_map = {
-            "1m": "M1",
-            "5m": "M5",
-            "15m": "M15",
-            "1h": "H1",
-            "4h": "H4",
-            "1d": "D1",
-        }
-        sfx_timeframe = timeframe_map.get(timeframe, "H1")
+        sfx_timeframe, timeframe_seconds = resolve_timeframe(timeframe)
         
         now = int(time_module.time() * 1000)
         if time_from is None:
-            timeframe_ms = {
-                "1m": 60 * 1000,
-                "5m": 5 * 60 * 1000,
-                "15m": 15 * 60 * 1000,
-                "1h": 60 * 60 * 1000,
-                "4h": 4 * 60 * 60 * 1000,
-                "1d": 24 * 60 * 60 * 1000,
-            }.get(timeframe, 60 * 60 * 1000)
-            time_from = now - (timeframe_ms * 200)
+            time_from = now - (timeframe_seconds * 1000 * DEFAULT_CANDLES)
         if time_to is None:
             time_to = now
         
         try:
-            response = await self.client.get(
-                f"{self.base_url}/market/candles/{symbol}/{sfx_timeframe}",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                },
-                params={
-                    "from": int(time_from / 1000),
-                    "to": int(time_to / 1000),
+            candles = await self.fetch_candles(symbol, sfx_timeframe, time_from / 1000, time_to / 1000)
+            return [
+                {
+                    "time": candle["timestamp"],
+                    "open": float(candle["open"]),
+                    "high": float(candle["high"]),
+                    "low": float(candle["low"]),
+                    "close": float(candle["close"]),
                 }
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data and "data" in data and "candles" in data["data"]:
-                candles = data["data"]["candles"]
-                return [
-                    {
-                        "time": candle["timestamp"],
-                        "open": float(f"{candle['open']:.5f}"),
-                        "high": float(f"{candle['high']:.5f}"),
-                        "low": float(f"{candle['low']:.5f}"),
-                        "close": float(f"{candle['close']:.5f}"),
-                    }
-                    for candle in candles
-                ]
-            return []
+                for candle in candles
+            ]
         except Exception as e:
             print(f"Error fetching chart data: {e}")
             return []
@@ -398,18 +576,15 @@ class SimpleFXClient:
         use_secondary_api: bool = False,
     ) -> Dict[str, Any]:
         """Place a trade via SimpleFX API"""
-        from shared.instrument_specs import get_instrument_specs
+        from shared.instrument_specs import get_instrument
         
-        instrument_specs = get_instrument_specs(symbol)
+        instrument = get_instrument(symbol)
         
-        min_lot_size = 0.1 if instrument_specs["type"] == "index" else 0.01
+        min_lot_size = instrument.min_lot
         if amount < min_lot_size:
             raise ValueError(f"Volume {amount} is below minimum {min_lot_size} for {symbol}")
         
-        def format_price(price: float) -> float:
-            if instrument_specs["type"] == "index":
-                return round(price * 10) / 10
-            return float(f"{price:.{instrument_specs['decimals']}f}")
+        format_price = instrument.round_price
         
         request_body = {
             "Reality": reality.upper(),
@@ -428,6 +603,7 @@ class SimpleFXClient:
             token = await self.get_access_token(False)
             response = await self.client.post(
                 f"{self.base_url}/trading/orders/market",
+                timeout=self.timeouts["trading"],
                 json=request_body,
                 headers={
                     "Authorization": f"Bearer {token}",
@@ -447,6 +623,7 @@ class SimpleFXClient:
                 token = await self.get_access_token(False)
                 response = await self.client.post(
                     f"{self.base_url}/trading/orders/market",
+                    timeout=self.timeouts["trading"],
                     json=request_body,
                     headers={
                         "Authorization": f"Bearer {token}",
@@ -471,6 +648,7 @@ class SimpleFXClient:
             token = await self.get_access_token(False)
             response = await self.client.post(
                 f"{self.base_url}/trading/orders/close-all",
+                timeout=self.timeouts["trading"],
                 json={
                     "login": int(login_number),
                     "reality": reality,
@@ -488,6 +666,7 @@ class SimpleFXClient:
                 token = await self.get_access_token(False)
                 response = await self.client.post(
                     f"{self.base_url}/trading/orders/close-all",
+                    timeout=self.timeouts["trading"],
                     json={
                         "login": int(login_number),
                         "reality": reality,
@@ -512,6 +691,7 @@ class SimpleFXClient:
             token = await self.get_access_token(False)
             response = await self.client.get(
                 f"{self.base_url}/accounts/{reality}/{login_number}/deposits",
+                timeout=self.timeouts["history"],
                 headers={
                     "Authorization": f"Bearer {token}",
                     "Content-Type": "application/json",
@@ -525,6 +705,7 @@ class SimpleFXClient:
                 token = await self.get_access_token(False)
                 response = await self.client.get(
                     f"{self.base_url}/accounts/{reality}/{login_number}/deposits",
+                    timeout=self.timeouts["history"],
                     headers={
                         "Authorization": f"Bearer {token}",
                         "Content-Type": "application/json",
@@ -536,6 +717,12 @@ class SimpleFXClient:
     
     async def close(self):
         """Close HTTP client"""
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self._token_refresh_task:
+            self._token_refresh_task.cancel()
+            self._token_refresh_task = None
         await self.client.aclose()
 
 _client: Optional[SimpleFXClient] = None
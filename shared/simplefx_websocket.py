@@ -1,11 +1,14 @@
 """SimpleFX WebSocket client for real-time quotes"""
 import asyncio
 import json
-import time
-from typing import Dict, Optional, Callable, Set
+from typing import Dict, Optional, Set
 from websockets.client import connect
 from websockets.exceptions import ConnectionClosed, WebSocketException
 import logging
+from shared.config import Config
+from shared.quote_book import QuoteBook, Quote
+from shared.quote_bus import QuoteBus
+from shared.bar_aggregator import BarAggregator
 
 logger = logging.getLogger(__name__)
 
@@ -13,15 +16,23 @@ class SimpleFXWebSocket:
     """WebSocket client for SimpleFX quotes"""
     
     WS_URL = "wss://web-quotes-core.simplefx.com/websocket/quotes"
+    DEFAULT_SYMBOLS = ("EURUSD", "US100", "GBPUSD")
     
     def __init__(self):
         self.ws = None
         self.request_id = 0
+        # Symbols subscribed on the current connection / to subscribe on every connection
         self.subscribed_symbols: Set[str] = set()
-        self.quotes: Dict[str, Dict] = {}
-        self.last_quote: Optional[Dict] = None
+        self.wanted_symbols: Set[str] = set(self.DEFAULT_SYMBOLS)
+        # One-shot events set by the next stored quote of a symbol
+        self._quote_events: Dict[str, asyncio.Event] = {}
+        self.book = QuoteBook(capacity=Config.QUOTE_BOOK_CAPACITY)
+        self.last_quote: Optional[Quote] = None
+        self.bus = QuoteBus(default_maxsize=Config.QUOTE_SUBSCRIBER_QUEUE)
+        # The FastAPI service attaches the candle store; other processes only stream bars
+        self.bars = BarAggregator(capacity=Config.BAR_HISTORY,
+                                  subscriber_queue=Config.QUOTE_SUBSCRIBER_QUEUE)
         self.connected = False
-        self.callbacks: list[Callable] = []
         self._reconnect_task = None
         self._running = False
         
@@ -46,12 +57,13 @@ class SimpleFXWebSocket:
                 async with connect(self.WS_URL) as websocket:
                     self.ws = websocket
                     self.connected = True
+                    self.subscribed_symbols.clear()
+                    self.bars.resume()
                     logger.info("WebSocket connected to SimpleFX")
                     
-                    # Subscribe to default symbols
-                    await self.subscribe_to_symbol("EURUSD")
-                    await self.subscribe_to_symbol("US100")
-                    await self.subscribe_to_symbol("GBPUSD")
+                    # Subscribe (again, after a reconnect) to every wanted symbol
+                    for symbol in sorted(self.wanted_symbols):
+                        await self.subscribe_to_symbol(symbol)
                     
                     # Listen for messages
                     async for message in websocket:
@@ -75,38 +87,31 @@ class SimpleFXWebSocket:
             path = data.get('p', '')
             
             if path == '/quotes/subscribed' or path == '/lastprices/list':
-                if 'd' in data and len(data['d']) > 0:
-                    quote = data['d'][0]
-                    symbol = quote.get('s')
-                    if symbol:
-                        self.quotes[symbol] = {
-                            'bid': quote.get('b'),
-                            'ask': quote.get('a'),
-                            'timestamp': quote.get('t', int(time.time() * 1000))
-                        }
-                        self.last_quote = self.quotes[symbol]
-                        
-                        # Notify callbacks
-                        for callback in self.callbacks:
-                            try:
-                                # Callbacks can be sync or async
-                                result = callback(symbol, quote.get('b'), quote.get('a'), quote.get('t'))
-                                if asyncio.iscoroutine(result):
-                                    # Schedule async callback
-                                    asyncio.create_task(result)
-                            except Exception as e:
-                                logger.error(f"Error in callback: {e}")
+                entries = data.get('d')
+                if not entries:
+                    return
+                quotes = self.book.apply(entries)
+                for quote in quotes:
+                    self.last_quote = quote
+                    event = self._quote_events.pop(quote.symbol, None)
+                    if event is not None:
+                        event.set()
+                
+                # Build live bars, then hand the batch to dashboard subscribers
+                self.bars.on_quotes(quotes)
+                self.bus.publish(quotes)
                                 
         except Exception as e:
             logger.error(f"Error handling message: {e}")
     
     async def subscribe_to_symbol(self, symbol: str):
         """Subscribe to a symbol"""
+        self.wanted_symbols.add(symbol)
         if symbol in self.subscribed_symbols:
             return
             
         if not self.ws or not self.connected:
-            logger.warning(f"Cannot subscribe to {symbol}: not connected")
+            logger.warning(f"Cannot subscribe to {symbol} yet: not connected, will subscribe on connect")
             return
         
         try:
@@ -130,16 +135,61 @@ class SimpleFXWebSocket:
             logger.error(f"Error subscribing to {symbol}: {e}")
     
     def get_quote(self, symbol: str) -> Optional[Dict]:
-        """Get latest quote for a symbol"""
-        return self.quotes.get(symbol)
+        """Get latest quote for a symbol as a dict"""
+        quote = self.book.get(symbol)
+        return quote.as_dict() if quote else None
+    
+    async def wait_for_quote(self, symbol: str, max_age_ms: Optional[int] = None,
+                             timeout: Optional[float] = None) -> Optional[Quote]:
+        """Return a quote no older than max_age_ms, waiting up to timeout seconds for one
+        
+        Subscribes to the symbol if needed. Returns None if no fresh quote
+        arrived in time. Must run on the event loop that owns the connection.
+        """
+        if max_age_ms is None:
+            max_age_ms = Config.QUOTE_MAX_AGE_MS
+        if timeout is None:
+            timeout = Config.QUOTE_WAIT_TIMEOUT
+        
+        quote = self.book.get(symbol)
+        if quote and quote.age_ms() <= max_age_ms:
+            return quote
+        
+        if symbol not in self.subscribed_symbols:
+            await self.subscribe_to_symbol(symbol)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            event = self._quote_events.get(symbol)
+            if event is None:
+                event = self._quote_events[symbol] = asyncio.Event()
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+            quote = self.book.get(symbol)
+            if quote and quote.age_ms() <= max_age_ms:
+                return quote
+    
+    def get_quotes(self) -> Dict[str, Dict]:
+        """Get a consistent snapshot of all quotes as dicts"""
+        return {symbol: quote.as_dict() for symbol, quote in self.book.snapshot().items()}
     
     def is_connected(self) -> bool:
         """Check if connected"""
         return self.connected and self.ws is not None
     
-    def add_callback(self, callback: Callable):
-        """Add callback for quote updates"""
-        self.callbacks.append(callback)
+    def subscribe_quotes(self, symbols=None, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Subscribe to quote updates; close() the subscription when done"""
+        return self.bus.subscribe(symbols, loop=loop)
+    
+    def subscribe_bars(self, symbols=None, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Subscribe to live bar updates; close() the subscription when done"""
+        return self.bars.subscribe(symbols, loop=loop)
     
     async def disconnect(self):
         """Disconnect from WebSocket"""
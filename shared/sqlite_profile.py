@@ -0,0 +1,83 @@
+"""Connection profile shared by every SQLite connection to the orders database"""
+import sqlite3
+from typing import Dict, Any, Optional
+import logging
+from shared.config import Config
+
+logger = logging.getLogger(__name__)
+
+TEMP_STORE_NAMES = {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+SYNCHRONOUS_NAMES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+
+
+def profile_pragmas() -> Dict[str, Any]:
+    """Pragmas applied to each new connection, in order"""
+    return {
+        'journal_mode': Config.SQLITE_JOURNAL_MODE,
+        'synchronous': Config.SQLITE_SYNCHRONOUS,
+        # Negative cache_size is in KiB
+        'cache_size': -Config.SQLITE_CACHE_SIZE_KB,
+        'mmap_size': Config.SQLITE_MMAP_SIZE,
+        'temp_store': Config.SQLITE_TEMP_STORE,
+        'busy_timeout': Config.SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+
+def open_connection(db_path: str, check_same_thread: bool = False) -> sqlite3.Connection:
+    """Open a connection with the performance profile applied"""
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=check_same_thread,
+        # busy_timeout is set again below; this covers the connect itself
+        timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=Config.SQLITE_STATEMENT_CACHE,
+    )
+    conn.row_factory = sqlite3.Row
+    apply_profile(conn)
+    return conn
+
+
+def apply_profile(conn: sqlite3.Connection):
+    """Apply the profile pragmas to an open connection"""
+    for name, value in profile_pragmas().items():
+        try:
+            conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.Error as e:
+            # A locked database can refuse the journal_mode switch; the rest still applies
+            logger.warning(f"Could not set PRAGMA {name}={value}: {e}")
+
+
+def read_pragmas(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Read the pragmas actually in effect on a connection"""
+    effective = {}
+    for name in profile_pragmas():
+        row = conn.execute(f"PRAGMA {name}").fetchone()
+        effective[name] = row[0] if row else None
+    effective['synchronous'] = SYNCHRONOUS_NAMES.get(effective['synchronous'], effective['synchronous'])
+    effective['temp_store'] = TEMP_STORE_NAMES.get(effective['temp_store'], effective['temp_store'])
+    if isinstance(effective['journal_mode'], str):
+        effective['journal_mode'] = effective['journal_mode'].upper()
+    effective['statement_cache'] = Config.SQLITE_STATEMENT_CACHE
+    return effective
+
+
+def check_profile(db_path: Optional[str] = None) -> Dict[str, Any]:
+    """Report the pragmas in effect and warn about any that did not take"""
+    conn = open_connection(db_path or Config.DATABASE_PATH)
+    try:
+        effective = read_pragmas(conn)
+    finally:
+        conn.close()
+
+    expected = profile_pragmas()
+    mismatches = {}
+    for name, value in expected.items():
+        actual = effective.get(name)
+        if str(actual).upper() != str(value).upper():
+            mismatches[name] = {"expected": value, "actual": actual}
+
+    print("[DB] SQLite profile: " + ", ".join(f"{k}={v}" for k, v in effective.items()))
+    for name, diff in mismatches.items():
+        print(f"[WARNING] PRAGMA {name} is {diff['actual']}, expected {diff['expected']}")
+
+    return {"effective": effective, "mismatches": mismatches}
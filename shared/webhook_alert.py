@@ -0,0 +1,97 @@
+"""Typed TradingView alert record built once at webhook ingress"""
+import json
+import time
+from typing import Dict, Any, Optional, Union
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_DECODER = "orjson"
+except ImportError:
+    _loads = json.loads
+    JSON_DECODER = "json"
+
+
+class AlertParseError(ValueError):
+    """The webhook body is not a usable alert"""
+
+
+def _to_float(payload: Dict[str, Any], key: str, default: Optional[float]) -> Optional[float]:
+    value = payload.get(key)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise AlertParseError(f"Field '{key}' must be a number, got {value!r}")
+
+
+def _to_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class WebhookAlert:
+    """One alert, parsed and coerced once
+
+    Attribute names are the short keys TradingView sends (``a``, ``t``,
+    ``s``, ``l``, ``sy``, ``z``, ``m``, ``id``...), already converted to the
+    types the processor needs. ``payload`` holds the original dict until the
+    queue has journaled it.
+    """
+
+    __slots__ = (
+        'a', 't', 's', 'l', 'o', 'u', 'z', 'm', 'r', 'h', 'sy', 'raw_symbol',
+        'tf', 'ft', 'ff', 'fd', 'lh', 'fr', 'id', 'has_id', 'th', 'payload',
+    )
+
+    def __init__(self, payload: Dict[str, Any], default_login: Optional[str] = None,
+                 fallback_id: Optional[str] = None):
+        self.payload = payload
+        self.a = _to_str(payload.get('a')) or "UNKNOWN"
+        self.t = _to_float(payload, 't', 0.0)
+        self.s = _to_float(payload, 's', None)
+        self.l = _to_str(payload.get('l') or default_login)
+        self.o = _to_float(payload, 'o', None) or None
+        self.u = payload.get('u') == "1"
+        self.z = _to_float(payload, 'z', 0.01)
+        self.m = _to_float(payload, 'm', 0.01)
+        self.r = payload.get('r', 0)
+        self.h = payload.get('h')
+        self.raw_symbol = _to_str(payload.get('sy', 'EURUSD')) or ""
+        symbol = self.raw_symbol
+        if ':' in symbol:
+            symbol = symbol.split(':')[-1]
+        self.sy = symbol.upper().strip()
+        self.tf = payload.get('tf')
+        self.ft = payload.get('ft')
+        self.ff = payload.get('ff') == "1"
+        self.fd = _to_float(payload, 'fd', None) or None
+        self.lh = payload.get('lh')
+        self.fr = payload.get('fr')
+        self.th = payload.get('th')
+        self.has_id = bool(payload.get('id'))
+        self.id = _to_str(payload.get('id')) or fallback_id or f"{int(time.time() * 1000)}_{id(payload)}"
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> 'WebhookAlert':
+        """Build an alert from an already decoded dict (journal replay, tests)"""
+        from shared.config import Config
+        return cls(payload, default_login=Config.DEFAULT_ACCOUNT_NUMBER)
+
+    def max_ob_candle_alert(self) -> Optional[int]:
+        """The ``h`` field as an int, if set"""
+        return int(self.h) if self.h else None
+
+
+def parse_alert(body: Union[bytes, str], default_login: Optional[str] = None) -> WebhookAlert:
+    """Decode a webhook body once and build the alert record"""
+    try:
+        payload = _loads(body)
+    except ValueError as e:
+        raise AlertParseError(f"Invalid JSON: {e}")
+    if not isinstance(payload, dict):
+        raise AlertParseError("Alert body must be a JSON object")
+    # Time-based, as before: retries of an alert without an id get different
+    # ids and are not deduplicated by id (the hash only separates same-ms alerts)
+    fallback_id = None if payload.get('id') else f"{int(time.time() * 1000)}_{hash(body)}"
+    return WebhookAlert(payload, default_login=default_login, fallback_id=fallback_id)
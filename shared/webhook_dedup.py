@@ -0,0 +1,218 @@
+"""Bounded duplicate detection for webhook alerts"""
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+from shared.config import Config
+
+logger = logging.getLogger(__name__)
+
+DedupKey = Tuple[Optional[str], str]
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class WebhookDedupIndex:
+    """Time-windowed index of processed and queued alerts
+
+    Recently processed (alert_id, account) pairs live in an insertion-ordered
+    dict that is trimmed to ``hot_ttl_ms``. Older history stays in
+    ``processed_webhook_ids`` and is checked with an indexed lookup, optionally
+    fronted by a Bloom filter so most misses never touch the database. Rows
+    older than ``retention_ms`` are pruned in the background.
+    """
+
+    def __init__(self, hot_ttl_ms: int, retention_ms: int, bloom_capacity: int = 0):
+        self.hot_ttl_ms = hot_ttl_ms
+        self.retention_ms = retention_ms
+        self._hot: Dict[DedupKey, int] = {}
+        self._pending: Dict[DedupKey, int] = {}
+        self._bloom: Optional[BloomFilter] = BloomFilter(bloom_capacity) if bloom_capacity > 0 else None
+        self._prune_task: Optional[asyncio.Task] = None
+        self.cold_lookups = 0
+        self.pruned_rows = 0
+
+    @staticmethod
+    def _bloom_key(key: DedupKey) -> str:
+        return f"{key[0]}\x1f{key[1]}"
+
+    def _read_history(self, db) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str]]]:
+        """Read the hot window and the older keys for the Bloom filter (database thread)"""
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_processed_webhook_ids_processed_at
+               ON processed_webhook_ids(processed_at)"""
+        )
+        db.commit()
+        now = int(time.time() * 1000)
+        hot_cutoff = now - self.hot_ttl_ms
+        hot_rows = [
+            (row['alert_id'], row['account_number'], row['processed_at'])
+            for row in db.execute(
+                """SELECT alert_id, account_number, processed_at FROM processed_webhook_ids
+                   WHERE processed_at >= ? ORDER BY processed_at""",
+                (hot_cutoff,)
+            )
+        ]
+        bloom_rows = []
+        if self._bloom is not None:
+            bloom_rows = [
+                (row['alert_id'], row['account_number'])
+                for row in db.execute(
+                    """SELECT alert_id, account_number FROM processed_webhook_ids
+                       WHERE processed_at >= ? AND processed_at < ?""",
+                    (now - self.retention_ms, hot_cutoff)
+                )
+            ]
+        return hot_rows, bloom_rows
+
+    async def load(self):
+        """Load the hot window (and the Bloom filter) from the database"""
+        try:
+            from shared.async_database import get_async_db
+            hot_rows, bloom_rows = await get_async_db().run(self._read_history)
+            for alert_id, account_number, processed_at in hot_rows:
+                self._hot[(alert_id, account_number)] = processed_at
+            for key in bloom_rows:
+                self._bloom.add(self._bloom_key(key))
+            logger.info(f"Loaded {len(self._hot)} recent webhook IDs"
+                        + (f" and {self._bloom.count} into Bloom filter" if self._bloom else ""))
+        except Exception as e:
+            logger.error(f"Failed to load processed IDs: {e}")
+
+    def _evict_expired(self, now: int):
+        """Move entries older than the hot window out of memory"""
+        cutoff = now - self.hot_ttl_ms
+        while self._hot:
+            key = next(iter(self._hot))
+            if self._hot[key] >= cutoff:
+                break
+            del self._hot[key]
+            if self._bloom is not None:
+                self._bloom.add(self._bloom_key(key))
+
+    @staticmethod
+    def _lookup(db, alert_id: str, account_number: str) -> bool:
+        cursor = db.execute(
+            """SELECT 1 FROM processed_webhook_ids
+               WHERE alert_id = ? AND account_number = ? LIMIT 1""",
+            (alert_id, account_number)
+        )
+        return cursor.fetchone() is not None
+
+    async def is_processed(self, alert_id: str, account_number: str) -> bool:
+        """Check whether an alert was already processed for the account"""
+        key = (alert_id, account_number)
+        if key in self._hot:
+            return True
+        if self._bloom is not None and self._bloom_key(key) not in self._bloom:
+            return False
+        self.cold_lookups += 1
+        try:
+            from shared.async_database import get_async_db
+            return await get_async_db().run(self._lookup, alert_id, account_number)
+        except Exception as e:
+            logger.error(f"Failed to look up processed ID: {e}")
+            return False
+
+    def mark_processed(self, alert_id: str, account_number: str):
+        """Record a processed alert in the hot window"""
+        now = int(time.time() * 1000)
+        key = (alert_id, account_number)
+        self._hot.pop(key, None)
+        self._hot[key] = now
+        self._evict_expired(now)
+
+    def add_pending(self, alert_id: Optional[str], account_number: str, timestamp: int):
+        """Record an alert that is waiting in the queue"""
+        self._pending[(alert_id, account_number)] = timestamp
+
+    def remove_pending(self, alert_id: Optional[str], account_number: str):
+        """Forget a queued alert once its job has finished"""
+        self._pending.pop((alert_id, account_number), None)
+
+    def is_pending(self, alert_id: Optional[str], account_number: str, window_ms: int) -> bool:
+        """Check whether the alert was queued within the duplicate window"""
+        queued_at = self._pending.get((alert_id, account_number))
+        return queued_at is not None and (int(time.time() * 1000) - queued_at) < window_ms
+
+    def prune(self) -> int:
+        """Delete rows older than the retention window"""
+        from shared.database import get_db
+        db = get_db()
+        cutoff = int(time.time() * 1000) - self.retention_ms
+        cursor = db.execute("DELETE FROM processed_webhook_ids WHERE processed_at < ?", (cutoff,))
+        db.commit()
+        self.pruned_rows += cursor.rowcount
+        return cursor.rowcount
+
+    async def _prune_loop(self, interval: float):
+        """Prune old rows periodically"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                deleted = await loop.run_in_executor(None, self.prune)
+                self._evict_expired(int(time.time() * 1000))
+                if deleted:
+                    logger.info(f"Pruned {deleted} processed webhook IDs")
+            except Exception as e:
+                logger.error(f"Failed to prune processed IDs: {e}")
+            await asyncio.sleep(interval)
+
+    def start_pruning(self, interval: float = 3600):
+        """Start the background prune task"""
+        if self._prune_task is None:
+            self._prune_task = asyncio.create_task(self._prune_loop(interval))
+
+    async def stop_pruning(self):
+        """Stop the background prune task"""
+        if self._prune_task:
+            self._prune_task.cancel()
+            try:
+                await self._prune_task
+            except asyncio.CancelledError:
+                pass
+            self._prune_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            "hotEntries": len(self._hot),
+            "pendingEntries": len(self._pending),
+            "bloomEntries": self._bloom.count if self._bloom else None,
+            "coldLookups": self.cold_lookups,
+            "prunedRows": self.pruned_rows,
+        }
+
+
+def create_dedup_index() -> WebhookDedupIndex:
+    """Create a dedup index from configuration"""
+    return WebhookDedupIndex(
+        hot_ttl_ms=Config.WEBHOOK_DEDUP_HOT_HOURS * 3600 * 1000,
+        retention_ms=Config.WEBHOOK_DEDUP_RETENTION_DAYS * 24 * 3600 * 1000,
+        bloom_capacity=Config.WEBHOOK_DEDUP_BLOOM_CAPACITY,
+    )
@@ -0,0 +1,210 @@
+"""SQLite journal that makes the webhook queue survive restarts"""
+import asyncio
+import json
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+from shared.config import Config
+from shared.sqlite_profile import open_connection
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class WebhookJournal:
+    """Group-committed journal of queued webhook jobs
+
+    Enqueue/ack events are buffered in memory and written by a single
+    background flusher in one transaction per batch, so a burst of webhooks
+    costs one commit instead of one fsync per request.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 0.005,
+                 max_batch: int = 500):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._ops: List[Tuple] = []
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webhook-journal")
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._ack_latencies_ms: deque = deque(maxlen=1000)
+        self.batches_written = 0
+        self.ops_written = 0
+        self.write_errors = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Open the journal connection and make sure the table exists"""
+        if self._conn is None:
+            self._conn = open_connection(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS webhook_queue_journal (
+                    job_id TEXT PRIMARY KEY,
+                    account_number TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    retries INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'PENDING',
+                    enqueued_at INTEGER NOT NULL,
+                    acked_at INTEGER
+                )
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_webhook_queue_journal_status
+                ON webhook_queue_journal(status, enqueued_at)
+            """)
+            self._conn.commit()
+        return self._conn
+
+    async def start(self):
+        """Start the background flusher"""
+        if self._flush_task:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._get_connection)
+        self._wakeup = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _append(self, op: Tuple):
+        self._ops.append(op)
+        if self._wakeup:
+            self._wakeup.set()
+
+    def record_enqueue(self, job_id: str, account_number: str, data: Dict[str, Any],
+                       enqueued_at: int):
+        """Journal a newly queued job"""
+        self._append(("enqueue", job_id, account_number, json.dumps(data), enqueued_at))
+
+    def record_retry(self, job_id: str, retries: int):
+        """Journal the retry count of a job"""
+        self._append(("retry", job_id, retries))
+
+    def record_ack(self, job_id: str, enqueued_at: int, success: bool = True):
+        """Journal that a job finished (processed, or failed for good)"""
+        now = int(time.time() * 1000)
+        self._ack_latencies_ms.append(now - enqueued_at)
+        self._append(("ack", job_id, "DONE" if success else "FAILED", now))
+
+    async def _flush_loop(self):
+        """Write buffered events in batches"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            # Group-commit window: let a burst accumulate before writing
+            if len(self._ops) < self.max_batch:
+                await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self._flush(loop)
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop):
+        """Hand the current buffer to the writer thread"""
+        if not self._ops:
+            return
+        batch, self._ops = self._ops, []
+        await loop.run_in_executor(self._executor, self._write_batch, batch)
+
+    def _write_batch(self, batch: List[Tuple]):
+        """Write one batch in a single transaction"""
+        enqueues = [op[1:] for op in batch if op[0] == "enqueue"]
+        retries = [(op[2], op[1]) for op in batch if op[0] == "retry"]
+        done = [(op[1],) for op in batch if op[0] == "ack" and op[2] == "DONE"]
+        failed = [(op[3], op[1]) for op in batch if op[0] == "ack" and op[2] == "FAILED"]
+        try:
+            conn = self._get_connection()
+            with conn:
+                conn.executemany(
+                    """INSERT OR REPLACE INTO webhook_queue_journal
+                       (job_id, account_number, payload, enqueued_at)
+                       VALUES (?, ?, ?, ?)""",
+                    enqueues
+                )
+                conn.executemany(
+                    "UPDATE webhook_queue_journal SET retries = ? WHERE job_id = ?",
+                    retries
+                )
+                conn.executemany(
+                    "DELETE FROM webhook_queue_journal WHERE job_id = ?",
+                    done
+                )
+                conn.executemany(
+                    """UPDATE webhook_queue_journal SET status = 'FAILED', acked_at = ?
+                       WHERE job_id = ?""",
+                    failed
+                )
+            self.batches_written += 1
+            self.ops_written += len(batch)
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Failed to write webhook journal batch ({len(batch)} events): {e}")
+
+    def load_unfinished(self) -> List[Dict[str, Any]]:
+        """Load jobs that were queued but never acknowledged"""
+        conn = self._get_connection()
+        cursor = conn.execute(
+            """SELECT job_id, account_number, payload, retries, enqueued_at
+               FROM webhook_queue_journal
+               WHERE status = 'PENDING'
+               ORDER BY enqueued_at"""
+        )
+        jobs = []
+        for row in cursor.fetchall():
+            try:
+                data = json.loads(row['payload'])
+            except ValueError:
+                logger.error(f"Skipping unreadable journal entry {row['job_id']}")
+                continue
+            jobs.append({
+                'job_id': row['job_id'],
+                'account_number': row['account_number'],
+                'data': data,
+                'retries': row['retries'],
+                'enqueued_at': row['enqueued_at'],
+            })
+        return jobs
+
+    async def close(self):
+        """Flush remaining events and stop the flusher"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        loop = asyncio.get_running_loop()
+        # The writer thread may still be running the batch the cancelled
+        # flusher was waiting on; the final flush and the close queue behind it
+        await self._flush(loop)
+        await loop.run_in_executor(self._executor, self._close_connection)
+        self._executor.shutdown()
+
+    def _close_connection(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get journal statistics including enqueue-to-ack latency"""
+        latencies = list(self._ack_latencies_ms)
+        return {
+            "bufferedEvents": len(self._ops),
+            "batchesWritten": self.batches_written,
+            "eventsWritten": self.ops_written,
+            "writeErrors": self.write_errors,
+            "ackLatencyMs": {
+                "samples": len(latencies),
+                "p50": _percentile(latencies, 50),
+                "p99": _percentile(latencies, 99),
+            },
+        }
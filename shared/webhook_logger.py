@@ -1,10 +1,126 @@
 """Webhook logger for consistent logging"""
+import atexit
 import logging
-from typing import Optional
-from shared.database import get_db
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from shared.config import Config
+from shared.sqlite_profile import open_connection
 
 logger = logging.getLogger(__name__)
 
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+
+class WebhookOutcomeWriter:
+    """Background writer that batches webhook_outcomes inserts
+
+    Callers only append to a bounded in-memory buffer; a daemon thread writes
+    the buffer in one transaction when ``batch_size`` rows are waiting or
+    ``flush_interval`` has passed. When the buffer is full, ``drop_oldest``
+    evicts the oldest unwritten row and ``drop_newest`` discards the incoming
+    one; either way the drop is counted per status. ``close`` flushes what is
+    left and is also registered with ``atexit``.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_buffer: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 0.05,
+                 overflow: str = 'drop_oldest'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r} (use {', '.join(OVERFLOW_POLICIES)})")
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._buffer: deque = deque()
+        self._cond = threading.Condition()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._closed = False
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.dropped: Dict[str, int] = {}
+        self._thread = threading.Thread(target=self._run, name="webhook-outcomes", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row: Tuple):
+        """Queue one outcome row; never blocks on the database"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._buffer) >= self.max_buffer:
+                dropped = self._buffer.popleft() if self.overflow == 'drop_oldest' else row
+                self.dropped[dropped[5]] = self.dropped.get(dropped[5], 0) + 1
+                if self.overflow == 'drop_newest':
+                    return
+            self._buffer.append(row)
+            # Wake the writer on the first row (starts the flush timer) and on a full batch
+            if len(self._buffer) == 1 or len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def _run(self):
+        """Writer thread: wait for a full batch or the flush interval"""
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait()
+                if len(self._buffer) < self.batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                batch = list(self._buffer)
+                self._buffer.clear()
+                closed = self._closed
+            if batch:
+                self._write(batch)
+            if closed:
+                return
+
+    def _write(self, batch: List[Tuple]):
+        """Insert one batch in a single transaction"""
+        try:
+            if self._conn is None:
+                self._conn = open_connection(self.db_path)
+            with self._conn:
+                self._conn.executemany(
+                    """INSERT INTO webhook_outcomes
+                       (alert_id, account_number, symbol, action, size, outcome, reason, order_id, processed_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    batch
+                )
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Failed to store {len(batch)} webhook outcomes: {e}")
+
+    def close(self, timeout: float = 5.0):
+        """Flush buffered outcomes and stop the writer thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics"""
+        return {
+            "buffered": len(self._buffer),
+            "maxBuffer": self.max_buffer,
+            "overflowPolicy": self.overflow,
+            "written": self.written,
+            "batches": self.batches,
+            "writeErrors": self.write_errors,
+            "dropped": dict(self.dropped),
+        }
+
+
 class WebhookLogger:
     """Centralized webhook logging"""
     
@@ -15,6 +131,14 @@ class WebhookLogger:
             cls._instance = super().__new__(cls)
         return cls._instance
     
+    def __init__(self):
+        # __new__ hands back the shared instance; set it up only once
+        if hasattr(self, '_writer'):
+            return
+        # Started on the first outcome; stays closed after flush()
+        self._writer: Optional[WebhookOutcomeWriter] = None
+        self._closed = False
+    
     def log_webhook_received(self, symbol: str, action: str, size: float, 
                             tp: float, sl: float, account: str, alert_id: str):
         """Log webhook received"""
@@ -44,6 +168,10 @@ class WebhookLogger:
         logger.error(message)
         self._store_outcome(account, alert_id, "ERROR", message, symbol, action, size)
     
+    def log_invalid_payload(self, error: str):
+        """Log a rejected webhook body; it names no trusted account, so no outcome is stored"""
+        logger.warning(f"INVALID PAYLOAD: {error}")
+    
     def log_duplicate(self, symbol: str, action: str, account: str, 
                      alert_id: str, size: float):
         """Log duplicate"""
@@ -51,22 +179,50 @@ class WebhookLogger:
         logger.info(message)
         self._store_outcome(account, alert_id, "DUPLICATE", message, symbol, action, size)
     
+    def _get_writer(self) -> WebhookOutcomeWriter:
+        if self._writer is None:
+            self._writer = WebhookOutcomeWriter(
+                max_buffer=Config.WEBHOOK_OUTCOME_BUFFER,
+                batch_size=Config.WEBHOOK_OUTCOME_BATCH,
+                flush_interval=Config.WEBHOOK_OUTCOME_FLUSH_MS / 1000,
+                overflow=Config.WEBHOOK_OUTCOME_OVERFLOW,
+            )
+        return self._writer
+    
     def _store_outcome(self, account: str, alert_id: str, status: str, 
                       message: str, symbol: str, action: str, size: float,
                       order_id: Optional[str] = None):
-        """Store webhook outcome in database"""
+        """Queue webhook outcome for the background writer"""
+        if self._closed:
+            logger.warning(f"Webhook outcome {status} for {alert_id} not stored: logger already flushed")
+            return
         try:
-            import time
-            db = get_db()
-            db.execute(
-                """INSERT INTO webhook_outcomes 
-                   (account_number, alert_id, status, message, symbol, action, size, order_id, timestamp)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (account, alert_id, status, message, symbol, action, size, order_id, int(time.time() * 1000))
-            )
-            db.commit()
+            self._get_writer().submit((
+                alert_id, str(account), symbol, action, float(size or 0), status, message,
+                str(order_id) if order_id is not None else None, int(time.time() * 1000)
+            ))
         except Exception as e:
             logger.error(f"Failed to store webhook outcome: {e}")
+    
+    def flush(self):
+        """Write buffered outcomes and stop the writer (called on shutdown)"""
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get outcome writer statistics (zeros until the first outcome)"""
+        if self._writer is not None:
+            return self._writer.get_stats()
+        return {
+            "buffered": 0,
+            "maxBuffer": Config.WEBHOOK_OUTCOME_BUFFER,
+            "overflowPolicy": Config.WEBHOOK_OUTCOME_OVERFLOW,
+            "written": 0,
+            "batches": 0,
+            "writeErrors": 0,
+            "dropped": {},
+        }
 
 
 # Global instance
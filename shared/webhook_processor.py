@@ -1,13 +1,18 @@
 """Webhook processor for handling webhook data"""
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from shared.config import Config
 from shared.simplefx_client import get_client
-from shared.database import get_db
-from shared.instrument_specs import get_instrument_specs
+from shared.async_database import get_async_db
+from shared.settings_cache import get_settings_cache
+from shared.instrument_specs import get_instrument_registry
 from shared.webhook_logger import get_webhook_logger
 from shared.simplefx_websocket import get_websocket
+from shared.response_cache import get_response_cache
+from shared.order_snapshot import get_order_snapshot_store, ActiveOrderSnapshot
+from shared.webhook_alert import WebhookAlert
+from shared.order_record import OrderRecord
 
 logger = logging.getLogger(__name__)
 webhook_logger = get_webhook_logger()
@@ -21,44 +26,30 @@ def get_mutex(login_number: str) -> asyncio.Lock:
         account_mutexes[login_number] = asyncio.Lock()
     return account_mutexes[login_number]
 
-async def process_webhook_data(alert_data: Dict[str, Any]):
+async def process_webhook_data(alert: Union[WebhookAlert, Dict[str, Any]]):
     """Process webhook data - main processing function"""
     import time
     start_time = int(time.time() * 1000)
     symbol = "UNKNOWN"
     login = "UNKNOWN"
     action = "UNKNOWN"
+    alert_id = None
     
     try:
-        # Extract parameters
-        raw_action = alert_data.get('a')
-        take_profit = alert_data.get('t', 0)
-        stop_loss = alert_data.get('s')
-        login = alert_data.get('l') or Config.DEFAULT_ACCOUNT_NUMBER
-        ob_reference = alert_data.get('o')
-        consider_ob_reference = alert_data.get('u') == "1"
-        size = alert_data.get('z', 0.01)
-        max_size = alert_data.get('m', 0.01)
-        reality = alert_data.get('r', 0)
-        max_ob_candle_alert = alert_data.get('h')
-        raw_symbol = alert_data.get('sy', 'EURUSD')
-        timeframe = alert_data.get('tf')
-        find_ob_type = alert_data.get('ft')
-        filter_fvgs = alert_data.get('ff')
-        fvg_distance = alert_data.get('fd')
-        line_height = alert_data.get('lh')
-        filter_fractal = alert_data.get('fr')
-        import time
-        alert_id = alert_data.get('id') or f"{int(time.time() * 1000)}_{hash(str(alert_data))}"
-        alert_threshold = alert_data.get('th')
-        
-        action = raw_action or "UNKNOWN"
-        
-        # Parse symbol
-        symbol = raw_symbol
-        if ':' in symbol:
-            symbol = symbol.split(':')[-1]
-        symbol = symbol.upper().strip()
+        # Fields are parsed and coerced once at ingress; dicts come from older callers
+        if not isinstance(alert, WebhookAlert):
+            alert = WebhookAlert.from_payload(alert)
+        action = alert.a
+        take_profit = alert.t
+        stop_loss = alert.s
+        login = alert.l
+        ob_reference = alert.o
+        consider_ob_reference = alert.u
+        size = alert.z
+        max_size = alert.m
+        raw_symbol = alert.raw_symbol
+        alert_id = alert.id
+        symbol = alert.sy
         
         # Validate
         if not login:
@@ -70,14 +61,14 @@ async def process_webhook_data(alert_data: Dict[str, Any]):
             raise ValueError("Valid symbol is required")
         
         # Supported symbols
-        supported_symbols = ["EURUSD", "GBPUSD", "US100", "US500"]
-        if symbol not in supported_symbols:
-            error_msg = f"Unsupported symbol: {symbol}. Supported: {', '.join(supported_symbols)}"
+        instruments = get_instrument_registry()
+        if not instruments.is_tradable(symbol):
+            error_msg = f"Unsupported symbol: {symbol}. Supported: {', '.join(instruments.tradable_symbols)}"
             webhook_logger.log_error(symbol, "UNKNOWN", error_msg, login, alert_id, size)
             raise ValueError(error_msg)
         
         # Get instrument specs
-        instrument_specs = get_instrument_specs(symbol)
+        instrument_specs = instruments.get(symbol).specs
         
         # Validate pip values
         validation = validate_pip_values(take_profit, stop_loss, symbol, instrument_specs)
@@ -93,13 +84,23 @@ async def process_webhook_data(alert_data: Dict[str, Any]):
         
         async with mutex:
             # Get account settings
-            db = get_db()
-            account_settings = db.get_account_settings(login)
+            db = get_async_db()
+            try:
+                account_settings = await get_settings_cache().get(login)
+            except Exception as e:
+                # Never trade without the account's restrictions
+                error_msg = f"Account settings unavailable for {login}: {e}"
+                webhook_logger.log_order_rejected(symbol, action, error_msg, login, alert_id, size)
+                raise ValueError(error_msg)
             trading_mode = account_settings.get('trading_mode', 'NORMAL')
             
+            # One active-order snapshot shared by all pre-trade checks
+            snapshot_store = get_order_snapshot_store()
+            snapshot = await snapshot_store.get(login)
+            
             # Check exclusive mode
             if account_settings.get('exclusive_mode') == 1:
-                total_orders = await get_total_open_orders_count(login)
+                total_orders = await get_total_open_orders_count(login, snapshot)
                 if total_orders > 0:
                     error_msg = f"Account {login} in Exclusive Mode and already has open trade"
                     webhook_logger.log_order_rejected(symbol, action, error_msg, login, alert_id, size)
@@ -126,14 +127,14 @@ async def process_webhook_data(alert_data: Dict[str, Any]):
                 raise ValueError(error_msg)
             
             # Check duplicate
-            if db.order_exists_with_alert_id(alert_id, login):
+            if await db.order_exists_with_alert_id(alert_id, login):
                 error_msg = f"Alert ID {alert_id} already processed"
                 webhook_logger.log_order_rejected(symbol, action, error_msg, login, alert_id, size)
                 raise ValueError("Order already processed")
             
             # Check volume limits
             use_secondary = Config.should_use_secondary_api(login)
-            total_volume = await get_total_open_volume(login)
+            total_volume = await get_total_open_volume(login, snapshot)
             new_total = total_volume + size
             
             if new_total > max_size:
@@ -142,7 +143,7 @@ async def process_webhook_data(alert_data: Dict[str, Any]):
                 raise ValueError("Max limit reached")
             
             # Check orders per side
-            orders_same_side = await get_orders_count_by_side(login, action)
+            orders_same_side = await get_orders_count_by_side(login, action, snapshot)
             if orders_same_side > 0:
                 error_msg = f"Already have {orders_same_side} {action} order(s) open"
                 webhook_logger.log_order_rejected(symbol, action, error_msg, login, alert_id, size)
@@ -150,23 +151,23 @@ async def process_webhook_data(alert_data: Dict[str, Any]):
             
             # Get market data
             ws = get_websocket()
-            quote = ws.get_quote(symbol)
-            if not quote:
-                # Wait a bit for quote
-                await asyncio.sleep(0.5)
-                quote = ws.get_quote(symbol)
+            quote = await ws.wait_for_quote(symbol)
             
             if not quote:
-                error_msg = "No current market price available"
-                webhook_logger.log_error(symbol, action, error_msg, login, alert_id, size)
+                last_quote = ws.book.get(symbol)
+                if last_quote:
+                    error_msg = f"Market price is stale ({last_quote.age_ms()}ms old, max {Config.QUOTE_MAX_AGE_MS}ms)"
+                    webhook_logger.log_order_rejected(symbol, action, error_msg, login, alert_id, size)
+                else:
+                    error_msg = "No current market price available"
+                    webhook_logger.log_error(symbol, action, error_msg, login, alert_id, size)
                 raise ValueError(error_msg)
             
             # Calculate stop loss
-            market_price = quote['bid'] if action == "B" else quote['ask']
+            market_price = quote.bid if action == "B" else quote.ask
             sl_price = calculate_stop_loss(
                 action, market_price, converted['stopLoss'],
-                float(ob_reference) if ob_reference else None,
-                consider_ob_reference, symbol
+                ob_reference, consider_ob_reference, symbol
             )
             
             # Place trade
@@ -200,6 +201,9 @@ async def process_webhook_data(alert_data: Dict[str, Any]):
             if not order or not order.get('id'):
                 raise ValueError("No order returned from API")
             
+            snapshot_store.apply_placed_order(login, order)
+            get_response_cache().invalidate(login)
+            
             # Log success
             webhook_logger.log_order_placed(
                 symbol, action, size, order.get('openPrice', 0),
@@ -211,50 +215,34 @@ async def process_webhook_data(alert_data: Dict[str, Any]):
             real_tp_pips = abs(order.get('takeProfit', 0) - order.get('openPrice', 0)) / instrument_specs['pipValue']
             real_sl_pips = abs(order.get('stopLoss', 0) - order.get('openPrice', 0)) / instrument_specs['pipValue'] if order.get('stopLoss') else None
             
-            # Prepare order data
-            order_data = {
-                'id': str(order.get('id', '')),
-                'login': login,
-                'symbol': symbol,
-                'side': order.get('side', 'BUY'),
-                'volume': order.get('volume', size),
-                'openPrice': order.get('openPrice'),
-                'closePrice': None,
-                'takeProfit': order.get('takeProfit'),
-                'stopLoss': order.get('stopLoss'),
-                'openTime': order.get('openTime'),
-                'closeTime': None,
-                'profit': order.get('profit', 0),
-                'swap': order.get('swaps', 0),
-                'commission': order.get('commission', 0),
-                'reality': reality_str,
-                'leverage': order.get('leverage'),
-                'margin': order.get('margin'),
-                'marginRate': order.get('marginRate'),
-                'requestId': order.get('requestId', ''),
-                'isFIFO': order.get('isFIFO', False),
-                'obReferencePrice': float(ob_reference) if ob_reference else None,
-                'realSlPips': real_sl_pips,
-                'realTpPips': real_tp_pips,
-                'bidAtOpen': quote['bid'],
-                'askAtOpen': quote['ask'],
-                'spreadAtOpen': quote['ask'] - quote['bid'],
-                'considerObReference': consider_ob_reference,
-                'maxSize': max_size,
-                'alertId': alert_id,
-                'maxobalert': int(max_ob_candle_alert) if max_ob_candle_alert else None,
-                'timeframe': timeframe,
-                'exchange': 'simplefx',
-                'findObType': find_ob_type,
-                'filterFvgs': filter_fvgs == "1",
-                'fvgDistance': float(fvg_distance) if fvg_distance else None,
-                'lineHeight': line_height,
-                'filterFractal': filter_fractal
-            }
+            # Prepare order record
+            order_record = OrderRecord.from_api_order(
+                order, login, reality_str,
+                symbol=symbol,
+                volume=order.get('volume') or size,
+                close_price=None,
+                close_time=None,
+                ob_reference_price=ob_reference,
+                real_sl_pips=real_sl_pips or None,
+                real_tp_pips=real_tp_pips or None,
+                bid_at_open=quote.bid,
+                ask_at_open=quote.ask,
+                spread_at_open=(quote.ask - quote.bid) or None,
+                consider_ob_reference=int(consider_ob_reference),
+                max_size=max_size or None,
+                alert_id=alert_id,
+                maxobalert=alert.max_ob_candle_alert(),
+                timeframe=alert.tf,
+                find_ob_type=alert.ft,
+                filter_fvgs=int(alert.ff),
+                fvg_distance=alert.fd,
+                line_height=alert.lh,
+                filter_fractal=alert.fr,
+            )
             
             # Upsert order
-            db.upsert_order(order_data)
-            db.update_max_size(login, max_size)
+            await db.upsert_order(order_record)
+            await db.update_max_size(login, max_size)
             
             import time
             logger.info(f"Webhook processed successfully for {symbol} in {int(time.time() * 1000) - start_time}ms")
@@ -301,9 +289,7 @@ def calculate_stop_loss(action: str, market_price: float, stop_loss_pips: float,
                        ob_reference_price: Optional[float], consider_ob_reference: bool,
                        symbol: str) -> float:
     """Calculate stop loss price"""
-    from shared.instrument_specs import get_instrument_specs
-    specs = get_instrument_specs(symbol)
-    pip_value = specs['pipValue']
+    pip_value = get_instrument_registry().get(symbol).pip_value
     
     base_price = ob_reference_price if (consider_ob_reference and ob_reference_price) else market_price
     min_distance = 10 if symbol == "US100" else (5 if pip_value == 1 else 0.0002)
@@ -337,36 +323,23 @@ def get_current_trading_session() -> Optional[str]:
     return None
 
 
-async def get_total_open_volume(login: str) -> float:
+async def get_total_open_volume(login: str, snapshot: Optional[ActiveOrderSnapshot] = None) -> float:
     """Get total open volume for account"""
-    client = get_client()
-    reality = "LIVE" if Config.is_live_account(login) else "DEMO"
-    use_secondary = Config.should_use_secondary_api(login)
-    
-    active_data = await client.get_active_orders(login, reality, use_secondary, 1, 1000)
-    orders = active_data.get('data', {}).get('marketOrders', [])
-    return sum(o.get('volume', 0) for o in orders)
+    if snapshot is None:
+        snapshot = await get_order_snapshot_store().get(login)
+    return snapshot.total_volume
 
 
-async def get_total_open_orders_count(login: str) -> int:
+async def get_total_open_orders_count(login: str, snapshot: Optional[ActiveOrderSnapshot] = None) -> int:
     """Get total open orders count"""
-    client = get_client()
-    reality = "LIVE" if Config.is_live_account(login) else "DEMO"
-    use_secondary = Config.should_use_secondary_api(login)
-    
-    active_data = await client.get_active_orders(login, reality, use_secondary, 1, 1000)
-    return len(active_data.get('data', {}).get('marketOrders', []))
+    if snapshot is None:
+        snapshot = await get_order_snapshot_store().get(login)
+    return snapshot.count
 
 
-async def get_orders_count_by_side(login: str, side: str) -> int:
+async def get_orders_count_by_side(login: str, side: str,
+                                   snapshot: Optional[ActiveOrderSnapshot] = None) -> int:
     """Get orders count by side"""
-    client = get_client()
-    reality = "LIVE" if Config.is_live_account(login) else "DEMO"
-    use_secondary = Config.should_use_secondary_api(login)
-    
-    active_data = await client.get_active_orders(login, reality, use_secondary, 1, 1000)
-    orders = active_data.get('data', {}).get('marketOrders', [])
-    
-    normalized_side = "BUY" if side == "B" else "SELL"
-    return len([o for o in orders if o.get('side', '').upper() == normalized_side])
-
+    if snapshot is None:
+        snapshot = await get_order_snapshot_store().get(login)
+    return snapshot.count_by_side(side)
@@ -1,92 +1,171 @@
 """Webhook queue for processing webhooks asynchronously"""
 import asyncio
+import heapq
+import itertools
 import time
-from typing import Dict, Any, Optional, Set
+from typing import Dict, Any, Optional, Set, List, Tuple, Union
 from collections import deque
 import logging
+from shared.config import Config
+from shared.webhook_journal import WebhookJournal
+from shared.webhook_dedup import create_dedup_index
+from shared.webhook_alert import WebhookAlert
 
 logger = logging.getLogger(__name__)
 
 class WebhookJob:
     """Webhook job data structure"""
-    def __init__(self, job_id: str, data: Dict[str, Any], account_number: str):
+    __slots__ = ('id', 'alert', 'timestamp', 'retries', 'account_number')
+    
+    def __init__(self, job_id: str, alert: WebhookAlert, account_number: str,
+                 timestamp: Optional[int] = None, retries: int = 0):
         self.id = job_id
-        self.data = data
-        self.timestamp = int(time.time() * 1000)
-        self.retries = 0
+        self.alert = alert
+        self.timestamp = timestamp or int(time.time() * 1000)
+        self.retries = retries
         self.account_number = account_number
+    
+    @property
+    def alert_id(self) -> Optional[str]:
+        """Alert ID sent by TradingView (None when it was generated)"""
+        return self.alert.id if self.alert.has_id else None
 
 class WebhookQueue:
     """Queue for processing webhooks asynchronously"""
     
-    def __init__(self, max_retries: int = 3, retry_delay: float = 2.0, duplicate_window: int = 30000):
+    def __init__(self, max_retries: int = 3, retry_delay: float = 2.0, duplicate_window: int = 30000,
+                 workers: int = 0, persistent: bool = False):
         self.queue: deque = deque()
         self.processing = False
-        self.processed_ids: Set[str] = set()
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.duplicate_window = duplicate_window  # 30 seconds
         self.processor_callback = None
-        self._load_processed_ids()
-    
-    def _load_processed_ids(self):
-        """Load processed IDs from database"""
-        try:
-            from shared.database import get_db
-            db = get_db()
-            cursor = db.execute(
-                "SELECT alert_id, account_number FROM processed_webhook_ids"
-            )
-            rows = cursor.fetchall()
-            for row in rows:
-                key = f"{row['alert_id']}_{row['account_number']}"
-                self.processed_ids.add(key)
-            logger.info(f"Loaded {len(self.processed_ids)} processed webhook IDs from database")
-        except Exception as e:
-            logger.error(f"Failed to load processed IDs: {e}")
-            self.processed_ids = set()
+        
+        # Worker-pool mode (workers > 0): one FIFO per account, at most one
+        # job per account in flight, retries parked on a delay heap
+        self.workers = workers
+        self._account_queues: Dict[str, deque] = {}
+        self._ready_accounts: Optional[asyncio.Queue] = None
+        self._scheduled_accounts: Set[str] = set()
+        self._busy_accounts: Set[str] = set()
+        self._parked_accounts: Set[str] = set()
+        self._retry_heap: List[Tuple[float, int, str]] = []
+        self._retry_seq = itertools.count()
+        self._retry_wakeup: Optional[asyncio.Event] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        
+        # Optional SQLite journal so queued jobs survive a restart
+        self.journal: Optional[WebhookJournal] = WebhookJournal() if persistent else None
+        
+        # Processed and queued alerts keyed by (alert_id, account)
+        self.dedup = create_dedup_index()
     
-    async def add(self, data: Dict[str, Any], account_number: str) -> str:
+    async def add(self, alert: Union[WebhookAlert, Dict[str, Any]], account_number: str) -> str:
         """Add webhook to queue"""
-        alert_id = data.get('id') or data.get('id', f"{int(time.time() * 1000)}_{hash(str(data))}")
-        job_id = f"{alert_id}_{account_number}_{int(time.time() * 1000)}"
+        if not isinstance(alert, WebhookAlert):
+            alert = WebhookAlert.from_payload(alert)
+        job_id = f"{alert.id}_{account_number}_{int(time.time() * 1000)}"
+        
+        job = WebhookJob(job_id, alert, account_number)
+        if self.journal:
+            self.journal.record_enqueue(job_id, account_number, alert.payload, job.timestamp)
+        # The typed record is all the processor needs; drop the raw dict
+        alert.payload = None
+        self.dedup.add_pending(job.alert_id, account_number, job.timestamp)
+        
+        self._enqueue(job)
+        return job_id
+    
+    def _enqueue(self, job: WebhookJob):
+        """Put a job on the queue of the active mode and make sure it runs"""
+        if self.workers > 0:
+            self._start_workers()
+            self._account_queues.setdefault(job.account_number, deque()).append(job)
+            self._schedule_account(job.account_number)
+            logger.debug(f"Webhook queued: {job.id}, account queue length: "
+                         f"{len(self._account_queues[job.account_number])}")
+            return
         
-        job = WebhookJob(job_id, data, account_number)
         self.queue.append(job)
         
-        logger.debug(f"Webhook queued: {job_id}, queue length: {len(self.queue)}")
+        logger.debug(f"Webhook queued: {job.id}, queue length: {len(self.queue)}")
         
         # Start processing if not already running
         if not self.processing:
             asyncio.create_task(self._process_queue())
-        
-        return job_id
     
-    def check_for_duplicate(self, data: Dict[str, Any], account_number: str) -> bool:
+    async def start(self):
+        """Load dedup history, start background maintenance and replay unfinished jobs"""
+        await self.dedup.load()
+        self.dedup.start_pruning()
+        if not self.journal:
+            return
+        await self.journal.start()
+        loop = asyncio.get_running_loop()
+        pending = await loop.run_in_executor(None, self.journal.load_unfinished)
+        for entry in pending:
+            job = WebhookJob(
+                entry['job_id'], WebhookAlert.from_payload(entry['data']), entry['account_number'],
+                timestamp=entry['enqueued_at'], retries=entry['retries']
+            )
+            self.dedup.add_pending(job.alert_id, job.account_number, job.timestamp)
+            self._enqueue(job)
+        if pending:
+            logger.info(f"Replayed {len(pending)} unfinished webhook jobs from journal")
+    
+    def pending_count(self) -> int:
+        """Number of jobs waiting in either queue mode"""
+        return len(self.queue) + sum(len(q) for q in self._account_queues.values())
+    
+    async def check_for_duplicate(self, alert: Union[WebhookAlert, Dict[str, Any]], account_number: str) -> bool:
         """Check if webhook is duplicate"""
-        now = int(time.time() * 1000)
-        alert_id = data.get('id')
+        if isinstance(alert, WebhookAlert):
+            alert_id = alert.id if alert.has_id else None
+        else:
+            alert_id = alert.get('id')
         
         # Check processed IDs
-        if alert_id:
-            key = f"{alert_id}_{account_number}"
-            if key in self.processed_ids:
-                logger.debug(f"Duplicate detected by processed ID: {key}")
-                return True
+        if alert_id and await self.dedup.is_processed(alert_id, account_number):
+            logger.debug(f"Duplicate detected by processed ID: {alert_id}_{account_number}")
+            return True
         
         # Check queue
-        for job in self.queue:
-            if (job.data.get('id') == alert_id and 
-                job.account_number == account_number and
-                (now - job.timestamp) < self.duplicate_window):
-                return True
-        
-        return False
+        return self.dedup.is_pending(alert_id, account_number, self.duplicate_window)
     
     def set_processor(self, processor_callback):
         """Set processor callback"""
         self.processor_callback = processor_callback
     
+    async def _run_job(self, job: WebhookJob):
+        """Run processor for a job and mark it as processed"""
+        if self.processor_callback:
+            await self.processor_callback(job.alert)
+            # Mark as processed
+            alert_id = job.alert_id
+            if alert_id:
+                self.dedup.mark_processed(alert_id, job.account_number)
+                await self._store_processed_id(alert_id, job.account_number)
+        self.dedup.remove_pending(job.alert_id, job.account_number)
+        if self.journal:
+            self.journal.record_ack(job.id, job.timestamp)
+    
+    def _should_retry(self, job: WebhookJob, error: Exception) -> bool:
+        """Count a failed attempt and decide whether the job gets another one"""
+        logger.error(f"Error processing webhook {job.id}: {error}")
+        job.retries += 1
+        
+        if job.retries < self.max_retries:
+            if self.journal:
+                self.journal.record_retry(job.id, job.retries)
+            return True
+        
+        logger.error(f"Webhook {job.id} failed after {self.max_retries} retries")
+        self.dedup.remove_pending(job.alert_id, job.account_number)
+        if self.journal:
+            self.journal.record_ack(job.id, job.timestamp, success=False)
+        return False
+    
     async def _process_queue(self):
         """Process queue"""
         if self.processing:
@@ -98,51 +177,135 @@ class WebhookQueue:
             job = self.queue.popleft()
             
             try:
-                if self.processor_callback:
-                    await self.processor_callback(job.data)
-                    # Mark as processed
-                    alert_id = job.data.get('id')
-                    if alert_id:
-                        key = f"{alert_id}_{job.account_number}"
-                        self.processed_ids.add(key)
-                        await self._store_processed_id(alert_id, job.account_number)
+                await self._run_job(job)
             except Exception as e:
-                logger.error(f"Error processing webhook {job.id}: {e}")
-                job.retries += 1
-                
-                if job.retries < self.max_retries:
+                if self._should_retry(job, e):
                     await asyncio.sleep(self.retry_delay)
                     self.queue.append(job)
-                else:
-                    logger.error(f"Webhook {job.id} failed after {self.max_retries} retries")
             
             # Small delay between jobs
             await asyncio.sleep(0.1)
         
         self.processing = False
     
+    def _start_workers(self):
+        """Start worker tasks and retry scheduler on first use"""
+        if self._worker_tasks:
+            return
+        self._ready_accounts = asyncio.Queue()
+        self._retry_wakeup = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        self._worker_tasks.append(asyncio.create_task(self._retry_scheduler()))
+        self.processing = True
+        logger.info(f"Webhook queue started with {self.workers} workers")
+    
+    def _schedule_account(self, account_number: str):
+        """Mark account runnable if it has a job and nothing in flight or parked"""
+        if (account_number in self._scheduled_accounts or
+                account_number in self._busy_accounts or
+                account_number in self._parked_accounts or
+                not self._account_queues.get(account_number)):
+            return
+        self._scheduled_accounts.add(account_number)
+        self._ready_accounts.put_nowait(account_number)
+    
+    async def _worker(self, worker_id: int):
+        """Take the head job of a runnable account and process it"""
+        while True:
+            account_number = await self._ready_accounts.get()
+            self._scheduled_accounts.discard(account_number)
+            account_queue = self._account_queues.get(account_number)
+            if not account_queue:
+                continue
+            
+            self._busy_accounts.add(account_number)
+            job = account_queue.popleft()
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                account_queue.appendleft(job)
+                raise
+            except Exception as e:
+                if self._should_retry(job, e):
+                    # Keep the job at the head so the account stays FIFO,
+                    # and park the account until the retry is due
+                    account_queue.appendleft(job)
+                    self._park_account(account_number)
+            finally:
+                self._busy_accounts.discard(account_number)
+            
+            if not account_queue and account_number not in self._parked_accounts:
+                self._account_queues.pop(account_number, None)
+            self._schedule_account(account_number)
+    
+    def _park_account(self, account_number: str):
+        """Hold an account until its retry delay has passed"""
+        due = asyncio.get_running_loop().time() + self.retry_delay
+        self._parked_accounts.add(account_number)
+        heapq.heappush(self._retry_heap, (due, next(self._retry_seq), account_number))
+        self._retry_wakeup.set()
+    
+    async def _retry_scheduler(self):
+        """Release parked accounts when their retry delay expires"""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._retry_wakeup.clear()
+            timeout = None
+            while self._retry_heap:
+                due, _, account_number = self._retry_heap[0]
+                if due > loop.time():
+                    timeout = due - loop.time()
+                    break
+                heapq.heappop(self._retry_heap)
+                self._parked_accounts.discard(account_number)
+                self._schedule_account(account_number)
+            try:
+                await asyncio.wait_for(self._retry_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def stop(self):
+        """Stop worker tasks and flush the journal (pending jobs stay queued)"""
+        for task in self._worker_tasks:
+            task.cancel()
+        for task in self._worker_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._worker_tasks = []
+        self.processing = False
+        await self.dedup.stop_pruning()
+        if self.journal:
+            await self.journal.close()
+    
     async def _store_processed_id(self, alert_id: str, account_number: str):
         """Store processed ID in database"""
         try:
-            from shared.database import get_db
+            from shared.async_database import get_async_db
             import time
-            db = get_db()
-            db.execute(
+            await get_async_db().execute(
                 """INSERT OR IGNORE INTO processed_webhook_ids 
                    (alert_id, account_number, processed_at) 
                    VALUES (?, ?, ?)""",
                 (alert_id, account_number, int(time.time() * 1000))
             )
-            db.commit()
         except Exception as e:
             logger.error(f"Failed to store processed ID: {e}")
     
     def get_queue_status(self) -> Dict[str, Any]:
         """Get queue status"""
         return {
-            "queueLength": len(self.queue),
+            "queueLength": self.pending_count(),
             "processing": self.processing,
-            "processedIdsCount": len(self.processed_ids)
+            "processedIdsCount": self.dedup.get_stats()["hotEntries"],
+            "dedup": self.dedup.get_stats(),
+            "workers": self.workers,
+            "busyAccounts": len(self._busy_accounts),
+            "retryPending": len(self._retry_heap),
+            "journal": self.journal.get_stats() if self.journal else None
         }
 
 
@@ -153,7 +316,10 @@ def get_webhook_queue() -> WebhookQueue:
     """Get global webhook queue instance"""
     global _webhook_queue
     if _webhook_queue is None:
-        _webhook_queue = WebhookQueue()
+        _webhook_queue = WebhookQueue(
+            workers=Config.WEBHOOK_QUEUE_WORKERS,
+            persistent=Config.WEBHOOK_QUEUE_PERSISTENT
+        )
     return _webhook_queue
 
 
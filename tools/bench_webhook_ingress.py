@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+WingTradeBot — Webhook Ingress Microbenchmark
+==============================================
+Drives the FastAPI /webhook endpoint in-process through a minimal ASGI
+driver (no sockets, no HTTP client overhead) at a fixed arrival rate and
+reports ingress latency percentiles.
+
+Requests are sent open-loop: request i is scheduled at start + i / rate and
+its latency is measured from that scheduled time, so a slow endpoint shows up
+as queueing instead of silently lowering the offered load.
+
+The service runs against a throwaway SQLite database; the queue has no
+processor attached, so only ingress (parse, duplicate checks, logging,
+enqueue) is measured.
+
+USAGE:
+    python tools/bench_webhook_ingress.py                 # 1000 req/s for 10 s
+    python tools/bench_webhook_ingress.py --rate 2000 --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCHEMA = [
+    """CREATE TABLE sfx_historical_orders (
+        order_id TEXT PRIMARY KEY, login TEXT, alert_id TEXT, open_time INTEGER
+    )""",
+    "CREATE INDEX idx_sfx_orders_alert_login ON sfx_historical_orders(alert_id, login)",
+    """CREATE TABLE processed_webhook_ids (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, alert_id TEXT NOT NULL,
+        account_number TEXT NOT NULL, processed_at INTEGER NOT NULL,
+        UNIQUE(alert_id, account_number)
+    )""",
+    """CREATE TABLE webhook_outcomes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, alert_id TEXT NOT NULL,
+        account_number TEXT NOT NULL, symbol TEXT NOT NULL, action TEXT NOT NULL,
+        size REAL NOT NULL, outcome TEXT NOT NULL, reason TEXT, order_id TEXT,
+        processed_at INTEGER NOT NULL
+    )""",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def make_body(i: int) -> bytes:
+    return (
+        '{"a":"B","t":20,"s":15,"l":"3979960","sy":"OANDA:EURUSD","z":0.01,"m":0.1,'
+        f'"o":"1.08215","u":"1","tf":"5","ft":"bull","ff":"1","fd":"3","id":"bench-{i}"}}'
+    ).encode()
+
+
+async def asgi_post(app, path: str, body: bytes) -> tuple:
+    """POST a body straight into an ASGI app; returns (status, response body)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    request_sent = False
+    status = 0
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def run(rate: int, duration: float, warmup: int):
+    from apps.fastapi_service.main import app
+    from shared.webhook_alert import JSON_DECODER
+
+    for i in range(warmup):
+        await asgi_post(app, "/webhook", make_body(-1 - i))
+
+    total = int(rate * duration)
+    latencies = [0.0] * total
+    errors = 0
+
+    async def send(i: int, scheduled: float):
+        nonlocal errors
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        status, body = await asgi_post(app, "/webhook", make_body(i))
+        latencies[i] = (time.perf_counter() - scheduled) * 1000
+        if status != 200 or b'"success":true' not in body:
+            errors += 1
+
+    start = time.perf_counter() + 0.05
+    await asyncio.gather(*(send(i, start + i / rate) for i in range(total)))
+    elapsed = time.perf_counter() - start
+
+    print(f"JSON decoder:      {JSON_DECODER}")
+    print(f"Offered load:      {rate} req/s for {duration:g}s ({total} requests)")
+    print(f"Achieved:          {total / elapsed:.0f} req/s")
+    print(f"Errors:            {errors}")
+    print(f"Ingress latency:   p50 {percentile(latencies, 50):.3f} ms | "
+          f"p99 {percentile(latencies, 99):.3f} ms | max {max(latencies):.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the /webhook ingress path")
+    parser.add_argument("--rate", type=int, default=1000, help="Requests per second (default 1000)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default 10)")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured warm-up requests")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(db_path)
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+
+        from shared.config import Config
+        Config.DATABASE_PATH = db_path
+        Config.WEBHOOK_QUEUE_PERSISTENT = False
+
+        asyncio.run(run(args.rate, args.duration, args.warmup))
+
+        from shared.webhook_logger import get_webhook_logger
+        get_webhook_logger().flush()
+
+
+if __name__ == "__main__":
+    main()